@@ -7,7 +7,9 @@ and starts the bot server.
 
 import logging
 import sys
+import threading
 from pathlib import Path
+from typing import Optional
 
 # Add src to Python path
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -17,7 +19,10 @@ from slack_bolt.adapter.socket_mode import SocketModeHandler
 
 from src.handlers.commands import register_command_handlers
 from src.handlers.events import register_event_handlers
-from src.services.supabase_client import SupabaseService
+from src.services.llm_service import close_llm_service
+from src.services.slack_client import close_slack_service, get_slack_service
+from src.services.supabase_client import SupabaseService, close_pool, get_supabase_service
+from src.utils import async_runner
 from src.utils.config import settings
 from src.utils.logger import setup_logging
 from src.middleware.logging_middleware import (
@@ -88,14 +93,13 @@ def create_app(token_verification_enabled=True) -> App:
     app.middleware(add_context_middleware)  # Context enrichment
     
     # Initialize services
-    try:
-        supabase_service = SupabaseService()
-        app._supabase = supabase_service
+    # Shared with the handlers that call get_supabase_service(), so there is
+    # one client and one log buffer to flush at shutdown
+    app._supabase = get_supabase_service()
+    if app._supabase:
         logger.info("Supabase service initialized successfully")
-    except Exception as e:
-        logger.error(f"Failed to initialize Supabase: {e}")
+    else:
         logger.info("Bot will run without persistent storage (memory only)")
-        app._supabase = None
     
     # Configure rate limits from settings
     if settings.RATE_LIMIT_ENABLED:
@@ -114,8 +118,42 @@ def create_app(token_verification_enabled=True) -> App:
     return app
 
 
+def shutdown(supabase: Optional[SupabaseService] = None) -> None:
+    """
+    Stop background services and release pooled connections.
+    
+    Args:
+        supabase: Service whose buffered log writes should be flushed first
+    """
+    metrics_reporter.stop()
+    
+    if supabase is not None:
+        try:
+            async_runner.run_sync(supabase.aclose(), timeout=10)
+        except Exception as e:
+            logger.warning(f"Error flushing buffered Supabase writes: {e}")
+    
+    try:
+        async_runner.run_sync(close_llm_service(), timeout=5)
+    except Exception as e:
+        logger.warning(f"Error closing LLM service: {e}")
+    
+    try:
+        async_runner.run_sync(close_slack_service(), timeout=5)
+    except Exception as e:
+        logger.warning(f"Error closing Slack service: {e}")
+    
+    try:
+        async_runner.run_sync(close_pool(), timeout=5)
+    except Exception as e:
+        logger.warning(f"Error closing Postgres pool: {e}")
+    
+    async_runner.shutdown()
+
+
 def main():
     """Main function to start the bot."""
+    app = None
     try:
         logger.info("Starting Autónomos Dona Slack bot...")
         
@@ -127,9 +165,15 @@ def main():
             metrics_reporter.start()
             logger.info("Metrics reporter started")
             
+            # Preload channel info so context lookups rarely need conversations.info
+            threading.Thread(
+                target=get_slack_service().context_manager.warm_cache,
+                name="channel-cache-warmup",
+                daemon=True
+            ).start()
+            
             # Set up periodic rate limiter cleanup
             if settings.RATE_LIMIT_ENABLED:
-                import threading
                 def periodic_cleanup():
                     while True:
                         try:
@@ -150,10 +194,10 @@ def main():
         
     except KeyboardInterrupt:
         logger.info("Bot stopped by user")
-        metrics_reporter.stop()
+        shutdown(getattr(app, "_supabase", None))
     except Exception as e:
         logger.error(f"Error starting bot: {e}", exc_info=True)
-        metrics_reporter.stop()
+        shutdown(getattr(app, "_supabase", None))
         sys.exit(1)
 
 
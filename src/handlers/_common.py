@@ -0,0 +1,93 @@
+"""
+Helpers shared by the command and event handlers.
+
+Both handler modules log inbound messages and build LLM context the
+same way; keeping that here stops the two paths from drifting apart.
+"""
+
+from typing import Any, Dict, List, Optional
+
+from src.services.supabase_client import SupabaseService
+
+
+def log_inbound_message(
+    supabase: SupabaseService,
+    channel_id: str,
+    user_id: str,
+    thread_ts: Optional[str],
+    context_type: str,
+    content: str,
+    message_ts: Optional[str],
+    message_metadata: Dict[str, Any],
+    activity_type: str,
+    activity_metadata: Dict[str, Any],
+    entity_type: str = "conversation"
+) -> Dict[str, Any]:
+    """
+    Resolve the conversation for an incoming message and queue its logs.
+    
+    Args:
+        supabase: Supabase service instance
+        channel_id: Slack channel ID
+        user_id: Slack user ID of the sender
+        thread_ts: Thread timestamp, if the message is in a thread
+        context_type: Conversation context type value
+        content: Message text to record
+        message_ts: Slack timestamp of the message
+        message_metadata: Metadata for the message log entry
+        activity_type: Activity type for the activity log entry
+        activity_metadata: Metadata for the activity log entry
+        entity_type: Entity the activity refers to; the conversation's ID
+            is recorded only when this is "conversation"
+    
+    Returns:
+        The conversation record
+    """
+    conversation = supabase.get_or_create_conversation(
+        channel_id=channel_id,
+        user_id=user_id,
+        context_type=context_type,
+        thread_ts=thread_ts
+    )
+    
+    # Log the user's message
+    supabase.queue_message({
+        "conversation_id": conversation["id"],
+        "sender_type": "user",
+        "sender_id": user_id,
+        "content": content,
+        "slack_message_ts": message_ts,
+        "metadata": message_metadata
+    })
+    
+    # Log activity
+    supabase.queue_activity({
+        "slack_user_id": user_id,
+        "activity_type": activity_type,
+        "entity_type": entity_type,
+        "entity_id": conversation["id"] if entity_type == "conversation" else None,
+        "metadata": activity_metadata
+    })
+    
+    return conversation
+
+
+def get_conversation_history(supabase: SupabaseService, conversation_id: str) -> List[Dict[str, str]]:
+    """
+    Build LLM context from the latest messages of a conversation.
+    
+    Args:
+        supabase: Supabase service instance
+        conversation_id: Conversation UUID
+    
+    Returns:
+        Up to four messages as role/content dicts, oldest first
+    """
+    messages = supabase.get_conversation_messages(conversation_id, limit=5)
+    return [
+        {
+            "role": "assistant" if msg.get("sender_type") == "bot" else "user",
+            "content": msg.get("content", "")
+        }
+        for msg in messages[-4:]  # Last 4 messages for context
+    ]
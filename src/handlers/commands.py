@@ -6,17 +6,19 @@ that users can invoke in Slack.
 """
 
 import logging
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Dict, Any, Optional
 
 from slack_bolt import App, Ack, Respond
 from slack_sdk.web import SlackResponse
 
+from src.handlers._common import get_conversation_history, log_inbound_message
 from src.models.schemas import Task, TaskStatus, ConversationContext
-from src.services.supabase_client import SupabaseService, get_supabase_service
+from src.services.supabase_client import BACKGROUND_RESULT_TIMEOUT, SupabaseService, get_supabase_service
 from src.services.slack_client import get_slack_service
 from src.services.llm_service import get_llm_service
-from src.utils.config import settings
+from src.utils.async_runner import run_sync, submit
+from src.utils.config import ADMIN_USER_IDS, settings
 from src.utils.metrics import metrics_collector
 from src.middleware.rate_limit_middleware import get_rate_limit_status
 from src.utils.context_manager import ContextType
@@ -72,59 +74,32 @@ def handle_dona_command(ack: Ack, respond: Respond, command: Dict[str, Any], con
         return
     
     try:
-        # Store the conversation
-        conversation = None
+        # Store the conversation in the background; only the
+        # conversation history below waits for it
+        conversation_future = None
         if supabase:
-            try:
-                conversation = supabase.get_or_create_conversation(
-                    channel_id=channel_id,
-                    user_id=user_id,
-                    context_type=context_type.value,
-                    thread_ts=command.get("thread_ts")
-                )
-                
-                # Log the command
-                supabase.log_message({
-                    "conversation_id": conversation["id"],
-                    "sender_type": "user",
-                    "sender_id": user_id,
-                    "content": f"/dona {text}",
-                    "slack_message_ts": command.get("ts"),
-                    "metadata": {"command": "/dona", "args": text}
-                })
-                
-                # Log activity
-                supabase.log_activity({
-                    "slack_user_id": user_id,
-                    "activity_type": "slash_command",
-                    "entity_type": "command",
-                    "entity_id": None,
-                    "metadata": {"command": "/dona", "context": context_type.value}
-                })
-            except Exception as e:
-                logger.error(f"Error logging command: {e}")
+            conversation_future = supabase.run_in_background(
+                _log_dona_command, supabase, command, context_type.value
+            )
         
         # Use LLM for natural language processing
         try:
             llm_service = get_llm_service()
             
+            # Extract intent to see if we should suggest specific commands
+            intent_data = run_sync(llm_service.extract_intent(text))
+            
             # Get conversation history for context
+            conversation = None
             conversation_history = []
-            if conversation and supabase:
+            if conversation_future:
                 try:
-                    messages = supabase.get_conversation_messages(conversation["id"], limit=5)
-                    for msg in messages[-4:]:  # Last 4 messages for context
-                        role = "assistant" if msg.get("sender_type") == "bot" else "user"
-                        conversation_history.append({
-                            "role": role,
-                            "content": msg.get("content", "")
-                        })
+                    conversation = conversation_future.result(BACKGROUND_RESULT_TIMEOUT)
+                    if conversation:
+                        conversation_history = get_conversation_history(supabase, conversation["id"])
                 except Exception as e:
                     logger.warning(f"Could not get conversation history: {e}")
             
-            # Extract intent to see if we should suggest specific commands
-            intent_data = llm_service.extract_intent(text)
-            
             # Generate intelligent response
             user_context = {
                 "user_id": user_id,
@@ -133,16 +108,16 @@ def handle_dona_command(ack: Ack, respond: Respond, command: Dict[str, Any], con
                 "intent": intent_data
             }
             
-            llm_response = llm_service.generate_response(
+            llm_response = run_sync(llm_service.generate_response(
                 user_message=text,
                 conversation_context=conversation_history,
                 user_context=user_context
-            )
+            ))
             
             # Log the LLM interaction
-            if supabase and conversation:
+            if conversation:
                 try:
-                    supabase.log_message({
+                    supabase.queue_message({
                         "conversation_id": conversation["id"],
                         "sender_type": "bot",
                         "sender_id": "dona",
@@ -189,6 +164,35 @@ def handle_dona_command(ack: Ack, respond: Respond, command: Dict[str, Any], con
         respond("I encountered an error processing your request. Please try again.")
 
 
+def _log_dona_command(supabase: SupabaseService, command: Dict[str, Any], context_type: str) -> Dict[str, Any]:
+    """
+    Resolve the conversation for a /dona command and queue its logs.
+    
+    Args:
+        supabase: Supabase service instance
+        command: The slash command payload
+        context_type: Conversation context type value
+        
+    Returns:
+        The conversation record
+    """
+    user_id = command.get("user_id")
+    text = command.get("text", "").strip()
+    return log_inbound_message(
+        supabase,
+        channel_id=command.get("channel_id"),
+        user_id=user_id,
+        thread_ts=command.get("thread_ts"),
+        context_type=context_type,
+        content=f"/dona {text}",
+        message_ts=command.get("ts"),
+        message_metadata={"command": "/dona", "args": text},
+        activity_type="slash_command",
+        activity_metadata={"command": "/dona", "context": context_type},
+        entity_type="command"
+    )
+
+
 def handle_help_command(ack: Ack, respond: Respond, command: Dict[str, Any]) -> None:
     """
     Handle the /dona-help command.
@@ -333,14 +337,14 @@ def handle_task_command(ack: Ack, respond: Respond, command: Dict[str, Any]) ->
                 # Update task status
                 updates = {
                     "status": TaskStatus.COMPLETED.value,
-                    "completed_at": datetime.utcnow().isoformat()
+                    "completed_at": datetime.now(timezone.utc).isoformat()
                 }
                 result = supabase.update_task(task_id, updates)
                 
                 respond(f"✅ Task completed: *{result.get('description', 'Task')}*\n\nGreat job! 🎉")
                 
                 # Log activity
-                supabase.log_activity({
+                supabase.queue_activity({
                     "slack_user_id": user_id,
                     "activity_type": "task_completed",
                     "entity_type": "task",
@@ -460,7 +464,7 @@ def handle_summary_command(ack: Ack, respond: Respond, command: Dict[str, Any])
         respond("\n".join(lines))
         
         # Log activity
-        supabase.log_activity({
+        supabase.queue_activity({
             "slack_user_id": user_id,
             "activity_type": "summary_viewed",
             "metadata": {"period": period}
@@ -526,11 +530,14 @@ def handle_status_command(ack: Ack, respond: Respond, command: Dict[str, Any]) -
     slack_service = get_slack_service()
     
     try:
+        # Fetch the Slack profile while the statistics are read
+        user_info_future = submit(slack_service.get_user_info(user_id))
+        
         # Get user statistics
         stats = supabase.get_user_statistics(user_id)
         
         # Get user info from Slack
-        user_info = slack_service.get_user_info(user_id)
+        user_info = user_info_future.result(timeout=10)
         user_name = user_info.get("real_name", "User") if user_info else "User"
         
         # Format member since date
@@ -593,7 +600,7 @@ def handle_status_command(ack: Ack, respond: Respond, command: Dict[str, Any]) -
         respond("\n".join(lines))
         
         # Log activity
-        supabase.log_activity({
+        supabase.queue_activity({
             "slack_user_id": user_id,
             "activity_type": "status_viewed",
             "metadata": {"completion_rate": completion_rate}
@@ -620,8 +627,7 @@ def handle_metrics_command(ack: Ack, respond: Respond, command: Dict[str, Any])
         # Check if user is admin (in production, verify against admin list)
         if settings.ENV != "development":
             # In production, check admin list
-            admin_users = settings.ADMIN_USERS.split(",") if hasattr(settings, "ADMIN_USERS") else []
-            if user_id not in admin_users:
+            if user_id not in ADMIN_USER_IDS:
                 respond("This command is only available to administrators.")
                 return
         
@@ -849,7 +855,7 @@ def handle_config_command(ack: Ack, respond: Respond, command: Dict[str, Any]) -
             respond(f"Unknown action: {action}. Use `/dona-config help` for available options.")
         
         # Log activity
-        supabase.log_activity({
+        supabase.queue_activity({
             "slack_user_id": user_id,
             "activity_type": "config_update",
             "entity_type": "user_preferences",
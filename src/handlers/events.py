@@ -12,10 +12,12 @@ from typing import Dict, Any
 from slack_bolt import App, BoltContext
 from slack_sdk.web import SlackResponse
 
+from src.handlers._common import get_conversation_history, log_inbound_message
 from src.models.schemas import ConversationContext
-from src.services.supabase_client import SupabaseService
+from src.services.supabase_client import BACKGROUND_RESULT_TIMEOUT, SupabaseService
 from src.services.slack_client import SlackService, get_slack_service
-from src.services.llm_service import get_llm_service
+from src.services.llm_service import get_batching_llm, get_llm_service
+from src.utils.async_runner import run_sync
 from src.utils.config import settings
 from src.utils.context_manager import ContextType
 
@@ -37,6 +39,40 @@ def register_event_handlers(app: App) -> None:
     logger.info("Event handlers registered")
 
 
+def _log_inbound_event(
+    supabase: SupabaseService,
+    event: Dict[str, Any],
+    context_type: str,
+    event_type: str,
+    activity_metadata: Dict[str, Any]
+) -> Dict[str, Any]:
+    """
+    Resolve the conversation for an incoming event and queue its logs.
+    
+    Args:
+        supabase: Supabase service instance
+        event: The event data from Slack
+        context_type: Conversation context type value
+        event_type: Event type recorded on the message and the activity
+        activity_metadata: Metadata for the activity log entry
+        
+    Returns:
+        The conversation record
+    """
+    return log_inbound_message(
+        supabase,
+        channel_id=event.get("channel"),
+        user_id=event.get("user"),
+        thread_ts=event.get("thread_ts"),
+        context_type=context_type,
+        content=event.get("text", ""),
+        message_ts=event.get("ts"),
+        message_metadata={"event_type": event_type},
+        activity_type=event_type,
+        activity_metadata=activity_metadata
+    )
+
+
 def handle_app_mention(event: Dict[str, Any], say: Any, context: BoltContext) -> None:
     """
     Handle when the bot is mentioned in a channel.
@@ -59,37 +95,18 @@ def handle_app_mention(event: Dict[str, Any], say: Any, context: BoltContext) ->
         context_type = slack_service.context_manager.get_context_type(channel, user)
         privacy_level = slack_service.context_manager.get_privacy_level(context_type)
         
-        # Log the conversation
-        conversation = None
+        # Resolve the conversation and queue the inbound logs in the
+        # background; only the conversation history below waits for it
+        conversation_future = None
         if supabase:
-            try:
-                conversation = supabase.get_or_create_conversation(
-                    channel_id=channel,
-                    user_id=user,
-                    context_type=context_type.value,
-                    thread_ts=event.get("thread_ts")
-                )
-                
-                # Log the user's message
-                supabase.log_message({
-                    "conversation_id": conversation["id"],
-                    "sender_type": "user",
-                    "sender_id": user,
-                    "content": text,
-                    "slack_message_ts": event.get("ts"),
-                    "metadata": {"event_type": "app_mention"}
-                })
-                
-                # Log activity
-                supabase.log_activity({
-                    "slack_user_id": user,
-                    "activity_type": "app_mention",
-                    "entity_type": "conversation",
-                    "entity_id": conversation["id"],
-                    "metadata": {"channel": channel, "context_type": context_type.value}
-                })
-            except Exception as e:
-                logger.error(f"Error logging conversation: {e}")
+            conversation_future = supabase.run_in_background(
+                _log_inbound_event,
+                supabase,
+                event,
+                context_type.value,
+                "app_mention",
+                {"channel": channel, "context_type": context_type.value}
+            )
         
         # Remove the bot mention from the text
         bot_mention = f"<@{context.get('bot_user_id')}>"
@@ -102,24 +119,20 @@ def handle_app_mention(event: Dict[str, Any], say: Any, context: BoltContext) ->
         try:
             llm_service = get_llm_service()
             
+            # Extract intent while the conversation is being resolved
+            intent_data = run_sync(llm_service.extract_intent(clean_text))
+            intent_detected = intent_data.get("intent", "unknown")
+            
             # Get conversation history for context
             conversation_history = []
-            if conversation and supabase:
+            if conversation_future:
                 try:
-                    messages = supabase.get_conversation_messages(conversation["id"], limit=5)
-                    for msg in messages[-4:]:  # Last 4 messages for context
-                        role = "assistant" if msg.get("sender_type") == "bot" else "user"
-                        conversation_history.append({
-                            "role": role,
-                            "content": msg.get("content", "")
-                        })
+                    conversation = conversation_future.result(BACKGROUND_RESULT_TIMEOUT)
+                    if conversation:
+                        conversation_history = get_conversation_history(supabase, conversation["id"])
                 except Exception as e:
                     logger.warning(f"Could not get conversation history: {e}")
             
-            # Extract intent
-            intent_data = llm_service.extract_intent(clean_text)
-            intent_detected = intent_data.get("intent", "unknown")
-            
             # Generate intelligent response with context awareness
             user_context = {
                 "user_id": user,
@@ -129,15 +142,16 @@ def handle_app_mention(event: Dict[str, Any], say: Any, context: BoltContext) ->
                 "is_mention": True
             }
             
-            llm_response = llm_service.generate_response(
-                user_message=clean_text,
-                conversation_context=conversation_history,
-                user_context=user_context
-            )
-            
-            # Add user mention to response
-            response_message = f"<@{user}>, {llm_response}"
-            say(response_message)
+            # Stream the reply into the channel, addressed to the user
+            response_message = run_sync(slack_service.stream_message(
+                channel,
+                llm_service.stream_response(
+                    user_message=clean_text,
+                    conversation_context=conversation_history,
+                    user_context=user_context
+                ),
+                prefix=f"<@{user}>, "
+            ))
             
         except Exception as e:
             logger.error(f"Error processing mention with LLM: {e}")
@@ -150,16 +164,18 @@ def handle_app_mention(event: Dict[str, Any], say: Any, context: BoltContext) ->
             say(response_message)
         
         # Log Dona's response
-        if supabase and conversation and response_message:
+        if conversation_future and response_message:
             try:
-                supabase.log_message({
-                    "conversation_id": conversation["id"],
-                    "sender_type": "dona",
-                    "sender_id": context.get('bot_user_id', 'dona'),
-                    "content": response_message,
-                    "intent_detected": intent_detected,
-                    "metadata": {"response_to": event.get("ts")}
-                })
+                conversation = conversation_future.result(BACKGROUND_RESULT_TIMEOUT)
+                if conversation:
+                    supabase.queue_message({
+                        "conversation_id": conversation["id"],
+                        "sender_type": "dona",
+                        "sender_id": context.get('bot_user_id', 'dona'),
+                        "content": response_message,
+                        "intent_detected": intent_detected,
+                        "metadata": {"response_to": event.get("ts")}
+                    })
             except Exception as e:
                 logger.error(f"Error logging bot response: {e}")
             
@@ -193,59 +209,37 @@ def handle_message(event: Dict[str, Any], say: Any, context: BoltContext) -> Non
         app = context.get("app") or context.get("client")
         supabase: SupabaseService = app._supabase if hasattr(app, '_supabase') else None
         
-        # Log DM conversation
-        conversation = None
+        # Resolve the conversation and queue the inbound logs in the
+        # background; only the conversation history below waits for it
+        conversation_future = None
         if supabase:
-            try:
-                conversation = supabase.get_or_create_conversation(
-                    channel_id=event.get("channel"),
-                    user_id=user,
-                    context_type="private",
-                    thread_ts=event.get("thread_ts")
-                )
-                
-                # Log the user's message
-                supabase.log_message({
-                    "conversation_id": conversation["id"],
-                    "sender_type": "user",
-                    "sender_id": user,
-                    "content": text,
-                    "slack_message_ts": event.get("ts"),
-                    "metadata": {"event_type": "direct_message"}
-                })
-                
-                # Log activity
-                supabase.log_activity({
-                    "slack_user_id": user,
-                    "activity_type": "direct_message",
-                    "entity_type": "conversation",
-                    "entity_id": conversation["id"],
-                    "metadata": {"message_length": len(text)}
-                })
-            except Exception as e:
-                logger.error(f"Error logging DM conversation: {e}")
+            conversation_future = supabase.run_in_background(
+                _log_inbound_event,
+                supabase,
+                event,
+                "private",
+                "direct_message",
+                {"message_length": len(text)}
+            )
         
         # Use LLM for intelligent DM processing
         try:
             llm_service = get_llm_service()
             
+            # Extract intent while the conversation is being resolved
+            intent_data = run_sync(llm_service.extract_intent(text))
+            
             # Get conversation history for context
+            conversation = None
             conversation_history = []
-            if conversation and supabase:
+            if conversation_future:
                 try:
-                    messages = supabase.get_conversation_messages(conversation["id"], limit=5)
-                    for msg in messages[-4:]:  # Last 4 messages for context
-                        role = "assistant" if msg.get("sender_type") == "bot" else "user"
-                        conversation_history.append({
-                            "role": role,
-                            "content": msg.get("content", "")
-                        })
+                    conversation = conversation_future.result(BACKGROUND_RESULT_TIMEOUT)
+                    if conversation:
+                        conversation_history = get_conversation_history(supabase, conversation["id"])
                 except Exception as e:
                     logger.warning(f"Could not get conversation history: {e}")
             
-            # Extract intent
-            intent_data = llm_service.extract_intent(text)
-            
             # Generate intelligent response for private context
             user_context = {
                 "user_id": user,
@@ -255,18 +249,21 @@ def handle_message(event: Dict[str, Any], say: Any, context: BoltContext) -> Non
                 "is_direct_message": True
             }
             
-            llm_response = llm_service.generate_response(
+            llm_response = run_sync(get_batching_llm().generate_response(
                 user_message=text,
+                user_id=user,
+                channel_id=event.get("channel"),
                 conversation_context=conversation_history,
-                user_context=user_context
-            )
+                user_context=user_context,
+                conversation_id=conversation["id"] if conversation else None
+            ))
             
             say(llm_response)
             
             # Log the LLM interaction
-            if supabase and conversation:
+            if conversation:
                 try:
-                    supabase.log_message({
+                    supabase.queue_message({
                         "conversation_id": conversation["id"],
                         "sender_type": "bot",
                         "sender_id": "dona",
@@ -5,11 +5,10 @@ This middleware logs all incoming requests and responses for monitoring,
 debugging, and analytics purposes.
 """
 
-import json
 import time
 import logging
-from datetime import datetime
-from typing import Dict, Any, Optional
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional, TypedDict
 from uuid import uuid4
 
 from src.utils.metrics import metrics_collector
@@ -17,11 +16,19 @@ from src.utils.metrics import metrics_collector
 logger = logging.getLogger(__name__)
 
 
+class RequestRecord(TypedDict):
+    """In-flight request data tracked by RequestLogger."""
+    type: str
+    user_id: str
+    start_time: float
+    metadata: Dict[str, Any]
+
+
 class RequestLogger:
     """Tracks and logs request metrics."""
     
-    def __init__(self):
-        self.active_requests: Dict[str, Dict[str, Any]] = {}
+    def __init__(self) -> None:
+        self.active_requests: Dict[str, RequestRecord] = {}
     
     def start_request(self, request_id: str, request_type: str, user_id: str, 
                       metadata: Optional[Dict[str, Any]] = None) -> None:
@@ -42,7 +49,7 @@ class RequestLogger:
         request_data = self.active_requests.pop(request_id)
         duration = time.time() - request_data['start_time']
         
-        metrics = {
+        metrics: Dict[str, Any] = {
             'request_id': request_id,
             'type': request_data['type'],
             'user_id': request_data['user_id'],
@@ -59,7 +66,24 @@ class RequestLogger:
 request_logger = RequestLogger()
 
 
-def logging_middleware(args, next):
+def _get_context(args: Any) -> Dict[str, Any]:
+    """
+    Return the request context, attaching an empty one if missing.
+    
+    Avoids ``getattr(args, 'context', {})``, which allocates a throwaway
+    dict on every call and silently drops writes when the attribute is absent.
+    """
+    context = getattr(args, 'context', None)
+    if context is None:
+        context = {}
+        try:
+            args.context = context
+        except AttributeError:
+            pass  # args does not accept new attributes; context is request-local
+    return context
+
+
+def logging_middleware(args: Any, next: Callable[[], None]) -> None:
     """
     Middleware that logs all incoming requests and their responses.
     
@@ -82,7 +106,7 @@ def logging_middleware(args, next):
     event = getattr(args, 'event', None)
     action = getattr(args, 'action', None)
     view = getattr(args, 'view', None)
-    context = getattr(args, 'context', {})
+    context = _get_context(args)
     
     if command:
         # Slash command
@@ -170,7 +194,7 @@ def logging_middleware(args, next):
     metadata = {
         'channel_id': channel_id,
         'team_id': team_id,
-        'timestamp': datetime.utcnow().isoformat()
+        'timestamp': datetime.now(timezone.utc).isoformat()
     }
     request_logger.start_request(request_id, request_type, user_id, metadata)
     
@@ -250,7 +274,7 @@ def logging_middleware(args, next):
         raise
 
 
-def performance_middleware(args, next):
+def performance_middleware(args: Any, next: Callable[[], None]) -> None:
     """
     Lightweight performance tracking middleware.
     
@@ -264,7 +288,7 @@ def performance_middleware(args, next):
         duration = time.time() - start_time
         
         # Get context properly from Args object
-        context = getattr(args, 'context', {})
+        context = _get_context(args)
         
         # Add performance data to context for other middleware
         if 'performance' not in context:
@@ -289,14 +313,14 @@ def performance_middleware(args, next):
             )
 
 
-def analytics_middleware(args, next):
+def analytics_middleware(args: Any, next: Callable[[], None]) -> None:
     """
     Middleware for collecting analytics data.
     
     Collects usage patterns for improving the bot.
     """
-    analytics_data = {
-        'timestamp': datetime.utcnow().isoformat(),
+    analytics_data: Dict[str, Any] = {
+        'timestamp': datetime.now(timezone.utc).isoformat(),
         'user_id': None,
         'team_id': None,
         'interaction_type': None,
@@ -306,7 +330,7 @@ def analytics_middleware(args, next):
     # Get references to args attributes
     command = getattr(args, 'command', None)
     event = getattr(args, 'event', None)
-    context = getattr(args, 'context', {})
+    context = _get_context(args)
     
     # Extract analytics data based on request type
     if command:
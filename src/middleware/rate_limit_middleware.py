@@ -6,7 +6,7 @@ abuse and ensure fair usage of the bot.
 """
 
 import logging
-from typing import Dict, Any, Callable
+from typing import Any, Callable, Dict, Optional
 
 from slack_bolt import Ack, Respond
 
@@ -16,7 +16,7 @@ from src.utils.metrics import metrics_collector
 logger = logging.getLogger(__name__)
 
 
-def rate_limit_middleware(args, next: Callable) -> None:
+def rate_limit_middleware(args: Any, next: Callable[[], None]) -> None:
     """
     Middleware to enforce rate limits on commands.
     
@@ -51,11 +51,11 @@ def rate_limit_middleware(args, next: Callable) -> None:
         _handle_rate_limit_exceeded(args, limit_info)
 
 
-def _handle_rate_limit_exceeded(args, limit_info: Dict[str, Any]) -> None:
+def _handle_rate_limit_exceeded(args: Any, limit_info: Dict[str, Any]) -> None:
     """Handle rate limit exceeded scenario."""
-    ack: Ack = getattr(args, "ack", None)
-    respond: Respond = getattr(args, "respond", None)
-    command = getattr(args, "command", {})
+    ack: Optional[Ack] = getattr(args, "ack", None)
+    respond: Optional[Respond] = getattr(args, "respond", None)
+    command: Dict[str, Any] = getattr(args, "command", None) or {}
     
     # Acknowledge immediately
     if ack:
@@ -110,7 +110,8 @@ def _handle_rate_limit_exceeded(args, limit_info: Dict[str, Any]) -> None:
 def cleanup_rate_limiter() -> None:
     """
     Periodic cleanup function for rate limiter.
-    Should be called periodically to prevent memory growth.
+    Bucket storage is bounded and stale buckets are dropped as new ones
+    are added; this sweep frees the rest when traffic is quiet.
     """
     try:
         removed = rate_limiter.cleanup_old_buckets()
@@ -120,7 +121,7 @@ def cleanup_rate_limiter() -> None:
         logger.error(f"Error during rate limiter cleanup: {e}", exc_info=True)
 
 
-def get_rate_limit_status(user_id: str, command: str = None) -> str:
+def get_rate_limit_status(user_id: str, command: Optional[str] = None) -> str:
     """
     Get formatted rate limit status for a user.
     
@@ -5,11 +5,21 @@ This module defines the data models used throughout the application
 for type safety and validation.
 """
 
-from datetime import datetime
+import sys
+from dataclasses import dataclass, fields
+from datetime import datetime, timezone
 from enum import Enum
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Union
 
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, TypeAdapter
+
+# dataclass(slots=True) needs Python 3.10+; older interpreters get regular dataclasses
+_SLOTS: Dict[str, Any] = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+def _utcnow() -> datetime:
+    """Current time as a timezone-aware UTC datetime."""
+    return datetime.now(timezone.utc)
 
 
 class TaskStatus(str, Enum):
@@ -37,7 +47,7 @@ class User(BaseModel):
     slack_workspace_id: str
     email: Optional[str] = None
     display_name: Optional[str] = None
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=_utcnow)
     updated_at: Optional[datetime] = None
 
 
@@ -52,15 +62,15 @@ class Task(BaseModel):
     status: TaskStatus = TaskStatus.PENDING
     priority: TaskPriority = TaskPriority.MEDIUM
     due_date: Optional[datetime] = None
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=_utcnow)
     updated_at: Optional[datetime] = None
     completed_at: Optional[datetime] = None
     
     def mark_completed(self) -> None:
         """Mark the task as completed."""
+        now = _utcnow()
         self.status = TaskStatus.COMPLETED
-        self.completed_at = datetime.utcnow()
-        self.updated_at = datetime.utcnow()
+        self.completed_at = self.updated_at = now
 
 
 class TimeEntry(BaseModel):
@@ -75,7 +85,7 @@ class TimeEntry(BaseModel):
     duration_seconds: Optional[int] = None
     description: Optional[str] = None
     is_active: bool = True
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=_utcnow)
     
     def calculate_duration(self) -> Optional[int]:
         """Calculate duration in seconds if end_time is set."""
@@ -87,7 +97,7 @@ class TimeEntry(BaseModel):
     
     def stop(self) -> None:
         """Stop the time entry."""
-        self.end_time = datetime.utcnow()
+        self.end_time = _utcnow()
         self.is_active = False
         self.calculate_duration()
 
@@ -127,8 +137,14 @@ class UserStats(BaseModel):
     active_time_entry: Optional[TimeEntry] = None
 
 
-class SlackCommand(BaseModel):
-    """Schema for Slack slash command data."""
+@dataclass(frozen=True, **_SLOTS)
+class SlackCommand:
+    """
+    Slack slash command data.
+    
+    A plain dataclass rather than a Pydantic model: Slack has already
+    verified the request, so the payload is taken as-is without validation.
+    """
     token: str
     team_id: str
     team_domain: str
@@ -140,16 +156,71 @@ class SlackCommand(BaseModel):
     text: str
     response_url: str
     trigger_id: str
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SlackCommand":
+        """Build a command from a Slack payload, ignoring unknown keys."""
+        return cls(**{name: data[name] for name in _SLACK_COMMAND_FIELDS})
 
 
-class SlackEvent(BaseModel):
-    """Schema for Slack event data."""
+@dataclass(frozen=True, **_SLOTS)
+class SlackEvent:
+    """Slack event data, taken from the already-verified payload without validation."""
     type: str
+    ts: str
+    event_ts: str
     user: Optional[str] = None
     text: Optional[str] = None
-    ts: str
     channel: Optional[str] = None
-    event_ts: str
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SlackEvent":
+        """Build an event from a Slack payload, ignoring unknown keys."""
+        return cls(
+            type=data["type"],
+            ts=data["ts"],
+            event_ts=data["event_ts"],
+            user=data.get("user"),
+            text=data.get("text"),
+            channel=data.get("channel")
+        )
+
+
+_SLACK_COMMAND_FIELDS = tuple(field.name for field in fields(SlackCommand))
+
+# Parse-and-validate raw JSON bodies in a single pass (no json.loads round-trip)
+_SLACK_COMMAND_ADAPTER = TypeAdapter(SlackCommand)
+_SLACK_EVENT_ADAPTER = TypeAdapter(SlackEvent)
+
+
+def parse_slack_command(raw_body: Union[str, bytes]) -> SlackCommand:
+    """
+    Parse and validate a raw JSON slash-command body.
+    
+    Payloads Bolt has already decoded should use ``SlackCommand.from_dict``.
+    
+    Args:
+        raw_body: JSON document as received
+        
+    Returns:
+        Validated SlackCommand
+    """
+    return _SLACK_COMMAND_ADAPTER.validate_json(raw_body)
+
+
+def parse_slack_event(raw_body: Union[str, bytes]) -> SlackEvent:
+    """
+    Parse and validate a raw JSON event body.
+    
+    Payloads Bolt has already decoded should use ``SlackEvent.from_dict``.
+    
+    Args:
+        raw_body: JSON document as received
+        
+    Returns:
+        Validated SlackEvent
+    """
+    return _SLACK_EVENT_ADAPTER.validate_json(raw_body)
 
 
 class ConversationContext(BaseModel):
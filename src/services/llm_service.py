@@ -5,15 +5,142 @@ This module provides LLM capabilities for natural language understanding
 and generation in the Autónomos Dona assistant.
 """
 
+import asyncio
+import functools
+import hashlib
 import logging
-from typing import Dict, Any, Optional, List
-import requests
-import json
+import re
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Dict, FrozenSet, List, NamedTuple, Optional, Tuple
+
+import httpx
+import orjson
+from cachetools import TTLCache
 
 from src.utils.config import settings
 
+try:
+    import tiktoken
+except ImportError:  # Optional: fall back to a character-based estimate
+    tiktoken = None
+
 logger = logging.getLogger(__name__)
 
+GROQ_BASE_URL = "https://api.groq.com"
+CHAT_COMPLETIONS_PATH = "/openai/v1/chat/completions"
+
+# Rolling summarization: once the recent context is estimated above this many
+# tokens, older turns are compressed into a short summary
+SUMMARY_TOKEN_THRESHOLD = 600
+SUMMARY_MAX_TOKENS = 80
+VERBATIM_TURNS = 2
+# Turns the current summary doesn't cover are sent verbatim; the summary is
+# only refreshed once they add up to this many tokens
+SUMMARY_REFRESH_TOKENS = 300
+# Upper bound for conversation context sent with each request
+CONTEXT_TOKEN_BUDGET = 2000
+SUMMARY_PROMPT = (
+    "Resume la siguiente conversación en un máximo de 60 palabras. "
+    "Conserva nombres, fechas, tareas y decisiones; omite saludos."
+)
+# Prefix for several messages answered by one call; the reply is split on the numbering
+BATCH_PROMPT = (
+    "Responde por separado a cada uno de los siguientes mensajes, "
+    "usando la misma numeración:"
+)
+
+# Rule-based intent keywords in priority order, with (confidence, suggested command)
+_INTENT_RULES = (
+    ("task", ("task", "tarea", "hacer", "create", "crear"), 7, "/dona-task create"),
+    ("reminder", ("remind", "recordar", "recordatorio", "reminder"), 7, "/dona-remind"),
+    ("help", ("help", "ayuda", "commands", "comandos"), 8, "/dona-help"),
+    ("summary", ("summary", "resumen", "status", "estado"), 7, "/dona-summary"),
+)
+_INTENT_PRIORITY = {intent: rank for rank, (intent, _, _, _) in enumerate(_INTENT_RULES)}
+_INTENT_RESULTS = {intent: (confidence, command) for intent, _, confidence, command in _INTENT_RULES}
+_INTENT_RESULTS["question"] = (5, None)
+
+# One alternation with a named group per intent: a single scan finds every intent present
+_INTENT_PATTERN = re.compile("|".join(
+    f"(?P<{intent}>{'|'.join(map(re.escape, keywords))})"
+    for intent, keywords, _, _ in _INTENT_RULES
+))
+
+
+@functools.lru_cache(maxsize=2048)
+def _classify_cached(message_lower: str) -> Tuple[str, int, Optional[str]]:
+    """Classify a lowercased message, returning (intent, confidence, suggested_command)."""
+    matched = {match.lastgroup for match in _INTENT_PATTERN.finditer(message_lower)}
+    intent = min(matched, key=_INTENT_PRIORITY.__getitem__) if matched else "question"
+    confidence, command = _INTENT_RESULTS[intent]
+    return intent, confidence, command
+
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_TRAILING_PUNCTUATION = ".!?¡¿,;: "
+
+
+def _normalize_message(message: str) -> str:
+    """Normalize a message for response-cache lookups."""
+    return _WHITESPACE_RE.sub(" ", message.lower()).strip(_TRAILING_PUNCTUATION)
+
+
+def _turn_fingerprint(turn: Dict[str, Any]) -> bytes:
+    """Identify a conversation turn by its role and content."""
+    return hashlib.blake2b(
+        f"{turn.get('role')}\0{turn.get('content')}".encode(), digest_size=8
+    ).digest()
+
+
+@functools.lru_cache(maxsize=8)
+def get_encoder(model: str) -> Optional[Any]:
+    """
+    Get the tokenizer for a model, or None when tiktoken is not installed.
+    
+    Args:
+        model: Model name
+        
+    Returns:
+        tiktoken encoding, falling back to cl100k_base for unknown models
+    """
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
+
+def count_tokens(msg: Dict[str, Any], model: str) -> int:
+    """
+    Count the tokens in a message, caching the result on the message dict.
+    
+    The count is stored under ``token_count``; code that changes a message's
+    content must drop that key so it is recomputed.
+    
+    Args:
+        msg: Chat message with a ``content`` field
+        model: Model name used to pick the tokenizer
+        
+    Returns:
+        Number of tokens in the message content
+    """
+    cached = msg.get("token_count")
+    if cached is not None:
+        logger.debug("Token count cache hit")
+        return cached
+    
+    logger.debug("Token count cache miss")
+    content = msg.get("content") or ""
+    encoder = get_encoder(model)
+    count = len(encoder.encode(content)) if encoder else len(content) // 4
+    msg["token_count"] = count
+    return count
+
+
+# Splits a batched reply on its "1. ", "2) " ... item markers
+_NUMBERED_ITEM_RE = re.compile(r"^\s*(\d+)[.)]\s+", re.MULTILINE)
+
 
 class LLMService:
     """Service for LLM interactions using Groq API."""
@@ -22,12 +149,21 @@ class LLMService:
         """Initialize the LLM service."""
         self.api_key = settings.GROQ_API_KEY
         self.model = settings.GROQ_MODEL
-        self.base_url = "https://api.groq.com/openai/v1/chat/completions"
+        self.base_url = GROQ_BASE_URL
         self.headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json"
         }
         
+        # One persistent HTTP/2 client so every call reuses the TLS session
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            headers=self.headers,
+            http2=True,
+            timeout=30,
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=50)
+        )
+        
         # System prompt for Dona
         self.system_prompt = """
 Eres Dona, una asistente ejecutiva AI especializada en ayudar al equipo fundador de la startup Autónomos. 
@@ -49,8 +185,24 @@ Contexto: Trabajas dentro de Slack como bot integrado. Puedes ejecutar comandos
 
 Responde de manera concisa y accionable. Si el usuario necesita hacer algo específico, sugiere el comando apropiado.
 """
+        
+        # Static prompt prefix, built once so every request starts with
+        # byte-identical content and provider-side prefix caching can apply
+        self._system_message = {"role": "system", "content": self.system_prompt}
+        
+        # Exact-match response cache keyed by model, normalized message and context
+        self._response_cache: TTLCache = TTLCache(maxsize=4096, ttl=900)
+        
+        # Rolling summaries of older turns per (user_id, channel_id), refreshed in
+        # the background; each entry is (fingerprints of covered turns, summary)
+        self._summaries: TTLCache = TTLCache(maxsize=1024, ttl=3600)
+        self._summary_tasks: Dict[Tuple[str, str], asyncio.Task] = {}
+    
+    async def aclose(self) -> None:
+        """Close the underlying HTTP client and its pooled connections."""
+        await self._client.aclose()
     
-    def generate_response(
+    async def generate_response(
         self,
         user_message: str,
         conversation_context: Optional[List[Dict[str, str]]] = None,
@@ -67,46 +219,123 @@ Responde de manera concisa y accionable. Si el usuario necesita hacer algo espec
         Returns:
             Generated response from the LLM
         """
+        cache_key, payload = self._prepare_request(user_message, conversation_context, user_context)
+        cached = self._response_cache.get(cache_key)
+        if cached is not None:
+            logger.debug("LLM response served from cache")
+            return cached
+        
         try:
-            # Build messages for the API
-            messages = [{"role": "system", "content": self.system_prompt}]
-            
-            # Add conversation context if provided
-            if conversation_context:
-                messages.extend(conversation_context[-5:])  # Last 5 messages for context
-            
-            # Add current user message
-            messages.append({"role": "user", "content": user_message})
-            
-            # Prepare request payload
-            payload = {
-                "model": self.model,
-                "messages": messages,
-                "max_tokens": 1000,
-                "temperature": 0.7,
-                "top_p": 0.9
-            }
-            
             # Make API request
-            response = requests.post(
-                self.base_url,
-                headers=self.headers,
-                json=payload,
-                timeout=30
-            )
+            response = await self._client.post(CHAT_COMPLETIONS_PATH, content=orjson.dumps(payload))
             
             if response.status_code == 200:
-                result = response.json()
-                return result["choices"][0]["message"]["content"].strip()
+                result = orjson.loads(response.content)
+                self._log_cache_usage(result)
+                content = result["choices"][0]["message"]["content"].strip()
+                self._response_cache[cache_key] = content
+                return content
             else:
                 logger.error(f"Groq API error: {response.status_code} - {response.text}")
-                return self._get_fallback_response(user_message)
+                return self._get_fallback_response(user_message, self._known_intent(user_context))
                 
         except Exception as e:
             logger.error(f"Error generating LLM response: {e}")
-            return self._get_fallback_response(user_message)
+            return self._get_fallback_response(user_message, self._known_intent(user_context))
     
-    def extract_intent(self, user_message: str) -> Dict[str, Any]:
+    async def stream_response(
+        self,
+        user_message: str,
+        conversation_context: Optional[List[Dict[str, str]]] = None,
+        user_context: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[str]:
+        """
+        Generate a response, yielding text deltas as the LLM produces them.
+        
+        Args:
+            user_message: The user's input message
+            conversation_context: Previous messages in the conversation
+            user_context: Additional context about the user/situation
+            
+        Yields:
+            Consecutive pieces of the response text
+        """
+        cache_key, payload = self._prepare_request(user_message, conversation_context, user_context)
+        cached = self._response_cache.get(cache_key)
+        if cached is not None:
+            logger.debug("LLM response served from cache")
+            yield cached
+            return
+        
+        payload["stream"] = True
+        parts: List[str] = []
+        completed = False
+        try:
+            async with self._client.stream(
+                "POST", CHAT_COMPLETIONS_PATH, content=orjson.dumps(payload)
+            ) as response:
+                if response.status_code != 200:
+                    body = await response.aread()
+                    logger.error(f"Groq API error: {response.status_code} - {body[:500]!r}")
+                else:
+                    async for line in response.aiter_lines():
+                        if not line.startswith("data:"):
+                            continue
+                        data = line[5:].strip()
+                        if data == "[DONE]":
+                            break
+                        delta = orjson.loads(data)["choices"][0]["delta"].get("content")
+                        if delta:
+                            parts.append(delta)
+                            yield delta
+                    completed = True
+        except Exception as e:
+            logger.error(f"Error streaming LLM response: {e}")
+            # Part of the reply has already been sent; let the caller deal
+            # with the truncated message rather than appending a fallback
+            if parts:
+                raise
+        
+        if not parts:
+            yield self._get_fallback_response(user_message, self._known_intent(user_context))
+        elif completed:
+            # Only complete replies are cached, never a stream cut off midway
+            self._response_cache[cache_key] = "".join(parts).strip()
+    
+    def _prepare_request(
+        self,
+        user_message: str,
+        conversation_context: Optional[List[Dict[str, str]]],
+        user_context: Optional[Dict[str, Any]]
+    ) -> Tuple[str, Dict[str, Any]]:
+        """Build the response-cache key and chat-completions payload for a message."""
+        recent_context = conversation_context[-5:] if conversation_context else []
+        recent_context = self._compress_context(recent_context, user_context)
+        recent_context = self._fit_to_budget(recent_context)
+        
+        # Build messages for the API
+        messages = [self._system_message]
+        
+        # Add conversation context if provided
+        # Only role and content are sent; the cached token_count stays local
+        messages.extend(
+            {"role": message["role"], "content": message["content"]}
+            for message in recent_context
+        )
+        
+        # Add current user message
+        messages.append({"role": "user", "content": user_message})
+        
+        payload = {
+            "model": self.model,
+            "messages": messages,
+            "max_tokens": 1000,
+            "temperature": 0.7,
+            "top_p": 0.9
+        }
+        return self._response_cache_key(user_message, recent_context), payload
+    
+    async def extract_intent(self, user_message: str) -> Dict[str, Any]:
         """
         Extract intent and entities from user message.
         
@@ -141,21 +370,20 @@ Responde solo con JSON válido:
                 "temperature": 0.3
             }
             
-            response = requests.post(
-                self.base_url,
-                headers=self.headers,
-                json=payload,
+            response = await self._client.post(
+                CHAT_COMPLETIONS_PATH,
+                content=orjson.dumps(payload),
                 timeout=15
             )
             
             if response.status_code == 200:
-                result = response.json()
+                result = orjson.loads(response.content)
                 content = result["choices"][0]["message"]["content"].strip()
                 
                 # Try to parse JSON response
                 try:
-                    return json.loads(content)
-                except json.JSONDecodeError:
+                    return orjson.loads(content)
+                except orjson.JSONDecodeError:
                     # Fallback if JSON parsing fails
                     return self._classify_intent_simple(user_message)
             else:
@@ -165,50 +393,168 @@ Responde solo con JSON válido:
             logger.error(f"Error extracting intent: {e}")
             return self._classify_intent_simple(user_message)
     
+    def _compress_context(
+        self,
+        context: List[Dict[str, str]],
+        user_context: Optional[Dict[str, Any]]
+    ) -> List[Dict[str, str]]:
+        """
+        Replace older turns with a rolling summary once the context grows too large.
+        
+        The last ``VERBATIM_TURNS`` turns are always kept as-is, and so is any
+        older turn the cached summary doesn't cover yet. Summaries are produced
+        by a background call and used from the next request on, so this never
+        adds latency to the current one. At most one summarization runs per
+        conversation, and a new one starts only once the uncovered turns reach
+        ``SUMMARY_REFRESH_TOKENS``.
+        
+        Args:
+            context: Recent conversation messages
+            user_context: Additional context carrying ``user_id`` and ``channel_id``
+            
+        Returns:
+            Messages to send in place of ``context``
+        """
+        if len(context) <= VERBATIM_TURNS or not user_context:
+            return context
+        
+        key = (user_context.get("user_id"), user_context.get("channel_id"))
+        if not all(key):
+            return context
+        
+        older, latest = context[:-VERBATIM_TURNS], context[-VERBATIM_TURNS:]
+        older_tokens = self._count_tokens(older)
+        if older_tokens + self._count_tokens(latest) <= SUMMARY_TOKEN_THRESHOLD:
+            return context
+        
+        fingerprints = [_turn_fingerprint(turn) for turn in older]
+        covered, summary = self._summaries.get(key, (frozenset(), None))
+        uncovered = [turn for turn, fingerprint in zip(older, fingerprints) if fingerprint not in covered]
+        
+        refresh_due = summary is None or self._count_tokens(uncovered) >= SUMMARY_REFRESH_TOKENS
+        if refresh_due and key not in self._summary_tasks:
+            task = asyncio.create_task(
+                self._refresh_summary(key, summary, uncovered, frozenset(fingerprints))
+            )
+            self._summary_tasks[key] = task
+            task.add_done_callback(lambda _: self._summary_tasks.pop(key, None))
+        
+        if summary is None:
+            return context
+        
+        summary_message = {"role": "system", "content": f"Resumen de la conversación previa: {summary}"}
+        saved = older_tokens - self._count_tokens([summary_message, *uncovered])
+        logger.debug(f"Context summarized for {key}: ~{saved} tokens saved")
+        return [summary_message, *uncovered, *latest]
+    
+    async def _refresh_summary(
+        self,
+        key: Tuple[str, str],
+        previous: Optional[str],
+        turns: List[Dict[str, str]],
+        covered: FrozenSet[bytes]
+    ) -> None:
+        """
+        Fold new turns into the rolling summary for ``key`` with a short LLM call.
+        
+        Args:
+            key: (user_id, channel_id) the summary belongs to
+            previous: Current summary, if any
+            turns: Older turns the current summary doesn't cover
+            covered: Fingerprints of every older turn the new summary will cover
+        """
+        lines = [f"{turn.get('role')}: {turn.get('content')}" for turn in turns]
+        if previous:
+            lines.insert(0, f"Resumen previo: {previous}")
+        transcript = "\n".join(lines)
+        payload = {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": SUMMARY_PROMPT},
+                {"role": "user", "content": transcript}
+            ],
+            "max_tokens": SUMMARY_MAX_TOKENS,
+            "temperature": 0.3
+        }
+        
+        try:
+            response = await self._client.post(
+                CHAT_COMPLETIONS_PATH,
+                content=orjson.dumps(payload),
+                timeout=15
+            )
+            if response.status_code == 200:
+                result = orjson.loads(response.content)
+                self._summaries[key] = (covered, result["choices"][0]["message"]["content"].strip())
+            else:
+                logger.warning(f"Context summarization failed: {response.status_code}")
+        except Exception as e:
+            logger.warning(f"Error summarizing context: {e}")
+    
+    def _count_tokens(self, messages: List[Dict[str, Any]]) -> int:
+        """Total tokens across messages, using each message's cached count."""
+        return sum(count_tokens(message, self.model) for message in messages)
+    
+    def _fit_to_budget(self, context: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Drop the oldest messages until the context fits ``CONTEXT_TOKEN_BUDGET``."""
+        total = self._count_tokens(context)
+        start = 0
+        while total > CONTEXT_TOKEN_BUDGET and start < len(context) - 1:
+            total -= count_tokens(context[start], self.model)
+            start += 1
+        if start:
+            logger.debug(f"Dropped {start} context messages to fit the token budget")
+        return context[start:]
+    
+    def _response_cache_key(self, user_message: str, context: List[Dict[str, str]]) -> str:
+        """Build the response-cache key for a message and its conversation context."""
+        context_digest = hashlib.blake2b(orjson.dumps(context), digest_size=16).hexdigest()
+        raw = f"{self.model}|{_normalize_message(user_message)}|{context_digest}"
+        return hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()
+    
+    @staticmethod
+    def _log_cache_usage(result: Dict[str, Any]) -> None:
+        """Log how many prompt tokens were served from the provider's prefix cache."""
+        usage = result.get("usage") or {}
+        details = usage.get("prompt_tokens_details") or {}
+        logger.debug(
+            f"LLM usage: prompt_tokens={usage.get('prompt_tokens')}, "
+            f"cached_tokens={details.get('cached_tokens', 0)}"
+        )
+    
     def _classify_intent_simple(self, message: str) -> Dict[str, Any]:
         """Simple rule-based intent classification fallback."""
-        message_lower = message.lower()
-        
-        if any(word in message_lower for word in ["task", "tarea", "hacer", "create", "crear"]):
-            return {
-                "intent": "task",
-                "entities": {},
-                "confidence": 7,
-                "suggested_command": "/dona-task create"
-            }
-        elif any(word in message_lower for word in ["remind", "recordar", "recordatorio", "reminder"]):
-            return {
-                "intent": "reminder",
-                "entities": {},
-                "confidence": 7,
-                "suggested_command": "/dona-remind"
-            }
-        elif any(word in message_lower for word in ["help", "ayuda", "commands", "comandos"]):
-            return {
-                "intent": "help",
-                "entities": {},
-                "confidence": 8,
-                "suggested_command": "/dona-help"
-            }
-        elif any(word in message_lower for word in ["summary", "resumen", "status", "estado"]):
-            return {
-                "intent": "summary",
-                "entities": {},
-                "confidence": 7,
-                "suggested_command": "/dona-summary"
-            }
-        else:
-            return {
-                "intent": "question",
-                "entities": {},
-                "confidence": 5,
-                "suggested_command": None
-            }
+        intent, confidence, suggested_command = _classify_cached(message.lower())
+        return {
+            "intent": intent,
+            "entities": {},
+            "confidence": confidence,
+            "suggested_command": suggested_command
+        }
     
-    def _get_fallback_response(self, user_message: str) -> str:
-        """Generate a fallback response when LLM is unavailable."""
-        intent_data = self._classify_intent_simple(user_message)
-        intent = intent_data["intent"]
+    @staticmethod
+    def _known_intent(user_context: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Intent the caller already extracted for this message, if any."""
+        return user_context.get("intent") if user_context else None
+    
+    def _get_fallback_response(
+        self,
+        user_message: str,
+        intent_data: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """
+        Generate a fallback response when LLM is unavailable.
+        
+        Args:
+            user_message: The user's input message
+            intent_data: Intent already extracted for the message; classified here if omitted
+            
+        Returns:
+            Canned response for the message's intent
+        """
+        if intent_data is None:
+            intent_data = self._classify_intent_simple(user_message)
+        intent = intent_data.get("intent")
         
         fallback_responses = {
             "task": "Entiendo que quieres gestionar tareas. Usa `/dona-task create [descripción]` para crear una nueva tarea.",
@@ -221,8 +567,154 @@ Responde solo con JSON válido:
         return fallback_responses.get(intent, fallback_responses["question"])
 
 
+class _BatchItem(NamedTuple):
+    """A queued message waiting for its share of a batched reply."""
+    
+    message: str
+    conversation_context: Optional[List[Dict[str, str]]]
+    user_context: Optional[Dict[str, Any]]
+    conversation_id: Optional[str]
+    future: "asyncio.Future[str]"
+
+
+class BatchingLLM:
+    """
+    Coalesces bursts of messages from one user in one conversation into a single LLM call.
+    
+    A message is sent as soon as nothing else is in flight for its user and
+    channel. Messages that arrive while a call is running queue up and are
+    answered together by the next call (up to ``max_batch``) as one numbered
+    prompt, with the reply split back per message. Only messages from the
+    same conversation are batched, so each answer has its own history.
+    """
+    
+    def __init__(self, llm_service: LLMService, max_batch: int = 8):
+        """
+        Initialize the batching wrapper.
+        
+        Args:
+            llm_service: Service used to generate responses
+            max_batch: Maximum number of messages answered by one call
+        """
+        self.llm_service = llm_service
+        self.max_batch = max_batch
+        self._queues: Dict[Tuple[str, str], Deque[_BatchItem]] = {}
+        self._workers: Dict[Tuple[str, str], asyncio.Task] = {}
+    
+    async def generate_response(
+        self,
+        user_message: str,
+        user_id: str,
+        channel_id: str,
+        conversation_context: Optional[List[Dict[str, str]]] = None,
+        user_context: Optional[Dict[str, Any]] = None,
+        conversation_id: Optional[str] = None
+    ) -> str:
+        """
+        Queue a message for its (user, channel) batch and wait for its answer.
+        
+        Args:
+            user_message: The user's input message
+            user_id: Slack user ID
+            channel_id: Slack channel ID
+            conversation_context: Previous messages in the conversation
+            user_context: Additional context about the user/situation
+            conversation_id: Conversation the message belongs to, if known
+            
+        Returns:
+            Generated response for this message
+        """
+        key = (user_id, channel_id)
+        future = asyncio.get_running_loop().create_future()
+        
+        queue = self._queues.get(key)
+        if queue is None:
+            queue = self._queues[key] = deque()
+        queue.append(_BatchItem(user_message, conversation_context, user_context, conversation_id, future))
+        
+        if key not in self._workers:
+            self._workers[key] = asyncio.create_task(self._drain(key, queue))
+        
+        return await future
+    
+    async def _drain(self, key: Tuple[str, str], queue: Deque[_BatchItem]) -> None:
+        """Flush batches for one (user, channel) until its queue is empty."""
+        try:
+            while queue:
+                # Take whatever is already waiting; nothing is held back for
+                # a timer, so a lone message goes out immediately
+                batch = [queue.popleft()]
+                while queue and len(batch) < self.max_batch and self._same_conversation(batch[0], queue[0]):
+                    batch.append(queue.popleft())
+                
+                await self._flush(batch)
+        finally:
+            self._workers.pop(key, None)
+            if not queue:
+                self._queues.pop(key, None)
+    
+    @staticmethod
+    def _same_conversation(first: _BatchItem, item: _BatchItem) -> bool:
+        """Check whether two messages can share one call and its context."""
+        if first.conversation_id is not None or item.conversation_id is not None:
+            return first.conversation_id == item.conversation_id
+        return first.conversation_context == item.conversation_context
+    
+    async def _flush(self, batch: List[_BatchItem]) -> None:
+        """Answer a batch and resolve each caller's future with its own reply."""
+        futures = [item.future for item in batch]
+        try:
+            if len(batch) == 1:
+                item = batch[0]
+                replies = [await self.llm_service.generate_response(
+                    item.message, item.conversation_context, item.user_context
+                )]
+            else:
+                replies = await self._answer_batch(batch)
+            
+            for future, reply in zip(futures, replies):
+                if not future.done():
+                    future.set_result(reply)
+        except Exception as e:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+    
+    async def _answer_batch(self, batch: List[_BatchItem]) -> List[str]:
+        """Ask for all messages in one call, falling back to per-message calls."""
+        # All items share a conversation; the newest one's history is the most complete
+        latest = batch[-1]
+        numbered = "\n".join(f"{i}. {item.message}" for i, item in enumerate(batch, 1))
+        prompt = f"{BATCH_PROMPT}\n{numbered}"
+        
+        reply = await self.llm_service.generate_response(prompt, latest.conversation_context, latest.user_context)
+        parts = self._split_numbered(reply, len(batch))
+        if parts is not None:
+            logger.debug(f"Answered {len(batch)} batched messages with one LLM call")
+            return parts
+        
+        logger.debug("Batched reply was not numbered as expected; answering individually")
+        return list(await asyncio.gather(*(
+            self.llm_service.generate_response(item.message, item.conversation_context, item.user_context)
+            for item in batch
+        )))
+    
+    @staticmethod
+    def _split_numbered(reply: str, expected: int) -> Optional[List[str]]:
+        """Split a reply into its numbered items, or None if they don't line up."""
+        markers = list(_NUMBERED_ITEM_RE.finditer(reply))
+        if len(markers) != expected:
+            return None
+        if [int(m.group(1)) for m in markers] != list(range(1, expected + 1)):
+            return None
+        
+        ends = [m.start() for m in markers[1:]] + [len(reply)]
+        return [reply[m.end():end].strip() for m, end in zip(markers, ends)]
+
+
 # Global service instance
 _llm_service: Optional[LLMService] = None
+_batching_llm: Optional[BatchingLLM] = None
 
 
 def get_llm_service() -> LLMService:
@@ -230,4 +722,21 @@ def get_llm_service() -> LLMService:
     global _llm_service
     if _llm_service is None:
         _llm_service = LLMService()
-    return _llm_service
\ No newline at end of file
+    return _llm_service
+
+
+def get_batching_llm() -> BatchingLLM:
+    """Get or create the batching wrapper around the LLM service."""
+    global _batching_llm
+    if _batching_llm is None:
+        _batching_llm = BatchingLLM(get_llm_service())
+    return _batching_llm
+
+
+async def close_llm_service() -> None:
+    """Close the LLM service's HTTP client if the service was created."""
+    global _llm_service, _batching_llm
+    if _llm_service is not None:
+        await _llm_service.aclose()
+        _llm_service = None
+        _batching_llm = None
\ No newline at end of file
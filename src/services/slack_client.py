@@ -5,28 +5,98 @@ This module provides utility functions for common Slack operations
 and message formatting.
 """
 
+import asyncio
 import logging
-from typing import Dict, List, Any, Optional
+from typing import AsyncIterable, Dict, List, Any, Optional
 
+import aiohttp
+from cachetools import TTLCache
 from slack_sdk import WebClient
 from slack_sdk.errors import SlackApiError
+from slack_sdk.web.async_client import AsyncWebClient
 
 from src.utils.config import settings
 from src.utils.context_manager import ContextManager, ContextType
 
 logger = logging.getLogger(__name__)
 
+# Task status -> emoji shown in task lists
+_STATUS_EMOJI = {
+    "pending": ":white_circle:",
+    "in_progress": ":large_blue_circle:",
+    "completed": ":white_check_mark:",
+    "cancelled": ":x:"
+}
+
+# Task-list line templates with each status emoji baked in
+_TASK_LINE_TEMPLATE = "%%d. %s *%%s*\n   ID: `%%s...` | Priority: %%s"
+_FMT_BY_STATUS = {status: _TASK_LINE_TEMPLATE % emoji for status, emoji in _STATUS_EMOJI.items()}
+_FMT_DEFAULT = _FMT_BY_STATUS["pending"]
+
+# Minimum seconds between chat_update calls while streaming a reply (Slack rate limits)
+STREAM_UPDATE_INTERVAL = 0.3
+STREAM_PLACEHOLDER = ":hourglass_flowing_sand:"
+
+# Static skeleton of the task action buttons; only the action_id varies per task
+_TASK_ACTION_TEMPLATES = (
+    ("complete", {"type": "button", "text": {"type": "plain_text", "text": "Complete"}, "style": "primary"}),
+    ("edit", {"type": "button", "text": {"type": "plain_text", "text": "Edit"}}),
+    ("delete", {"type": "button", "text": {"type": "plain_text", "text": "Delete"}, "style": "danger"}),
+)
+
+
+def _fmt_task_line(index: int, task: Dict[str, Any]) -> str:
+    """Format one task as its two-line entry in a task list."""
+    # Use description as title since our tasks don't have separate title field
+    line_format = _FMT_BY_STATUS.get(task.get("status", "pending"), _FMT_DEFAULT)
+    return line_format % (
+        index,
+        task.get("description", "Untitled task"),
+        task.get("id", "")[:8],
+        task.get("priority", "medium")
+    )
+
 
 class SlackService:
     """Service class for Slack-specific operations and utilities."""
     
     def __init__(self):
-        """Initialize the Slack Web API client."""
-        self.client = WebClient(token=settings.SLACK_BOT_TOKEN)
-        self.context_manager = ContextManager(self.client)
+        """Initialize the Slack Web API clients."""
+        # Async client, created on the shared event loop by _get_client()
+        self.client: Optional[AsyncWebClient] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        # ContextManager lookups still run synchronously on Bolt worker threads
+        self.context_manager = ContextManager(WebClient(token=settings.SLACK_BOT_TOKEN))
+        
+        # DM channel id per user, so send_dm skips conversations_open after the first DM
+        self._dm_channels: TTLCache = TTLCache(maxsize=1024, ttl=3600)
+        # users_info responses; profiles rarely change and the endpoint is rate-limited.
+        # Only touched from the shared event loop, so no lock is needed.
+        self._user_info_cache: TTLCache = TTLCache(maxsize=4096, ttl=600)
         logger.info("Slack service initialized")
     
-    def get_user_info(self, user_id: str) -> Optional[Dict[str, Any]]:
+    def _get_client(self) -> AsyncWebClient:
+        """
+        Get the async client, creating it on first use.
+        
+        Must be called from a coroutine on the shared event loop: the
+        aiohttp session is bound to the running loop. Without a session
+        slack_sdk opens and closes one per API call, so every call would
+        pay a new connection and TLS handshake.
+        """
+        if self.client is None:
+            self._session = aiohttp.ClientSession()
+            self.client = AsyncWebClient(token=settings.SLACK_BOT_TOKEN, session=self._session)
+        return self.client
+    
+    async def aclose(self) -> None:
+        """Close the async client's aiohttp session, if one was opened."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self.client = None
+    
+    async def get_user_info(self, user_id: str) -> Optional[Dict[str, Any]]:
         """
         Get user information from Slack.
         
@@ -36,14 +106,21 @@ class SlackService:
         Returns:
             User information dict or None if error
         """
+        cached = self._user_info_cache.get(user_id)
+        if cached is not None:
+            return cached
+        
+        client = self._get_client()
         try:
-            response = self.client.users_info(user=user_id)
-            return response["user"]
+            response = await client.users_info(user=user_id)
+            user = response["user"]
+            self._user_info_cache[user_id] = user
+            return user
         except SlackApiError as e:
             logger.error(f"Error fetching user info: {e}")
             return None
     
-    def send_dm(self, user_id: str, text: str, blocks: Optional[List[Dict]] = None) -> bool:
+    async def send_dm(self, user_id: str, text: str, blocks: Optional[List[Dict]] = None) -> bool:
         """
         Send a direct message to a user.
         
@@ -55,13 +132,17 @@ class SlackService:
         Returns:
             True if successful, False otherwise
         """
+        client = self._get_client()
         try:
-            # Open a DM channel
-            response = self.client.conversations_open(users=[user_id])
-            channel_id = response["channel"]["id"]
+            # Open a DM channel, reusing the one opened for this user before
+            channel_id = self._dm_channels.get(user_id)
+            if channel_id is None:
+                response = await client.conversations_open(users=[user_id])
+                channel_id = response["channel"]["id"]
+                self._dm_channels[user_id] = channel_id
             
             # Send the message
-            self.client.chat_postMessage(
+            await client.chat_postMessage(
                 channel=channel_id,
                 text=text,
                 blocks=blocks
@@ -72,8 +153,8 @@ class SlackService:
             logger.error(f"Error sending DM: {e}")
             return False
     
-    def post_ephemeral(self, channel: str, user: str, text: str, 
-                      blocks: Optional[List[Dict]] = None) -> bool:
+    async def post_ephemeral(self, channel: str, user: str, text: str, 
+                            blocks: Optional[List[Dict]] = None) -> bool:
         """
         Post an ephemeral message (only visible to one user).
         
@@ -86,8 +167,9 @@ class SlackService:
         Returns:
             True if successful, False otherwise
         """
+        client = self._get_client()
         try:
-            self.client.chat_postEphemeral(
+            await client.chat_postEphemeral(
                 channel=channel,
                 user=user,
                 text=text,
@@ -99,6 +181,53 @@ class SlackService:
             logger.error(f"Error posting ephemeral message: {e}")
             return False
     
+    async def stream_message(self, channel: str, chunks: AsyncIterable[str], prefix: str = "") -> str:
+        """
+        Post a message and keep editing it as more text arrives.
+        
+        A placeholder is posted first, then the message is updated at most
+        every ``STREAM_UPDATE_INTERVAL`` seconds and once more when the
+        stream ends. If the stream or an update fails, the placeholder is
+        deleted before the error is raised, so a fallback reply posted by the
+        caller is the only message left in the channel.
+        
+        Args:
+            channel: Channel ID
+            chunks: Text pieces making up the message, in order
+            prefix: Text shown before the streamed content (e.g. a user mention)
+            
+        Returns:
+            The final message text
+        """
+        client = self._get_client()
+        response = await client.chat_postMessage(channel=channel, text=f"{prefix}{STREAM_PLACEHOLDER}")
+        ts = response["ts"]
+        
+        loop = asyncio.get_running_loop()
+        parts: List[str] = []
+        shown = ""
+        last_update = loop.time()
+        
+        try:
+            async for chunk in chunks:
+                parts.append(chunk)
+                if loop.time() - last_update >= STREAM_UPDATE_INTERVAL:
+                    shown = f"{prefix}{''.join(parts)}"
+                    await client.chat_update(channel=channel, ts=ts, text=shown)
+                    last_update = loop.time()
+            
+            text = f"{prefix}{''.join(parts).strip()}"
+            if text != shown:
+                await client.chat_update(channel=channel, ts=ts, text=text)
+            return text
+            
+        except Exception:
+            try:
+                await client.chat_delete(channel=channel, ts=ts)
+            except SlackApiError as e:
+                logger.error(f"Error deleting streamed message placeholder: {e}")
+            raise
+    
     @staticmethod
     def format_task_list(tasks: List[Dict[str, Any]]) -> str:
         """
@@ -113,25 +242,9 @@ class SlackService:
         if not tasks:
             return "_No tasks found_"
         
-        lines = ["*Your Tasks:*\n"]
-        
-        for i, task in enumerate(tasks, 1):
-            status_emoji = {
-                "pending": ":white_circle:",
-                "in_progress": ":large_blue_circle:",
-                "completed": ":white_check_mark:",
-                "cancelled": ":x:"
-            }.get(task.get("status", "pending"), ":white_circle:")
-            
-            # Use description as title since our tasks don't have separate title field
-            description = task.get("description", "Untitled task")
-            task_id = task.get("id", "")
-            priority = task.get("priority", "medium")
-            
-            lines.append(f"{i}. {status_emoji} *{description}*")
-            lines.append(f"   ID: `{task_id[:8]}...` | Priority: {priority}")
-        
-        return "\n".join(lines)
+        return "*Your Tasks:*\n\n" + "\n".join(
+            _fmt_task_line(i, task) for i, task in enumerate(tasks, 1)
+        )
     
     @staticmethod
     def format_time_duration(seconds: int) -> str:
@@ -144,16 +257,12 @@ class SlackService:
         Returns:
             Formatted duration string
         """
-        hours = seconds // 3600
-        minutes = (seconds % 3600) // 60
+        hours, remainder = divmod(seconds, 3600)
+        minutes = remainder // 60
         
-        parts = []
-        if hours > 0:
-            parts.append(f"{hours}h")
-        if minutes > 0 or hours == 0:
-            parts.append(f"{minutes}m")
-        
-        return " ".join(parts)
+        if not hours:
+            return f"{minutes}m"
+        return f"{hours}h {minutes}m" if minutes else f"{hours}h"
     
     @staticmethod
     def create_task_blocks(task: Dict[str, Any]) -> List[Dict[str, Any]]:
@@ -212,35 +321,12 @@ class SlackService:
             })
         
         # Add action buttons
+        task_id = task.get('id')
         blocks.append({
             "type": "actions",
             "elements": [
-                {
-                    "type": "button",
-                    "text": {
-                        "type": "plain_text",
-                        "text": "Complete"
-                    },
-                    "action_id": f"complete_task_{task.get('id')}",
-                    "style": "primary"
-                },
-                {
-                    "type": "button",
-                    "text": {
-                        "type": "plain_text",
-                        "text": "Edit"
-                    },
-                    "action_id": f"edit_task_{task.get('id')}"
-                },
-                {
-                    "type": "button",
-                    "text": {
-                        "type": "plain_text",
-                        "text": "Delete"
-                    },
-                    "action_id": f"delete_task_{task.get('id')}",
-                    "style": "danger"
-                }
+                {**template, "action_id": f"{action}_task_{task_id}"}
+                for action, template in _TASK_ACTION_TEMPLATES
             ]
         })
         
@@ -261,4 +347,11 @@ def get_slack_service() -> SlackService:
     global _slack_service
     if _slack_service is None:
         _slack_service = SlackService()
-    return _slack_service
\ No newline at end of file
+    return _slack_service
+
+async def close_slack_service() -> None:
+    """Close the Slack service's HTTP session if the service was created."""
+    global _slack_service
+    if _slack_service is not None:
+        await _slack_service.aclose()
+        _slack_service = None
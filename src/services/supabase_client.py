@@ -5,17 +5,156 @@ This module provides a service class for interacting with Supabase,
 handling all database operations for the Autónomos Dona bot.
 """
 
+import asyncio
 import logging
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+import threading
+from datetime import datetime, timedelta, timezone
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Set
+from uuid import UUID
 
+import httpx
+import orjson
+from cachetools import TTLCache
+from postgrest.types import ReturnMethod
 from supabase import create_client, Client
 
+from src.utils.async_runner import get_loop, run_sync
 from src.utils.config import settings
+from src.utils.retry import retry_db_operation
 from src.models.schemas import Task, TimeEntry, User
 
+try:
+    import asyncpg
+except ImportError:  # Optional: without it every query goes through PostgREST
+    asyncpg = None
+
+try:
+    import redis
+except ImportError:  # Optional: without it user lookups are not cached
+    redis = None
+
 logger = logging.getLogger(__name__)
 
+# Column projections for hot reads, limited to the fields callers use
+_TASK_COLUMNS = "id,assigned_to,description,status,priority,completed_at,created_at,updated_at"
+_TIME_ENTRY_COLUMNS = "id,user_id,task_id,start_time,end_time,duration_seconds,description,is_active"
+_MESSAGE_COLUMNS = "id,conversation_id,sender_type,sender_id,content,intent_detected,created_at"
+_PREFERENCE_COLUMNS = "id,user_id,language,timezone,notification_settings,working_hours"
+
+# Activity batches at least this large are written with COPY when the pool is available
+COPY_THRESHOLD = 5000
+
+# Seconds a handler waits for a background database result it depends on
+BACKGROUND_RESULT_TIMEOUT = 5.0
+
+# Shared asyncpg pool, created lazily on the async_runner loop
+_pool: Optional["asyncpg.Pool"] = None
+_pool_lock: Optional[asyncio.Lock] = None
+
+
+async def _init_connection(conn: "asyncpg.Connection") -> None:
+    """
+    Encode and decode JSON/JSONB columns with orjson.
+    
+    The codecs use the binary wire format so they also apply to COPY,
+    which asyncpg always runs in binary. Binary jsonb is a version byte
+    followed by the JSON text.
+    """
+    await conn.set_type_codec(
+        "json",
+        encoder=orjson.dumps,
+        decoder=orjson.loads,
+        schema="pg_catalog",
+        format="binary"
+    )
+    await conn.set_type_codec(
+        "jsonb",
+        encoder=lambda value: b"\x01" + orjson.dumps(value),
+        decoder=lambda data: orjson.loads(data[1:]),
+        schema="pg_catalog",
+        format="binary"
+    )
+
+
+async def get_pool() -> Optional["asyncpg.Pool"]:
+    """
+    Get the shared asyncpg pool, creating it on first use.
+    
+    Returns:
+        Connection pool, or None when SUPABASE_DB_URL is not configured
+    """
+    global _pool, _pool_lock
+    if _pool is not None or not settings.SUPABASE_DB_URL or asyncpg is None:
+        return _pool
+    
+    if _pool_lock is None:
+        _pool_lock = asyncio.Lock()
+    async with _pool_lock:
+        if _pool is None:
+            # Sized to stay well under the Supabase pooler's client limit.
+            # statement_cache_size=0: Supavisor transaction mode cannot keep prepared statements
+            _pool = await asyncpg.create_pool(
+                dsn=settings.SUPABASE_DB_URL,
+                min_size=settings.DB_POOL_MIN_SIZE,
+                max_size=settings.DB_POOL_MAX_SIZE,
+                max_inactive_connection_lifetime=1800,
+                timeout=30,
+                command_timeout=30,
+                statement_cache_size=0,
+                init=_init_connection
+            )
+            logger.info("Postgres connection pool created")
+    return _pool
+
+
+async def close_pool() -> None:
+    """Close the shared asyncpg pool if it was created."""
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
+
+
+class _OrjsonClient(httpx.Client):
+    """httpx client that encodes JSON request bodies with orjson instead of stdlib json."""
+    
+    def build_request(self, method: str, url: Any, *, json: Any = None, **kwargs: Any) -> httpx.Request:
+        if json is not None:
+            headers = httpx.Headers(kwargs.pop("headers", None))
+            headers["Content-Type"] = "application/json"
+            kwargs["headers"] = headers
+            kwargs["content"] = orjson.dumps(json, default=str)
+        return super().build_request(method, url, **kwargs)
+
+
+def _now_iso() -> str:
+    """Current UTC time as an ISO 8601 string with offset."""
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _with_created_at(row: Dict[str, Any], data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Carry over an explicit ``created_at``; otherwise the column default applies.
+    
+    Buffered writes are stamped when they are queued so a delayed flush
+    does not shift or reorder them.
+    """
+    if data.get("created_at"):
+        row["created_at"] = data["created_at"]
+    return row
+
+
+def _record_to_dict(record: "asyncpg.Record") -> Dict[str, Any]:
+    """Convert a row to the JSON-style dict PostgREST would have returned."""
+    row = dict(record)
+    for key, value in row.items():
+        if isinstance(value, UUID):
+            row[key] = str(value)
+        elif isinstance(value, datetime):
+            row[key] = value.isoformat()
+    return row
+
 
 class SupabaseService:
     """Service class for Supabase database operations."""
@@ -31,6 +170,157 @@ class SupabaseService:
         except Exception as e:
             logger.error(f"Failed to initialize Supabase client: {e}")
             raise
+        
+        # Settings read on hot paths, bound once
+        self._default_ws: str = settings.SLACK_WORKSPACE_ID
+        self._user_cache_ttl: int = settings.USER_CACHE_TTL
+        
+        # Long-lived PostgREST session with keep-alive and HTTP/2
+        self._http: Optional[httpx.Client] = self._tune_postgrest_session()
+        
+        # Per-event writes go straight to Postgres through the pool when configured
+        self.use_pool = bool(settings.SUPABASE_DB_URL) and asyncpg is not None
+        
+        # Message/activity writes queued by handlers, flushed in bulk
+        self.log_buffer = LogBuffer(self)
+        
+        # In-process (workspace, Slack user) -> user row cache; TTLCache is not
+        # thread-safe and Bolt runs handlers on a thread pool
+        self._users: TTLCache = TTLCache(maxsize=10_000, ttl=self._user_cache_ttl)
+        self._users_lock = threading.Lock()
+        
+        # Preferences rows by database user ID; they change rarely but are read per command
+        self._preferences: TTLCache = TTLCache(maxsize=10_000, ttl=60)
+        self._preferences_lock = threading.Lock()
+        
+        # Shared cache for the same lookups across processes
+        self.redis = None
+        if settings.REDIS_URL and redis is not None:
+            self.redis = redis.Redis.from_url(settings.REDIS_URL, decode_responses=True)
+    
+    def _tune_postgrest_session(self) -> Optional[httpx.Client]:
+        """
+        Swap the PostgREST session for one with tuned pool limits and HTTP/2.
+        
+        Connections and TLS sessions are reused across every table call and
+        request bodies are encoded with orjson; on failure the default
+        session stays in place.
+        
+        Returns:
+            The installed HTTP client, or None if the default was kept
+        """
+        try:
+            postgrest = self.client.postgrest
+            default_session = postgrest.session
+            session = _OrjsonClient(
+                base_url=str(default_session.base_url),
+                headers=dict(default_session.headers),
+                limits=httpx.Limits(
+                    max_connections=settings.SUPABASE_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.SUPABASE_KEEPALIVE
+                ),
+                timeout=httpx.Timeout(10.0),
+                http2=True
+            )
+            postgrest.session = session
+            default_session.close()
+            return session
+        except Exception as e:
+            logger.warning(f"Keeping default PostgREST session: {e}")
+            return None
+    
+    @staticmethod
+    def _user_cache_key(slack_user_id: str, slack_workspace_id: str) -> str:
+        """Redis key for a cached user row."""
+        return f"u:{slack_workspace_id}:{slack_user_id}"
+    
+    def _get_cached_user(self, key: str) -> Optional[Dict[str, Any]]:
+        """Read a user row from Redis, treating cache errors as misses."""
+        try:
+            cached = self.redis.get(key)
+        except Exception as e:
+            logger.warning(f"User cache read failed: {e}")
+            return None
+        return orjson.loads(cached) if cached else None
+    
+    def _cache_user(self, key: str, user: Dict[str, Any]) -> None:
+        """Store a user row in Redis; failures only cost a future cache miss."""
+        try:
+            self.redis.setex(key, self._user_cache_ttl, orjson.dumps(user, default=str))
+        except Exception as e:
+            logger.warning(f"User cache write failed: {e}")
+    
+    def invalidate_user_cache(self, slack_user_id: str, slack_workspace_id: str) -> None:
+        """
+        Drop a cached user row; call after updating the user.
+        
+        Args:
+            slack_user_id: Slack user ID
+            slack_workspace_id: Slack workspace ID
+        """
+        with self._users_lock:
+            self._users.pop((slack_workspace_id, slack_user_id), None)
+        
+        if self.redis is None:
+            return
+        try:
+            self.redis.delete(self._user_cache_key(slack_user_id, slack_workspace_id))
+        except Exception as e:
+            logger.warning(f"User cache invalidation failed: {e}")
+    
+    async def _insert_row(self, table: str, row: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Insert a row through the asyncpg pool.
+        
+        Args:
+            table: Table name
+            row: Column values
+            
+        Returns:
+            Inserted row
+        """
+        columns = list(row)
+        query = f"{self._insert_query(table, columns)} RETURNING *"
+        
+        pool = await get_pool()
+        record = await pool.fetchrow(query, *self._pool_values(row, columns))
+        return _record_to_dict(record)
+    
+    async def _insert_rows(self, table: str, rows: List[Dict[str, Any]]) -> None:
+        """Insert rows sharing the same columns through the asyncpg pool in one batch."""
+        columns = list(rows[0])
+        query = self._insert_query(table, columns)
+        
+        pool = await get_pool()
+        await pool.executemany(query, [self._pool_values(row, columns) for row in rows])
+    
+    async def _copy_rows(self, table: str, rows: List[Dict[str, Any]]) -> None:
+        """Write rows sharing the same columns through the asyncpg pool with COPY."""
+        columns = list(rows[0])
+        
+        pool = await get_pool()
+        async with pool.acquire() as conn:
+            await conn.copy_records_to_table(
+                table,
+                records=[self._pool_values(row, columns) for row in rows],
+                columns=columns
+            )
+    
+    @staticmethod
+    def _pool_values(row: Dict[str, Any], columns: List[str]) -> tuple:
+        """Row values in column order; asyncpg needs datetimes, not ISO strings."""
+        return tuple(
+            datetime.fromisoformat(row[column])
+            if column == "created_at" and isinstance(row[column], str)
+            else row[column]
+            for column in columns
+        )
+    
+    @staticmethod
+    def _insert_query(table: str, columns: List[str]) -> str:
+        """Build a parameterized INSERT for the given columns."""
+        placeholders = ", ".join(f"${i}" for i in range(1, len(columns) + 1))
+        return f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})"
     
     # User operations
     def get_or_create_user(self, slack_user_id: str, slack_workspace_id: str) -> Dict[str, Any]:
@@ -44,26 +334,38 @@ class SupabaseService:
         Returns:
             User data dictionary
         """
+        local_key = (slack_workspace_id, slack_user_id)
+        with self._users_lock:
+            user = self._users.get(local_key)
+        if user is not None:
+            return user
+        
+        cache_key = None
+        if self.redis is not None:
+            cache_key = self._user_cache_key(slack_user_id, slack_workspace_id)
+            user = self._get_cached_user(cache_key)
+        
+        if user is None:
+            user = self._upsert_user(slack_user_id, slack_workspace_id)
+            if cache_key:
+                self._cache_user(cache_key, user)
+        
+        with self._users_lock:
+            self._users[local_key] = user
+        return user
+    
+    def _upsert_user(self, slack_user_id: str, slack_workspace_id: str) -> Dict[str, Any]:
+        """Fetch or create a user row in the database, bypassing the caches."""
         try:
-            # Check if user exists
-            result = self.client.table("users").select("*").eq(
-                "slack_user_id", slack_user_id
-            ).eq(
-                "slack_workspace_id", slack_workspace_id
-            ).execute()
-            
-            if result.data:
-                return result.data[0]
-            
-            # Create new user
-            new_user = {
-                "slack_user_id": slack_user_id,
-                "slack_workspace_id": slack_workspace_id,
-                "created_at": datetime.utcnow().isoformat()
-            }
-            
-            result = self.client.table("users").insert(new_user).execute()
-            logger.info(f"Created new user: {slack_user_id}")
+            # Single INSERT ... ON CONFLICT DO UPDATE RETURNING: the conflict update
+            # only rewrites the key columns, so an existing row comes back unchanged
+            result = self._execute(self.client.table("users").upsert(
+                {
+                    "slack_user_id": slack_user_id,
+                    "slack_workspace_id": slack_workspace_id
+                },
+                on_conflict="slack_user_id,slack_workspace_id"
+            ))
             return result.data[0]
             
         except Exception as e:
@@ -88,8 +390,7 @@ class SupabaseService:
                 "description": task_data.get("description"),
                 "status": task_data.get("status", "pending"),
                 "priority": task_data.get("priority", "medium"),
-                "channel_id": task_data.get("channel_id"),
-                "created_at": datetime.utcnow().isoformat()
+                "channel_id": task_data.get("channel_id")
             }
             
             result = self.client.table("tasks").insert(task).execute()
@@ -109,15 +410,16 @@ class SupabaseService:
             status: Optional task status filter
             
         Returns:
-            List of tasks
+            List of tasks. ``assigned_to`` is the assignee's Slack user ID, so
+            callers can mention or DM the assignee without a users lookup.
         """
         try:
-            query = self.client.table("tasks").select("*").eq("assigned_to", user_id)
+            query = self.client.table("tasks").select(_TASK_COLUMNS).eq("assigned_to", user_id)
             
             if status:
                 query = query.eq("status", status)
             
-            result = query.order("created_at", desc=True).execute()
+            result = self._execute(query.order("created_at", desc=True))
             return result.data
             
         except Exception as e:
@@ -136,11 +438,10 @@ class SupabaseService:
             Updated task data
         """
         try:
-            updates["updated_at"] = datetime.utcnow().isoformat()
-            
-            result = self.client.table("tasks").update(updates).eq(
+            # updated_at is maintained by the update_tasks_updated_at trigger
+            result = self._execute(self.client.table("tasks").update(updates).eq(
                 "id", task_id
-            ).execute()
+            ))
             
             logger.info(f"Updated task {task_id}")
             return result.data[0]
@@ -150,30 +451,34 @@ class SupabaseService:
             raise
     
     # Conversation and message operations
-    def create_conversation(self, conversation_data: Dict[str, Any]) -> Dict[str, Any]:
+    def create_conversation(self, conversation_data: Dict[str, Any],
+                            db_user_id: Optional[str] = None) -> Dict[str, Any]:
         """
         Create a new conversation record.
         
         Args:
             conversation_data: Conversation information
+            db_user_id: Database user ID, if the caller already resolved it;
+                otherwise it is looked up from conversation_data["user_id"]
             
         Returns:
             Created conversation data
         """
         try:
-            # Get user ID from slack_user_id
-            user = self.get_or_create_user(
-                conversation_data["user_id"],
-                conversation_data.get("slack_workspace_id", settings.SLACK_WORKSPACE_ID)
-            )
+            if db_user_id is None:
+                # Get user ID from slack_user_id
+                user = self.get_or_create_user(
+                    conversation_data["user_id"],
+                    conversation_data.get("slack_workspace_id", self._default_ws)
+                )
+                db_user_id = user["id"]
             
             conversation = {
                 "slack_channel_id": conversation_data["slack_channel_id"],
                 "slack_thread_ts": conversation_data.get("slack_thread_ts"),
-                "user_id": user["id"],
+                "user_id": db_user_id,
                 "context_type": conversation_data["context_type"],
-                "status": conversation_data.get("status", "active"),
-                "created_at": datetime.utcnow().isoformat()
+                "status": conversation_data.get("status", "active")
             }
             
             result = self.client.table("conversations").insert(conversation).execute()
@@ -199,29 +504,18 @@ class SupabaseService:
             Conversation data
         """
         try:
-            # Get database user
-            user = self.get_or_create_user(user_id, settings.SLACK_WORKSPACE_ID)
-            
-            # Look for existing active conversation
-            query = self.client.table("conversations").select("*").eq(
-                "slack_channel_id", channel_id
-            ).eq("user_id", user["id"]).eq("status", "active")
-            
-            if thread_ts:
-                query = query.eq("slack_thread_ts", thread_ts)
-            
-            result = query.execute()
-            
-            if result.data:
-                return result.data[0]
-            
-            # Create new conversation
-            return self.create_conversation({
-                "slack_channel_id": channel_id,
-                "slack_thread_ts": thread_ts,
-                "user_id": user_id,
-                "context_type": context_type
-            })
+            # User upsert, active-conversation lookup and insert run in one database call
+            result = self._execute(self.client.rpc("find_or_create_conversation", {
+                "p_channel": channel_id,
+                "p_slack_user": user_id,
+                "p_workspace": self._default_ws,
+                "p_context": context_type,
+                "p_thread": thread_ts
+            }))
+            
+            # A function returning a single row comes back as an object, not a list
+            data = result.data
+            return data[0] if isinstance(data, list) else data
             
         except Exception as e:
             logger.error(f"Error in get_or_create_conversation: {e}", exc_info=True)
@@ -238,20 +532,14 @@ class SupabaseService:
             Created message data
         """
         try:
-            message = {
-                "conversation_id": message_data["conversation_id"],
-                "sender_type": message_data["sender_type"],
-                "sender_id": message_data["sender_id"],
-                "content": message_data["content"],
-                "slack_message_ts": message_data.get("slack_message_ts"),
-                "intent_detected": message_data.get("intent_detected"),
-                "metadata": message_data.get("metadata", {}),
-                "created_at": datetime.utcnow().isoformat()
-            }
+            message = self._message_row(message_data)
             
-            result = self.client.table("messages").insert(message).execute()
+            if self.use_pool:
+                logged = run_sync(self._insert_row("messages", message))
+            else:
+                logged = self.client.table("messages").insert(message).execute().data[0]
             logger.debug(f"Logged {message_data['sender_type']} message in conversation {message_data['conversation_id']}")
-            return result.data[0]
+            return logged
             
         except Exception as e:
             logger.error(f"Error logging message: {e}", exc_info=True)
@@ -268,23 +556,10 @@ class SupabaseService:
             Created activity log data
         """
         try:
-            # Get user ID if slack_user_id is provided
-            user_id = activity_data.get("user_id")
-            if activity_data.get("slack_user_id") and not user_id:
-                user = self.get_or_create_user(
-                    activity_data["slack_user_id"],
-                    settings.SLACK_WORKSPACE_ID
-                )
-                user_id = user["id"]
+            activity = self._activity_row(activity_data)
             
-            activity = {
-                "user_id": user_id,
-                "activity_type": activity_data["activity_type"],
-                "entity_type": activity_data.get("entity_type"),
-                "entity_id": activity_data.get("entity_id"),
-                "metadata": activity_data.get("metadata", {}),
-                "created_at": datetime.utcnow().isoformat()
-            }
+            if self.use_pool:
+                return run_sync(self._insert_row("activity_logs", activity))
             
             result = self.client.table("activity_logs").insert(activity).execute()
             return result.data[0]
@@ -293,6 +568,205 @@ class SupabaseService:
             logger.error(f"Error logging activity: {e}", exc_info=True)
             raise
     
+    def bulk_log_messages(self, messages: List[Dict[str, Any]]) -> int:
+        """
+        Log many messages with a single insert.
+        
+        Args:
+            messages: Message information dicts, as accepted by log_message
+            
+        Returns:
+            Number of messages written
+        """
+        if not messages:
+            return 0
+        
+        try:
+            rows = [self._message_row(message_data) for message_data in messages]
+            if self.use_pool:
+                run_sync(self._insert_rows("messages", rows))
+            else:
+                # Nothing reads the rows back, so skip the RETURNING payload
+                self.client.table("messages").insert(rows, returning=ReturnMethod.minimal).execute()
+            logger.debug(f"Logged {len(rows)} messages in bulk")
+            return len(rows)
+            
+        except Exception as e:
+            logger.error(f"Error bulk logging messages: {e}", exc_info=True)
+            raise
+    
+    def bulk_log_activity(self, activities: List[Dict[str, Any]]) -> int:
+        """
+        Log many activities with a single insert.
+        
+        Args:
+            activities: Activity information dicts, as accepted by log_activity
+            
+        Returns:
+            Number of activities written
+        """
+        if not activities:
+            return 0
+        
+        if self.use_pool and len(activities) >= COPY_THRESHOLD:
+            return self.bulk_copy_activity(activities)
+        
+        try:
+            rows = [self._activity_row(activity_data) for activity_data in activities]
+            if self.use_pool:
+                run_sync(self._insert_rows("activity_logs", rows))
+            else:
+                self.client.table("activity_logs").insert(rows, returning=ReturnMethod.minimal).execute()
+            logger.debug(f"Logged {len(rows)} activities in bulk")
+            return len(rows)
+            
+        except Exception as e:
+            logger.error(f"Error bulk logging activities: {e}", exc_info=True)
+            raise
+    
+    def bulk_copy_activity(self, activities: List[Dict[str, Any]]) -> int:
+        """
+        Stream a large batch of activities into activity_logs with COPY.
+        
+        COPY skips per-row parsing and planning, which pays off for batches
+        in the thousands such as analytics replays. Requires SUPABASE_DB_URL.
+        
+        Args:
+            activities: Activity information dicts, as accepted by log_activity
+            
+        Returns:
+            Number of activities written
+        """
+        if not activities:
+            return 0
+        if not self.use_pool:
+            raise RuntimeError("bulk_copy_activity requires SUPABASE_DB_URL and asyncpg")
+        
+        try:
+            rows = [self._activity_row(activity_data) for activity_data in activities]
+            run_sync(self._copy_rows("activity_logs", rows))
+            logger.debug(f"Copied {len(rows)} activities")
+            return len(rows)
+            
+        except Exception as e:
+            logger.error(f"Error copying activities: {e}", exc_info=True)
+            raise
+    
+    def queue_message(self, message_data: Dict[str, Any]) -> None:
+        """
+        Buffer a message for the next bulk insert without waiting for the database.
+        
+        Args:
+            message_data: Message information, as accepted by log_message
+        """
+        self.log_buffer.add_message(message_data)
+    
+    def queue_activity(self, activity_data: Dict[str, Any]) -> None:
+        """
+        Buffer an activity for the next bulk insert without waiting for the database.
+        
+        Args:
+            activity_data: Activity information, as accepted by log_activity
+        """
+        self.log_buffer.add_activity(activity_data)
+    
+    @staticmethod
+    @retry_db_operation()
+    def _execute(query: Any) -> Any:
+        """
+        Execute an idempotent PostgREST query, retrying transient failures.
+        
+        Inserts are executed directly instead: a failed connection can still
+        have delivered the request, and retrying would duplicate the row.
+        
+        Args:
+            query: Request builder ready to execute
+            
+        Returns:
+            The query response
+        """
+        return query.execute()
+    
+    @staticmethod
+    def _gather(*calls: Callable[[], Any]) -> List[Any]:
+        """
+        Run independent blocking calls concurrently and wait for all of them.
+        
+        Args:
+            *calls: Zero-argument callables, each doing one database round-trip
+            
+        Returns:
+            Results in the order of the calls; the first failure is raised
+        """
+        async def run() -> List[Any]:
+            return await asyncio.gather(*(asyncio.to_thread(call) for call in calls))
+        
+        return run_sync(run())
+    
+    def run_in_background(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+        """
+        Run a blocking database call on a worker thread without waiting for it.
+        
+        Handlers use this to take database round-trips off the path to their
+        Slack response. Failures are logged rather than raised, in which case
+        the returned future resolves to None.
+        
+        Args:
+            func: Callable performing the database work
+            *args: Positional arguments for func
+            **kwargs: Keyword arguments for func
+            
+        Returns:
+            Future resolving to func's result, or None if it failed
+        """
+        async def run() -> Any:
+            try:
+                return await asyncio.to_thread(func, *args, **kwargs)
+            except Exception as e:
+                logger.error(f"Background database call {func.__name__} failed: {e}", exc_info=True)
+                return None
+        
+        return asyncio.run_coroutine_threadsafe(run(), get_loop())
+    
+    async def aclose(self) -> None:
+        """Flush buffered log writes and close the PostgREST session."""
+        await self.log_buffer.close()
+        if self._http is not None:
+            self._http.close()
+    
+    @staticmethod
+    def _message_row(message_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Build a messages row from message information."""
+        row = {
+            "conversation_id": message_data["conversation_id"],
+            "sender_type": message_data["sender_type"],
+            "sender_id": message_data["sender_id"],
+            "content": message_data["content"],
+            "slack_message_ts": message_data.get("slack_message_ts"),
+            "intent_detected": message_data.get("intent_detected"),
+            "metadata": message_data.get("metadata", {})
+        }
+        return _with_created_at(row, message_data)
+    
+    def _activity_row(self, activity_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Build an activity_logs row, resolving the database user from slack_user_id if needed."""
+        user_id = activity_data.get("user_id")
+        if activity_data.get("slack_user_id") and not user_id:
+            user = self.get_or_create_user(
+                activity_data["slack_user_id"],
+                self._default_ws
+            )
+            user_id = user["id"]
+        
+        row = {
+            "user_id": user_id,
+            "activity_type": activity_data["activity_type"],
+            "entity_type": activity_data.get("entity_type"),
+            "entity_id": activity_data.get("entity_id"),
+            "metadata": activity_data.get("metadata", {})
+        }
+        return _with_created_at(row, activity_data)
+    
     # User preferences operations
     def get_user_preferences(self, user_id: str) -> Dict[str, Any]:
         """
@@ -306,42 +780,65 @@ class SupabaseService:
         """
         try:
             # Get database user
-            user = self.get_or_create_user(user_id, settings.SLACK_WORKSPACE_ID)
-            
-            # Get preferences
-            result = self.client.table("user_preferences").select("*").eq(
-                "user_id", user["id"]
-            ).execute()
-            
-            if result.data:
-                return result.data[0]
-            
-            # Create default preferences
-            default_prefs = {
-                "user_id": user["id"],
-                "language": "es",
-                "timezone": "America/Mexico_City",
-                "notification_settings": {
-                    "task_reminders": True,
-                    "daily_summary": True,
-                    "meeting_alerts": True,
-                    "dm_notifications": True
-                },
-                "working_hours": {
-                    "start": "09:00",
-                    "end": "18:00",
-                    "days": ["monday", "tuesday", "wednesday", "thursday", "friday"]
-                },
-                "created_at": datetime.utcnow().isoformat()
-            }
-            
-            result = self.client.table("user_preferences").insert(default_prefs).execute()
-            return result.data[0]
+            user = self.get_or_create_user(user_id, self._default_ws)
+            return self._get_preferences_by_db_user(user["id"])
             
         except Exception as e:
             logger.error(f"Error getting user preferences: {e}", exc_info=True)
             raise
     
+    def _get_preferences_by_db_user(self, db_user_id: str) -> Dict[str, Any]:
+        """
+        Get a user's preferences row, creating the defaults if it is missing.
+        
+        Rows are cached briefly; the returned dict is shared and must not be
+        mutated.
+        
+        Args:
+            db_user_id: Database user ID
+            
+        Returns:
+            User preferences dict
+        """
+        with self._preferences_lock:
+            prefs = self._preferences.get(db_user_id)
+        if prefs is not None:
+            return prefs
+        
+        result = self._execute(self.client.table("user_preferences").select(_PREFERENCE_COLUMNS).eq(
+            "user_id", db_user_id
+        ))
+        
+        if result.data:
+            return self._cache_preferences(db_user_id, result.data[0])
+        
+        # Create default preferences
+        default_prefs = {
+            "user_id": db_user_id,
+            "language": "es",
+            "timezone": "America/Mexico_City",
+            "notification_settings": {
+                "task_reminders": True,
+                "daily_summary": True,
+                "meeting_alerts": True,
+                "dm_notifications": True
+            },
+            "working_hours": {
+                "start": "09:00",
+                "end": "18:00",
+                "days": ["monday", "tuesday", "wednesday", "thursday", "friday"]
+            }
+        }
+        
+        result = self.client.table("user_preferences").insert(default_prefs).execute()
+        return self._cache_preferences(db_user_id, result.data[0])
+    
+    def _cache_preferences(self, db_user_id: str, prefs: Dict[str, Any]) -> Dict[str, Any]:
+        """Store a preferences row in the cache and return it."""
+        with self._preferences_lock:
+            self._preferences[db_user_id] = prefs
+        return prefs
+    
     def update_user_preferences(self, user_id: str, updates: Dict[str, Any]) -> Dict[str, Any]:
         """
         Update user preferences.
@@ -355,28 +852,22 @@ class SupabaseService:
         """
         try:
             # Get database user
-            user = self.get_or_create_user(user_id, settings.SLACK_WORKSPACE_ID)
+            user = self.get_or_create_user(user_id, self._default_ws)
             
-            # Get current preferences
-            current_prefs = self.get_user_preferences(user_id)
+            # Get current preferences without resolving the user again
+            current_prefs = self._get_preferences_by_db_user(user["id"])
             
-            # Merge updates
-            if "notification_settings" in updates and isinstance(updates["notification_settings"], dict):
-                current_prefs["notification_settings"].update(updates["notification_settings"])
-                updates["notification_settings"] = current_prefs["notification_settings"]
+            # Merge updates into copies; the current row may be shared from the cache
+            for key in ("notification_settings", "working_hours"):
+                if key in updates and isinstance(updates[key], dict):
+                    updates[key] = {**current_prefs[key], **updates[key]}
             
-            if "working_hours" in updates and isinstance(updates["working_hours"], dict):
-                current_prefs["working_hours"].update(updates["working_hours"])
-                updates["working_hours"] = current_prefs["working_hours"]
-            
-            updates["updated_at"] = datetime.utcnow().isoformat()
-            
-            result = self.client.table("user_preferences").update(updates).eq(
+            result = self._execute(self.client.table("user_preferences").update(updates).eq(
                 "id", current_prefs["id"]
-            ).execute()
+            ))
             
             logger.info(f"Updated preferences for user {user_id}")
-            return result.data[0]
+            return self._cache_preferences(user["id"], result.data[0])
             
         except Exception as e:
             logger.error(f"Error updating user preferences: {e}", exc_info=True)
@@ -396,11 +887,11 @@ class SupabaseService:
         """
         try:
             # Get database user
-            user = self.get_or_create_user(user_id, settings.SLACK_WORKSPACE_ID)
+            user = self.get_or_create_user(user_id, self._default_ws)
             db_user_id = user["id"]
             
             # Calculate date range
-            now = datetime.utcnow()
+            now = datetime.now(timezone.utc)
             if period == "today":
                 start_date = now.replace(hour=0, minute=0, second=0, microsecond=0)
             else:  # week
@@ -412,52 +903,13 @@ class SupabaseService:
                 "end_date": now.isoformat()
             }
             
-            # Get tasks statistics
-            all_tasks = self.get_user_tasks(user_id)
-            summary["total_tasks"] = len(all_tasks)
-            summary["tasks_by_status"] = {}
-            
-            for task in all_tasks:
-                status = task.get("status", "unknown")
-                summary["tasks_by_status"][status] = summary["tasks_by_status"].get(status, 0) + 1
-            
-            # Get tasks created in period
-            tasks_in_period = [
-                t for t in all_tasks 
-                if datetime.fromisoformat(t["created_at"].replace('Z', '+00:00')) >= start_date
-            ]
-            summary["tasks_created_in_period"] = len(tasks_in_period)
-            
-            # Get completed tasks in period
-            completed_in_period = [
-                t for t in all_tasks 
-                if t.get("status") == "completed" and t.get("completed_at") and
-                datetime.fromisoformat(t["completed_at"].replace('Z', '+00:00')) >= start_date
-            ]
-            summary["tasks_completed_in_period"] = len(completed_in_period)
-            
-            # Get activity count
-            activities_query = self.client.table("activity_logs").select("*").eq(
-                "user_id", db_user_id
-            ).gte("created_at", start_date.isoformat())
-            
-            activities_result = activities_query.execute()
-            activities = activities_result.data if activities_result else []
-            
-            summary["total_activities"] = len(activities)
-            summary["activities_by_type"] = {}
-            
-            for activity in activities:
-                activity_type = activity.get("activity_type", "unknown")
-                summary["activities_by_type"][activity_type] = summary["activities_by_type"].get(activity_type, 0) + 1
-            
-            # Get conversation count
-            conversations_query = self.client.table("conversations").select("*").eq(
-                "user_id", db_user_id
-            ).gte("created_at", start_date.isoformat())
-            
-            conversations_result = conversations_query.execute()
-            summary["conversations_started"] = len(conversations_result.data) if conversations_result else 0
+            # Counts and histograms are aggregated server-side
+            result = self._execute(self.client.rpc("summary_for_user", {
+                "p_slack_user_id": user_id,
+                "p_user_id": db_user_id,
+                "p_start": start_date.isoformat()
+            }))
+            summary.update(result.data)
             
             return summary
             
@@ -477,47 +929,26 @@ class SupabaseService:
         """
         try:
             # Get database user
-            user = self.get_or_create_user(user_id, settings.SLACK_WORKSPACE_ID)
-            db_user_id = user["id"]
+            user = self.get_or_create_user(user_id, self._default_ws)
             
             stats = {
                 "user_id": user_id,
                 "member_since": user.get("created_at", "unknown")
             }
             
-            # Task statistics
-            tasks = self.get_user_tasks(user_id)
-            stats["total_tasks"] = len(tasks)
-            stats["pending_tasks"] = len([t for t in tasks if t.get("status") == "pending"])
-            stats["completed_tasks"] = len([t for t in tasks if t.get("status") == "completed"])
-            
-            # Calculate completion rate
-            if stats["total_tasks"] > 0:
-                stats["completion_rate"] = round(stats["completed_tasks"] / stats["total_tasks"] * 100, 1)
-            else:
-                stats["completion_rate"] = 0
-            
-            # Activity statistics
-            activities_result = self.client.table("activity_logs").select("*").eq(
-                "user_id", db_user_id
-            ).execute()
-            
-            activities = activities_result.data if activities_result else []
-            stats["total_activities"] = len(activities)
-            
-            # Most common activity
-            activity_counts = {}
-            for activity in activities:
-                activity_type = activity.get("activity_type", "unknown")
-                activity_counts[activity_type] = activity_counts.get(activity_type, 0) + 1
+            # Counts are aggregated server-side; preferences are read alongside
+            counts_result, prefs = self._gather(
+                lambda: self._execute(self.client.rpc("get_user_statistics", {
+                    "p_slack_user_id": user_id,
+                    "p_user_id": user["id"]
+                })),
+                lambda: self.get_user_preferences(user_id)
+            )
             
-            if activity_counts:
-                stats["most_common_activity"] = max(activity_counts.items(), key=lambda x: x[1])[0]
-            else:
-                stats["most_common_activity"] = "none"
+            # Task and activity statistics
+            stats.update(counts_result.data)
             
             # Preferences
-            prefs = self.get_user_preferences(user_id)
             stats["language"] = prefs.get("language", "es")
             stats["timezone"] = prefs.get("timezone", "America/Mexico_City")
             
@@ -530,7 +961,10 @@ class SupabaseService:
     # Time tracking operations
     def start_time_entry(self, user_id: int, task_id: Optional[int] = None) -> Dict[str, Any]:
         """
-        Start a new time entry.
+        Start a new time entry, stopping any running entry first.
+        
+        Both steps run in the start_time_entry RPC as one transaction, so a
+        user never ends up with zero or two active entries.
         
         Args:
             user_id: Database user ID
@@ -540,19 +974,12 @@ class SupabaseService:
             Created time entry
         """
         try:
-            # End any active time entries first
-            self.stop_active_time_entries(user_id)
-            
-            entry = {
-                "user_id": user_id,
-                "task_id": task_id,
-                "start_time": datetime.utcnow().isoformat(),
-                "is_active": True
-            }
-            
-            result = self.client.table("time_entries").insert(entry).execute()
+            result = self.client.rpc("start_time_entry", {
+                "p_user_id": user_id,
+                "p_task_id": task_id
+            }).execute()
             logger.info(f"Started time entry for user {user_id}")
-            return result.data[0]
+            return result.data
             
         except Exception as e:
             logger.error(f"Error starting time entry: {e}", exc_info=True)
@@ -562,6 +989,9 @@ class SupabaseService:
         """
         Stop all active time entries for a user.
         
+        The filter is served by the time_entries_active_by_user partial
+        index (user_id WHERE is_active); keep the two in sync.
+        
         Args:
             user_id: Database user ID
             
@@ -569,26 +999,16 @@ class SupabaseService:
             List of stopped time entries
         """
         try:
-            # Get active entries
-            active_entries = self.client.table("time_entries").select("*").eq(
-                "user_id", user_id
-            ).eq("is_active", True).execute()
-            
-            if not active_entries.data:
+            # One UPDATE ... RETURNING for every active entry
+            result = self._execute(self.client.table("time_entries").update({
+                "end_time": _now_iso(),
+                "is_active": False
+            }).eq("user_id", user_id).eq("is_active", True))
+            
+            stopped_entries = result.data or []
+            if not stopped_entries:
                 return []
             
-            # Stop each active entry
-            stopped_entries = []
-            end_time = datetime.utcnow().isoformat()
-            
-            for entry in active_entries.data:
-                result = self.client.table("time_entries").update({
-                    "end_time": end_time,
-                    "is_active": False
-                }).eq("id", entry["id"]).execute()
-                
-                stopped_entries.append(result.data[0])
-            
             logger.info(f"Stopped {len(stopped_entries)} time entries for user {user_id}")
             return stopped_entries
             
@@ -610,7 +1030,7 @@ class SupabaseService:
             List of time entries
         """
         try:
-            query = self.client.table("time_entries").select("*").eq("user_id", user_id)
+            query = self.client.table("time_entries").select(_TIME_ENTRY_COLUMNS).eq("user_id", user_id)
             
             if start_date:
                 query = query.gte("start_time", start_date.isoformat())
@@ -618,7 +1038,7 @@ class SupabaseService:
             if end_date:
                 query = query.lte("start_time", end_date.isoformat())
             
-            result = query.order("start_time", desc=True).execute()
+            result = self._execute(query.order("start_time", desc=True))
             return result.data
             
         except Exception as e:
@@ -637,34 +1057,144 @@ class SupabaseService:
             List of messages
         """
         try:
-            result = self.client.table("messages").select("*").eq(
+            result = self._execute(self.client.table("messages").select(_MESSAGE_COLUMNS).eq(
                 "conversation_id", conversation_id
-            ).order("created_at", desc=True).limit(limit).execute()
+            ).order("created_at", desc=True).limit(limit))
             
-            # Return in chronological order (oldest first)
-            return list(reversed(result.data)) if result.data else []
+            # Newest N come back descending; flip in place to chronological order
+            messages = result.data or []
+            messages.reverse()
+            return messages
             
         except Exception as e:
             logger.error(f"Error fetching conversation messages: {e}", exc_info=True)
             return []  # Return empty list instead of raising to prevent crashes
 
 
+class LogBuffer:
+    """
+    Buffers message and activity writes and flushes them with bulk inserts.
+    
+    Handlers hand records over without waiting; the buffer lives on the
+    shared async_runner loop and flushes every ``flush_interval`` seconds or
+    as soon as ``flush_size`` records are pending. The inserts themselves
+    run in a worker thread so the loop is never blocked. If the database
+    falls behind, at most ``max_pending`` records per table are held and
+    newer ones are dropped.
+    """
+    
+    def __init__(
+        self,
+        service: "SupabaseService",
+        flush_size: int = 500,
+        flush_interval: float = 1.0,
+        max_pending: int = 10_000
+    ):
+        """
+        Initialize the buffer.
+        
+        Args:
+            service: Service used for the bulk inserts
+            flush_size: Pending records that trigger an immediate flush
+            flush_interval: Seconds between periodic flushes
+            max_pending: Pending records per table beyond which new ones are dropped
+        """
+        self.service = service
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending: Dict[str, List[Dict[str, Any]]] = {"messages": [], "activities": []}
+        self._dropped: Dict[str, int] = {"messages": 0, "activities": 0}
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self._early_flushes: Set[asyncio.Task] = set()
+    
+    def add_message(self, message_data: Dict[str, Any]) -> None:
+        """Queue a message; safe to call from any thread."""
+        self._submit("messages", message_data)
+    
+    def add_activity(self, activity_data: Dict[str, Any]) -> None:
+        """Queue an activity; safe to call from any thread."""
+        self._submit("activities", activity_data)
+    
+    def _submit(self, kind: str, record: Dict[str, Any]) -> None:
+        """Stamp the record now and hand it to the loop thread."""
+        stamped = {"created_at": _now_iso(), **record}
+        get_loop().call_soon_threadsafe(self._append, kind, stamped)
+    
+    def _append(self, kind: str, record: Dict[str, Any]) -> None:
+        """Add a record on the loop thread, flushing early when the buffer is full."""
+        pending = self._pending[kind]
+        if len(pending) >= self.max_pending:
+            self._dropped[kind] += 1
+            return
+        pending.append(record)
+        if self._flush_task is None:
+            self._flush_lock = asyncio.Lock()
+            self._flush_task = asyncio.create_task(self._flush_loop())
+        if len(pending) == self.flush_size:
+            task = asyncio.create_task(self.flush())
+            self._early_flushes.add(task)
+            task.add_done_callback(self._early_flushes.discard)
+    
+    async def _flush_loop(self) -> None:
+        """Flush pending records periodically."""
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+    
+    async def flush(self) -> None:
+        """Write all pending records, one bulk insert per table."""
+        if self._flush_lock is None:
+            return
+        async with self._flush_lock:
+            for kind, bulk_insert in (
+                ("messages", self.service.bulk_log_messages),
+                ("activities", self.service.bulk_log_activity),
+            ):
+                records, self._pending[kind] = self._pending[kind], []
+                if self._dropped[kind]:
+                    logger.warning(f"Dropped {self._dropped[kind]} {kind} records while the buffer was full")
+                    self._dropped[kind] = 0
+                if not records:
+                    continue
+                try:
+                    await asyncio.to_thread(bulk_insert, records)
+                except Exception as e:
+                    logger.error(f"Dropped {len(records)} buffered {kind} records: {e}")
+    
+    async def close(self) -> None:
+        """Stop periodic flushing and write whatever is still pending."""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        await self.flush()
+
+
 # Singleton instance
 _supabase_service: Optional[SupabaseService] = None
+_supabase_service_failed = False
+_supabase_service_lock = threading.Lock()
 
 
 def get_supabase_service() -> Optional[SupabaseService]:
     """
     Get the singleton Supabase service instance.
     
+    Bolt runs handlers on a thread pool, so creation is locked to make sure
+    concurrent first calls share one client. A failed creation is remembered
+    so later calls return None without retrying it on every event.
+    
     Returns:
         SupabaseService instance or None if not available
     """
-    global _supabase_service
-    if _supabase_service is None:
-        try:
-            _supabase_service = SupabaseService()
-        except Exception as e:
-            logger.warning(f"Could not create Supabase service: {e}")
-            return None
+    global _supabase_service, _supabase_service_failed
+    if _supabase_service is None and not _supabase_service_failed:
+        with _supabase_service_lock:
+            if _supabase_service is None and not _supabase_service_failed:
+                try:
+                    _supabase_service = SupabaseService()
+                except Exception as e:
+                    logger.warning(f"Could not create Supabase service: {e}")
+                    _supabase_service_failed = True
     return _supabase_service
\ No newline at end of file
@@ -0,0 +1,118 @@
+"""
+Background event loop for running coroutines from synchronous code.
+
+Slack Bolt dispatches handlers on worker threads, while some service
+clients are asyncio-based. This module owns a single event loop running
+in a daemon thread so async clients (and their connection pools) are
+always used from the same loop for the lifetime of the process.
+"""
+
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, Coroutine, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_thread: Optional[threading.Thread] = None
+_lock = threading.Lock()
+
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    """
+    Get the shared background event loop, starting it on first use.
+
+    Returns:
+        Running event loop owned by the background thread
+    """
+    global _loop, _thread
+    if _loop is None:
+        with _lock:
+            if _loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(
+                    target=loop.run_forever,
+                    name="async-runner",
+                    daemon=True
+                )
+                thread.start()
+                _thread = thread
+                _loop = loop
+                logger.debug("Background event loop started")
+    return _loop
+
+
+def run_sync(coro: Coroutine[Any, Any, T], timeout: Optional[float] = None) -> T:
+    """
+    Run a coroutine on the shared loop and block until it completes.
+
+    Args:
+        coro: Coroutine to execute
+        timeout: Optional maximum seconds to wait for the result
+
+    Returns:
+        The coroutine's result
+    """
+    loop = get_loop()
+    if threading.current_thread() is _thread:
+        coro.close()
+        raise RuntimeError("run_sync() cannot be called from the background loop thread")
+
+    future = asyncio.run_coroutine_threadsafe(coro, loop)
+    return future.result(timeout)
+
+
+def submit(coro: Coroutine[Any, Any, T]) -> "Future[T]":
+    """
+    Schedule a coroutine on the shared loop without waiting for it.
+
+    Args:
+        coro: Coroutine to execute
+
+    Returns:
+        Future resolving to the coroutine's result
+    """
+    return asyncio.run_coroutine_threadsafe(coro, get_loop())
+
+
+async def _cancel_and_stop() -> None:
+    """Cancel every other task on the running loop, wait for them, then stop it."""
+    current = asyncio.current_task()
+    tasks = [task for task in asyncio.all_tasks() if task is not current]
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    asyncio.get_running_loop().stop()
+
+
+def shutdown(timeout: float = 5) -> None:
+    """
+    Cancel pending tasks, stop the shared event loop and wait for its thread.
+
+    The loop is only closed once its thread has exited; if a task outlives
+    the timeout the loop is left running in its daemon thread.
+
+    Args:
+        timeout: Maximum seconds to wait for the loop thread
+    """
+    global _loop, _thread
+    with _lock:
+        loop, thread = _loop, _thread
+        _loop = None
+        _thread = None
+
+    if loop is None:
+        return
+
+    asyncio.run_coroutine_threadsafe(_cancel_and_stop(), loop)
+    if thread:
+        thread.join(timeout=timeout)
+        if thread.is_alive():
+            logger.warning(f"Background event loop still running after {timeout}s; leaving it open")
+            return
+    loop.close()
+    logger.debug("Background event loop stopped")
@@ -7,7 +7,7 @@ and provides a centralized settings object.
 
 import os
 from pathlib import Path
-from typing import Optional
+from typing import FrozenSet, Optional
 
 from dotenv import load_dotenv
 from pydantic import Field
@@ -32,6 +32,18 @@ class Settings(BaseSettings):
     # Supabase Configuration
     SUPABASE_URL: str = Field(..., description="Supabase project URL")
     SUPABASE_KEY: str = Field(..., description="Supabase anonymous key")
+    SUPABASE_DB_URL: Optional[str] = Field(
+        None,
+        description="Direct Postgres DSN (Supavisor transaction mode) for pooled writes"
+    )
+    DB_POOL_MIN_SIZE: int = Field(3, description="Connections the Postgres pool keeps open")
+    DB_POOL_MAX_SIZE: int = Field(10, description="Upper bound on Postgres pool connections")
+    SUPABASE_MAX_CONNECTIONS: int = Field(50, description="Upper bound on PostgREST HTTP connections")
+    SUPABASE_KEEPALIVE: int = Field(20, description="Idle PostgREST connections kept alive for reuse")
+    
+    # Cache Configuration
+    REDIS_URL: Optional[str] = Field(None, description="Redis URL for shared lookup caches (optional)")
+    USER_CACHE_TTL: int = Field(3600, description="Seconds a cached user row stays valid")
     
     # Application Configuration
     LOG_LEVEL: str = Field("INFO", description="Logging level")
@@ -65,6 +77,8 @@ class Settings(BaseSettings):
         env_file = ".env"
         env_file_encoding = "utf-8"
         case_sensitive = True
+        # Read-only after startup; values handlers depend on cannot drift at runtime
+        frozen = True
         
     def validate_settings(self) -> None:
         """Validate that all required settings are present."""
@@ -105,6 +119,9 @@ SLACK_APP_TOKEN = settings.SLACK_APP_TOKEN
 SLACK_SIGNING_SECRET = settings.SLACK_SIGNING_SECRET
 SUPABASE_URL = settings.SUPABASE_URL
 SUPABASE_KEY = settings.SUPABASE_KEY
+ADMIN_USER_IDS: FrozenSet[str] = frozenset(
+    user_id.strip() for user_id in settings.ADMIN_USERS.split(",") if user_id.strip()
+)
 
 
 def get_config() -> Settings:
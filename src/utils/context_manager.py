@@ -6,9 +6,12 @@ of Slack interactions (public channels vs private messages/channels).
 """
 
 import logging
-from typing import Dict, Any, Optional, Tuple
+import threading
+from types import MappingProxyType
+from typing import Dict, Any, Mapping, Optional, Tuple
 from enum import Enum
 
+from cachetools import TTLCache
 from slack_sdk import WebClient
 from slack_sdk.errors import SlackApiError
 
@@ -22,18 +25,49 @@ class ContextType(Enum):
     UNKNOWN = "unknown"
 
 
+# Channel ID prefixes that identify the context without an API call:
+# D = direct message, G = private channel or group DM
+_PREFIX_CONTEXT = {
+    'D': ContextType.PRIVATE,
+    'G': ContextType.PRIVATE,
+}
+
+# Base commands available in all contexts
+_PUBLIC_COMMANDS: Mapping[str, bool] = MappingProxyType({
+    "help": True,
+    "status": True,
+    "task": True,
+    "remind": True,
+    "summary": True,
+})
+
+# Private context allows more sensitive commands
+_PRIVATE_COMMANDS: Mapping[str, bool] = MappingProxyType({
+    **_PUBLIC_COMMANDS,
+    "config": True,
+    "personal": True,
+    "sensitive": True,
+    "report": True,
+})
+
+
 class ContextManager:
     """Manages context determination for Slack interactions."""
     
-    def __init__(self, slack_client: WebClient):
+    def __init__(self, slack_client: WebClient, cache_ttl: float = 600, cache_size: int = 4096):
         """
         Initialize the context manager.
         
         Args:
             slack_client: Slack Web API client
+            cache_ttl: Seconds a channel lookup stays cached
+            cache_size: Maximum number of cached channels
         """
         self.client = slack_client
-        self._channel_cache: Dict[str, Dict[str, Any]] = {}
+        self._channel_cache: TTLCache = TTLCache(maxsize=cache_size, ttl=cache_ttl)
+        # Guards the cache; per-channel locks keep concurrent misses to one API call
+        self._cache_lock = threading.Lock()
+        self._fetch_locks: Dict[str, threading.Lock] = {}
     
     def get_context_type(self, channel_id: str, user_id: Optional[str] = None) -> ContextType:
         """
@@ -46,15 +80,16 @@ class ContextManager:
         Returns:
             ContextType enum value
         """
+        # Some events and commands carry no channel
+        if not channel_id:
+            return ContextType.UNKNOWN
+        
+        # DMs and private channels are known from the ID prefix alone
+        context_type = _PREFIX_CONTEXT.get(channel_id[:1])
+        if context_type is not None:
+            return context_type
+        
         try:
-            # Check if it's a DM (starts with D)
-            if channel_id.startswith('D'):
-                return ContextType.PRIVATE
-            
-            # Check if it's a private channel (starts with G)
-            if channel_id.startswith('G'):
-                return ContextType.PRIVATE
-            
             # Get channel info from cache or API
             channel_info = self._get_channel_info(channel_id)
             
@@ -86,16 +121,81 @@ class ContextManager:
             Channel information dict or None
         """
         # Check cache first
-        if channel_id in self._channel_cache:
-            return self._channel_cache[channel_id]
+        with self._cache_lock:
+            channel_info = self._channel_cache.get(channel_id)
+            if channel_info is not None:
+                return channel_info
+            fetch_lock = self._fetch_locks.setdefault(channel_id, threading.Lock())
         
+        with fetch_lock:
+            # Another handler may have fetched it while this one waited
+            with self._cache_lock:
+                channel_info = self._channel_cache.get(channel_id)
+            if channel_info is None:
+                channel_info = self._fetch_channel_info(channel_id)
+                if channel_info is not None:
+                    with self._cache_lock:
+                        self._channel_cache[channel_id] = channel_info
+        
+        with self._cache_lock:
+            self._fetch_locks.pop(channel_id, None)
+        return channel_info
+    
+    def warm_cache(self, page_size: int = 1000) -> int:
+        """
+        Preload channel information in bulk with conversations.list.
+        
+        Pages through public and private channels the bot can see until the
+        listing ends or the cache is full, so most lookups never need a
+        per-channel conversations.info call.
+        
+        Args:
+            page_size: Channels requested per page
+            
+        Returns:
+            Number of channels cached
+        """
+        cached = 0
+        cursor = None
+        try:
+            while True:
+                response = self.client.conversations_list(
+                    types="public_channel,private_channel",
+                    exclude_archived=True,
+                    limit=page_size,
+                    cursor=cursor
+                )
+                channels = response.get('channels', [])
+                with self._cache_lock:
+                    room = self._channel_cache.maxsize - len(self._channel_cache)
+                    for channel in channels[:room]:
+                        self._channel_cache[channel['id']] = channel
+                cached += min(len(channels), max(room, 0))
+                
+                cursor = (response.get('response_metadata') or {}).get('next_cursor')
+                if not cursor or room <= len(channels):
+                    break
+        except SlackApiError as e:
+            logger.warning(f"Could not preload channel info: {e}")
+        
+        logger.info(f"Preloaded info for {cached} channels")
+        return cached
+    
+    def _fetch_channel_info(self, channel_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get channel information from the Slack API.
+        
+        Args:
+            channel_id: Slack channel ID
+            
+        Returns:
+            Channel information dict or None
+        """
         try:
             # Try to get channel info
             response = self.client.conversations_info(channel=channel_id)
             if response['ok']:
-                channel_info = response['channel']
-                self._channel_cache[channel_id] = channel_info
-                return channel_info
+                return response['channel']
                 
         except SlackApiError as e:
             if e.response['error'] == 'channel_not_found':
@@ -105,7 +205,6 @@ class ContextManager:
                     if response['ok']:
                         channel_info = response['channel']
                         channel_info['is_im'] = True
-                        self._channel_cache[channel_id] = channel_info
                         return channel_info
                 except:
                     pass
@@ -166,7 +265,7 @@ class ContextManager:
             # More formal tone in public
             return message
     
-    def get_allowed_commands(self, context_type: ContextType, user_id: str) -> Dict[str, bool]:
+    def get_allowed_commands(self, context_type: ContextType, user_id: str) -> Mapping[str, bool]:
         """
         Get allowed commands based on context and user.
         
@@ -175,29 +274,34 @@ class ContextManager:
             user_id: User ID
             
         Returns:
-            Dict of command names to permission booleans
-        """
-        # Base commands available in all contexts
-        base_commands = {
-            "help": True,
-            "status": True,
-            "task": True,
-            "remind": True,
-            "summary": True,
-        }
-        
-        # Private context allows more sensitive commands
+            Read-only mapping of command names to permission booleans
+        """
         if context_type == ContextType.PRIVATE:
-            base_commands.update({
-                "config": True,
-                "personal": True,
-                "sensitive": True,
-                "report": True,
-            })
-        
-        return base_commands
+            return _PRIVATE_COMMANDS
+        return _PUBLIC_COMMANDS
+    
+    def invalidate(self, channel_id: str) -> None:
+        """
+        Drop one channel from the cache, e.g. after it changes visibility.
+        
+        Args:
+            channel_id: Slack channel ID
+        """
+        with self._cache_lock:
+            self._channel_cache.pop(channel_id, None)
+    
+    def set_cache_ttl(self, ttl: float) -> None:
+        """
+        Change how long channel lookups stay cached; clears current entries.
+        
+        Args:
+            ttl: Seconds a channel lookup stays cached
+        """
+        with self._cache_lock:
+            self._channel_cache = TTLCache(maxsize=self._channel_cache.maxsize, ttl=ttl)
     
     def clear_cache(self) -> None:
         """Clear the channel information cache."""
-        self._channel_cache.clear()
+        with self._cache_lock:
+            self._channel_cache.clear()
         logger.info("Context manager cache cleared")
\ No newline at end of file
@@ -6,9 +6,9 @@ including formatters, handlers, and log levels.
 """
 
 import logging
-import sys
+import logging.config
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, Optional
 
 from src.utils.config import settings
 
@@ -20,6 +20,10 @@ def setup_logging(
     """
     Set up logging configuration for the application.
     
+    The whole configuration is applied with a single ``dictConfig`` call,
+    which replaces any root handlers from an earlier call instead of adding
+    duplicates.
+    
     Args:
         log_level: Override log level (uses settings.LOG_LEVEL if not provided)
         log_file: Optional log file path
@@ -28,7 +32,7 @@ def setup_logging(
         Root logger instance
     """
     # Use provided log level or fall back to settings
-    level = log_level or settings.LOG_LEVEL
+    level = (log_level or settings.LOG_LEVEL).upper()
     
     # Create logs directory if log file is specified
     if log_file:
@@ -40,61 +44,69 @@ def setup_logging(
         "%(asctime)s - %(name)s - %(levelname)s - "
         "%(filename)s:%(lineno)d - %(message)s"
     )
+    date_format = "%Y-%m-%d %H:%M:%S"
     
-    # Configure root logger
-    logging.basicConfig(
-        level=getattr(logging, level.upper()),
-        format=log_format,
-        datefmt="%Y-%m-%d %H:%M:%S",
-        handlers=[]
-    )
-    
-    # Get root logger
-    logger = logging.getLogger()
-    
-    # Clear existing handlers
-    logger.handlers.clear()
-    
-    # Console handler with color support
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(getattr(logging, level.upper()))
+    formatters: Dict[str, Dict[str, Any]] = {
+        "standard": {"format": log_format, "datefmt": date_format},
+    }
+    console_formatter = "standard"
     
     # Add color formatter for console if in debug mode
     if settings.DEBUG:
         try:
-            import colorlog
-            color_formatter = colorlog.ColoredFormatter(
-                "%(log_color)s" + log_format,
-                datefmt="%Y-%m-%d %H:%M:%S",
-                log_colors={
+            import colorlog  # noqa: F401
+            formatters["color"] = {
+                "()": "colorlog.ColoredFormatter",
+                "fmt": "%(log_color)s" + log_format,
+                "datefmt": date_format,
+                "log_colors": {
                     'DEBUG': 'cyan',
                     'INFO': 'green',
                     'WARNING': 'yellow',
                     'ERROR': 'red',
                     'CRITICAL': 'red,bg_white',
-                }
-            )
-            console_handler.setFormatter(color_formatter)
+                },
+            }
+            console_formatter = "color"
         except ImportError:
             # Fall back to standard formatter
-            console_handler.setFormatter(logging.Formatter(log_format))
-    else:
-        console_handler.setFormatter(logging.Formatter(log_format))
+            pass
     
-    logger.addHandler(console_handler)
+    handlers: Dict[str, Dict[str, Any]] = {
+        "console": {
+            "class": "logging.StreamHandler",
+            "stream": "ext://sys.stdout",
+            "level": level,
+            "formatter": console_formatter,
+        },
+    }
     
     # File handler if specified
     if log_file:
-        file_handler = logging.FileHandler(log_file)
-        file_handler.setLevel(logging.DEBUG)  # Log everything to file
-        file_handler.setFormatter(logging.Formatter(log_format))
-        logger.addHandler(file_handler)
+        handlers["file"] = {
+            "class": "logging.FileHandler",
+            "filename": log_file,
+            "level": "DEBUG",  # Log everything to file
+            "formatter": "standard",
+        }
+    
+    logging.config.dictConfig({
+        "version": 1,
+        "disable_existing_loggers": False,
+        "formatters": formatters,
+        "handlers": handlers,
+        # Set specific log levels for noisy libraries
+        "loggers": {
+            "slack_bolt": {"level": "INFO"},
+            "slack_sdk": {"level": "INFO"},
+            "urllib3": {"level": "WARNING"},
+            "asyncio": {"level": "WARNING"},
+        },
+        "root": {"level": level, "handlers": list(handlers)},
+    })
     
-    # Set specific log levels for noisy libraries
-    logging.getLogger("slack_bolt").setLevel(logging.INFO)
-    logging.getLogger("slack_sdk").setLevel(logging.INFO)
-    logging.getLogger("urllib3").setLevel(logging.WARNING)
-    logging.getLogger("asyncio").setLevel(logging.WARNING)
+    # Get root logger
+    logger = logging.getLogger()
     
     # Log initial setup
     logger.info(f"Logging configured with level: {level}")
@@ -5,51 +5,91 @@ This module provides utilities for collecting and reporting
 application metrics for monitoring and observability.
 """
 
-import time
+import functools
 import logging
-from collections import defaultdict
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+import sys
+import time
+from collections import defaultdict, deque
+from datetime import datetime, timezone
+from typing import Deque, Dict, List, NamedTuple, Optional, Tuple, Any
 from threading import Lock
 
 logger = logging.getLogger(__name__)
 
 
+class _Metric(NamedTuple):
+    """One recorded request; a tuple is a fraction of the size of a dict."""
+    
+    ts_ns: int  # time.monotonic_ns(); only compared against the window
+    duration_ms: int
+    status: str
+    user_id: str
+    metadata: Dict[str, Any]
+
+
 class MetricsCollector:
     """Collects and aggregates application metrics."""
     
-    def __init__(self, window_minutes: int = 5):
+    def __init__(self, window_minutes: int = 5, max_records_per_type: int = 10000):
         """
         Initialize metrics collector.
         
         Args:
             window_minutes: Time window for metric aggregation
+            max_records_per_type: Capacity of each request type's ring buffer;
+                the oldest record is evicted once it is full
         """
         self.window_minutes = window_minutes
-        self._metrics: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self._window_ns = window_minutes * 60 * 1_000_000_000
+        self.max_records_per_type = max_records_per_type
+        self._metrics: Dict[str, Deque[_Metric]] = defaultdict(self._new_ring)
         self._counters: Dict[str, int] = defaultdict(int)
+        # Counter names per (request type, status), built once instead of per record
+        self._counter_keys: Dict[Tuple[str, str], Tuple[str, str]] = {}
         self._lock = Lock()
+        
+        # Ring buffer load metrics
+        self._ring_writes = 0
+        self._ring_drops = 0
+    
+    def _new_ring(self) -> Deque[_Metric]:
+        """Create an empty bounded ring buffer for one request type."""
+        return deque(maxlen=self.max_records_per_type)
+    
+    def _append(self, ring: Deque[_Metric], metric: _Metric) -> None:
+        """Append to a ring buffer, counting records evicted because it is full."""
+        if len(ring) == ring.maxlen:
+            self._ring_drops += 1
+        ring.append(metric)
+        self._ring_writes += 1
     
     def record_request(self, request_type: str, duration_ms: int, 
                       status: str, user_id: str, metadata: Optional[Dict[str, Any]] = None) -> None:
         """Record a request metric."""
+        # Everything that doesn't touch shared state happens before taking the lock.
+        # Statuses and user IDs repeat across records; interning keeps one copy of each.
+        status = sys.intern(status)
+        if isinstance(user_id, str):
+            user_id = sys.intern(user_id)
+        metric = _Metric(time.monotonic_ns(), duration_ms, status, user_id, metadata or {})
+        cutoff = metric.ts_ns - self._window_ns
+        
         with self._lock:
-            metric = {
-                'timestamp': datetime.utcnow(),
-                'duration_ms': duration_ms,
-                'status': status,
-                'user_id': user_id,
-                'metadata': metadata or {}
-            }
+            keys = self._counter_keys.get((request_type, status))
+            if keys is None:
+                keys = (sys.intern(f"{request_type}:total"), sys.intern(f"{request_type}:{status}"))
+                self._counter_keys[(request_type, status)] = keys
+            total_key, status_key = keys
             
-            self._metrics[request_type].append(metric)
+            ring = self._metrics[request_type]
+            self._append(ring, metric)
             
             # Increment counters
-            self._counters[f"{request_type}:total"] += 1
-            self._counters[f"{request_type}:{status}"] += 1
+            self._counters[total_key] += 1
+            self._counters[status_key] += 1
             
-            # Clean old metrics
-            self._clean_old_metrics()
+            # Expire this type's old records; other types are swept on read
+            self._expire(ring, cutoff)
     
     def increment_counter(self, name: str, value: int = 1) -> None:
         """Increment a counter metric."""
@@ -60,19 +100,36 @@ class MetricsCollector:
         """Get current counter value."""
         return self._counters.get(name, 0)
     
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get load metrics for the collector's ring buffers.
+        
+        Returns:
+            Dict with total writes, records dropped because a buffer was full,
+            and the number of records currently held
+        """
+        with self._lock:
+            return {
+                'ring_writes': self._ring_writes,
+                'ring_drops': self._ring_drops,
+                'ring_depth': sum(len(ring) for ring in self._metrics.values())
+            }
+    
+    def _cutoff(self) -> int:
+        """Oldest monotonic timestamp still inside the window."""
+        return time.monotonic_ns() - self._window_ns
+    
+    @staticmethod
+    def _expire(ring: Deque[_Metric], cutoff: int) -> None:
+        """Drop records older than the cutoff; rings are in timestamp order."""
+        while ring and ring[0].ts_ns <= cutoff:
+            ring.popleft()
+    
     def _clean_old_metrics(self) -> None:
         """Remove metrics older than the window."""
-        cutoff = datetime.utcnow() - timedelta(minutes=self.window_minutes)
-        
-        for request_type in list(self._metrics.keys()):
-            self._metrics[request_type] = [
-                m for m in self._metrics[request_type]
-                if m['timestamp'] > cutoff
-            ]
-            
-            # Remove empty lists
-            if not self._metrics[request_type]:
-                del self._metrics[request_type]
+        cutoff = self._cutoff()
+        for ring in self._metrics.values():
+            self._expire(ring, cutoff)
     
     def get_summary(self) -> Dict[str, Any]:
         """Get metrics summary for the current window."""
@@ -81,7 +138,7 @@ class MetricsCollector:
             
             summary = {
                 'window_minutes': self.window_minutes,
-                'timestamp': datetime.utcnow().isoformat(),
+                'timestamp': datetime.now(timezone.utc).isoformat(),
                 'request_types': {},
                 'counters': dict(self._counters)
             }
@@ -91,9 +148,10 @@ class MetricsCollector:
                 if not metrics:
                     continue
                 
-                durations = [m['duration_ms'] for m in metrics]
-                success_count = sum(1 for m in metrics if m['status'] == 'success')
-                error_count = sum(1 for m in metrics if m['status'] == 'error')
+                # Sorted once: min, max and both percentiles read from it
+                durations = sorted(m.duration_ms for m in metrics)
+                success_count = sum(1 for m in metrics if m.status == 'success')
+                error_count = sum(1 for m in metrics if m.status == 'error')
                 
                 summary['request_types'][request_type] = {
                     'count': len(metrics),
@@ -101,20 +159,19 @@ class MetricsCollector:
                     'error_count': error_count,
                     'error_rate': error_count / len(metrics) if metrics else 0,
                     'avg_duration_ms': sum(durations) / len(durations) if durations else 0,
-                    'min_duration_ms': min(durations) if durations else 0,
-                    'max_duration_ms': max(durations) if durations else 0,
+                    'min_duration_ms': durations[0] if durations else 0,
+                    'max_duration_ms': durations[-1] if durations else 0,
                     'p95_duration_ms': self._percentile(durations, 95) if durations else 0,
                     'p99_duration_ms': self._percentile(durations, 99) if durations else 0
                 }
             
             return summary
     
-    def _percentile(self, values: List[float], percentile: float) -> float:
-        """Calculate percentile of a list of values."""
-        if not values:
+    def _percentile(self, sorted_values: List[float], percentile: float) -> float:
+        """Calculate percentile of an already sorted list of values."""
+        if not sorted_values:
             return 0
         
-        sorted_values = sorted(values)
         index = int(len(sorted_values) * percentile / 100)
         
         if index >= len(sorted_values):
@@ -125,40 +182,29 @@ class MetricsCollector:
     def get_user_stats(self, user_id: str) -> Dict[str, Any]:
         """Get statistics for a specific user."""
         with self._lock:
-            user_metrics = []
-            
+            self._clean_old_metrics()
+            # One pass per type, keeping only a count and a duration sum
+            request_types: Dict[str, Dict[str, Any]] = {}
+            total_requests = 0
             for request_type, metrics in self._metrics.items():
-                user_metrics.extend([
-                    {**m, 'request_type': request_type}
-                    for m in metrics if m['user_id'] == user_id
-                ])
-            
-            if not user_metrics:
-                return {
-                    'user_id': user_id,
-                    'total_requests': 0,
-                    'request_types': {}
-                }
-            
-            # Group by request type
-            by_type = defaultdict(list)
-            for m in user_metrics:
-                by_type[m['request_type']].append(m)
+                count = 0
+                total_duration = 0
+                for m in metrics:
+                    if m.user_id == user_id:
+                        count += 1
+                        total_duration += m.duration_ms
+                if count:
+                    total_requests += count
+                    request_types[request_type] = {
+                        'count': count,
+                        'avg_duration_ms': total_duration / count
+                    }
             
-            stats = {
+            return {
                 'user_id': user_id,
-                'total_requests': len(user_metrics),
-                'request_types': {}
+                'total_requests': total_requests,
+                'request_types': request_types
             }
-            
-            for request_type, type_metrics in by_type.items():
-                durations = [m['duration_ms'] for m in type_metrics]
-                stats['request_types'][request_type] = {
-                    'count': len(type_metrics),
-                    'avg_duration_ms': sum(durations) / len(durations) if durations else 0
-                }
-            
-            return stats
     
     def log_summary(self) -> None:
         """Log current metrics summary."""
@@ -190,6 +236,8 @@ metrics_collector = MetricsCollector()
 class Timer:
     """Context manager for timing code execution."""
     
+    __slots__ = ('name', 'logger', 'start_time', 'end_time')
+    
     def __init__(self, name: str, logger: Optional[logging.Logger] = None):
         """
         Initialize timer.
@@ -205,12 +253,12 @@ class Timer:
     
     def __enter__(self):
         """Start timing."""
-        self.start_time = time.time()
+        self.start_time = time.perf_counter()
         return self
     
     def __exit__(self, exc_type, exc_val, exc_tb):
         """End timing and log result."""
-        self.end_time = time.time()
+        self.end_time = time.perf_counter()
         duration = self.end_time - self.start_time
         
         self.logger.debug(
@@ -227,13 +275,30 @@ class Timer:
         if self.start_time is None:
             return 0
         
-        end = self.end_time or time.time()
+        end = self.end_time or time.perf_counter()
         return end - self.start_time
 
 
 def track_execution_time(func):
     """Decorator to track function execution time."""
+    name = f"{func.__module__}.{func.__name__}"
+    
+    @functools.wraps(func)
     def wrapper(*args, **kwargs):
-        with Timer(f"{func.__module__}.{func.__name__}"):
+        # Skip timing entirely unless the result would be logged
+        if not logger.isEnabledFor(logging.DEBUG):
+            return func(*args, **kwargs)
+        
+        start = time.perf_counter()
+        try:
             return func(*args, **kwargs)
+        finally:
+            duration = time.perf_counter() - start
+            logger.debug(
+                f"{name} took {duration:.3f}s",
+                extra={
+                    'timer_name': name,
+                    'duration_seconds': duration
+                }
+            )
     return wrapper
\ No newline at end of file
@@ -7,7 +7,6 @@ metrics to logs or external monitoring systems.
 
 import logging
 import threading
-import time
 from datetime import datetime
 from typing import Optional, Callable
 
@@ -29,6 +28,8 @@ class MetricsReporter:
         self.interval_seconds = interval_seconds
         self._running = False
         self._thread: Optional[threading.Thread] = None
+        # Set by stop(); waiting on it lets the loop exit mid-interval
+        self._stop_event = threading.Event()
         self._callbacks: list[Callable] = []
     
     def add_callback(self, callback: Callable) -> None:
@@ -42,6 +43,7 @@ class MetricsReporter:
             return
         
         self._running = True
+        self._stop_event.clear()
         self._thread = threading.Thread(target=self._run, daemon=True)
         self._thread.start()
         logger.info(f"Metrics reporter started with {self.interval_seconds}s interval")
@@ -49,8 +51,10 @@ class MetricsReporter:
     def stop(self) -> None:
         """Stop the metrics reporting thread."""
         self._running = False
+        self._stop_event.set()
         if self._thread:
             self._thread.join(timeout=5)
+            self._thread = None
         logger.info("Metrics reporter stopped")
     
     def _run(self) -> None:
@@ -71,12 +75,14 @@ class MetricsReporter:
                         logger.error(f"Error in metrics callback: {e}", exc_info=True)
                 
                 # Sleep until next interval
-                time.sleep(self.interval_seconds)
+                if self._stop_event.wait(self.interval_seconds):
+                    return
                 
             except Exception as e:
                 logger.error(f"Error in metrics reporter: {e}", exc_info=True)
                 # Sleep on error to avoid tight loop
-                time.sleep(30)
+                if self._stop_event.wait(30):
+                    return
     
     def _log_metrics(self, summary: dict) -> None:
         """Log metrics summary."""
@@ -130,6 +136,17 @@ class MetricsReporter:
 # Global metrics reporter instance
 metrics_reporter = MetricsReporter()
 
+# Error-rate thresholds (exclusive upper bounds) and their status emoji
+_ERROR_RATE_EMOJI = ((0.05, "✅"), (0.1, "⚠️"))
+
+
+def _error_rate_emoji(error_rate: float) -> str:
+    """Pick the status emoji for a request type's error rate."""
+    for threshold, emoji in _ERROR_RATE_EMOJI:
+        if error_rate < threshold:
+            return emoji
+    return "❌"
+
 
 def format_metrics_for_slack(summary: dict) -> str:
     """
@@ -179,9 +196,8 @@ def format_metrics_for_slack(summary: dict) -> str:
         )[:5]  # Top 5
         
         for request_type, stats in sorted_types:
-            emoji = "✅" if stats['error_rate'] < 0.05 else "⚠️" if stats['error_rate'] < 0.1 else "❌"
             lines.append(
-                f"{emoji} `{request_type}`: "
+                f"{_error_rate_emoji(stats['error_rate'])} `{request_type}`: "
                 f"{stats['count']} requests, "
                 f"avg {stats['avg_duration_ms']:.0f}ms"
             )
@@ -6,21 +6,26 @@ burst traffic while maintaining a steady rate limit over time.
 """
 
 import time
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from threading import Lock
-from typing import Dict, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Number of lock stripes bucket storage is sharded into (power of two)
+_STRIPE_COUNT = 32
+
 
 @dataclass
 class RateLimit:
     """Configuration for a rate limit."""
     
+    __slots__ = ('max_tokens', 'refill_rate', 'burst_size')
+    
     max_tokens: int  # Maximum tokens in bucket
     refill_rate: float  # Tokens per second
     burst_size: int  # Maximum burst size (usually same as max_tokens)
@@ -37,15 +42,42 @@ class RateLimit:
 
 @dataclass
 class TokenBucket:
-    """Token bucket for rate limiting."""
+    """
+    Token bucket for rate limiting.
+    
+    ``last_refill`` is a ``time.monotonic()`` reading, so refills are not
+    thrown off when the wall clock is adjusted.
+    """
+    
+    # One bucket exists per user and per user/command pair, so skip the
+    # instance __dict__ (dataclass(slots=True) needs Python 3.10)
+    __slots__ = ('tokens', 'last_refill')
     
     tokens: float
     last_refill: float
     
-    def refill(self, rate_limit: RateLimit, current_time: float) -> None:
-        """Refill tokens based on elapsed time."""
+    def refill(self, rate_limit: RateLimit, current_time: float, needed: float = 1) -> None:
+        """
+        Refill tokens based on elapsed time.
+        
+        A full bucket only moves its refill time forward. While the bucket
+        already holds ``needed`` tokens and less than a whole token has
+        accrued, it is left untouched so the partial credit keeps
+        accumulating; otherwise all elapsed time is credited.
+        
+        Args:
+            rate_limit: Limit the bucket refills under
+            current_time: ``time.monotonic()`` reading
+            needed: Tokens the caller is about to consume
+        """
+        if self.tokens >= rate_limit.max_tokens:
+            self.last_refill = current_time
+            return
+        
         elapsed = current_time - self.last_refill
         tokens_to_add = elapsed * rate_limit.refill_rate
+        if tokens_to_add < 1.0 and self.tokens >= needed:
+            return
         
         self.tokens = min(
             rate_limit.max_tokens,
@@ -66,6 +98,11 @@ class TokenBucket:
         return False
 
 
+# A lock and the per-user records it guards, kept in least-recently-used
+# order; each record maps a limit key ('user' or a command) to its bucket
+_Stripe = Tuple[Lock, "OrderedDict[str, Dict[str, TokenBucket]]"]
+
+
 class RateLimiter:
     """
     Rate limiter using token bucket algorithm.
@@ -73,10 +110,28 @@ class RateLimiter:
     Supports multiple rate limit tiers and per-user limits.
     """
     
-    def __init__(self):
-        """Initialize rate limiter."""
-        self._buckets: Dict[str, TokenBucket] = {}
-        self._lock = Lock()
+    def __init__(self, max_users: int = 100_000, bucket_max_age: float = 3600):
+        """
+        Initialize rate limiter.
+        
+        Args:
+            max_users: Approximate cap on users with stored buckets; the least
+                recently seen user of a stripe is evicted once its share is full
+            bucket_max_age: Seconds without a refill after which a user's
+                buckets are considered stale and dropped when new users are added
+        """
+        # Per-user records are sharded into stripes, each guarded by its own
+        # lock, so requests from unrelated users don't serialize on a single
+        # mutex. A user's own and per-command buckets share one record, so a
+        # request needs a single stripe lock and lookup for all of them.
+        self._stripes: List[_Stripe] = [
+            (Lock(), OrderedDict()) for _ in range(_STRIPE_COUNT)
+        ]
+        self._global_lock = Lock()
+        self._global_buckets: Dict[str, TokenBucket] = {}
+        self._max_stripe_users = max(1, max_users // _STRIPE_COUNT)
+        self._bucket_max_age = bucket_max_age
+        self._hits_lock = Lock()
         
         # Default rate limits
         self._rate_limits = {
@@ -117,13 +172,24 @@ class RateLimiter:
             )
         }
         
-        # Track rate limit hits for monitoring
-        self._limit_hits = defaultdict(int)
-        self._last_reset = time.time()
+        # The global and user limits are checked on every request
+        self._global_limit = self._rate_limits['global']
+        self._user_limit = self._rate_limits['user']
+        
+        # Track rate limit hits for monitoring: one counter per limit type and
+        # per configured command, so the counts stay bounded however many
+        # users get limited
+        self._limit_hits = dict.fromkeys(('global', 'user', 'command'), 0)
+        self._command_hits: Dict[str, int] = defaultdict(int)
+        self._last_reset = time.monotonic()
     
     def set_rate_limit(self, key: str, rate_limit: RateLimit) -> None:
         """Set a custom rate limit."""
         self._rate_limits[key] = rate_limit
+        if key == 'global':
+            self._global_limit = rate_limit
+        elif key == 'user':
+            self._user_limit = rate_limit
         logger.info(f"Set rate limit for {key}: {rate_limit}")
     
     def check_rate_limit(
@@ -145,88 +211,127 @@ class RateLimiter:
             - allowed: True if request is allowed
             - limit_info: Information about the limit hit (if any)
         """
-        current_time = time.time()
-        
-        with self._lock:
-            # Check global limit
-            if not self._check_limit('global', 'global', current_time, tokens):
-                self._limit_hits['global'] += 1
-                return False, {
-                    'limit_type': 'global',
-                    'retry_after': self._get_retry_after('global', 'global', tokens)
-                }
+        current_time = time.monotonic()
+        
+        # Check global limit
+        with self._global_lock:
+            allowed, retry_after = self._consume(
+                self._global_buckets, 'global', self._global_limit, current_time, tokens
+            )
+        if not allowed:
+            self._record_hit('global')
+            return False, {
+                'limit_type': 'global',
+                'retry_after': retry_after
+            }
+        
+        command_limit = self._rate_limits.get(command) if command else None
+        command_allowed = True
+        
+        lock, users = self._stripe_for(user_id)
+        with lock:
+            user_buckets = self._get_user_buckets(users, user_id, current_time)
             
             # Check per-user limit
-            user_key = f'user:{user_id}'
-            if not self._check_limit(user_key, 'user', current_time, tokens):
-                self._limit_hits[user_key] += 1
-                return False, {
-                    'limit_type': 'user',
-                    'retry_after': self._get_retry_after(user_key, 'user', tokens)
-                }
+            allowed, retry_after = self._consume(
+                user_buckets, 'user', self._user_limit, current_time, tokens
+            )
             
             # Check per-command limit if applicable
-            if command and command in self._rate_limits:
-                command_key = f'{command}:{user_id}'
-                if not self._check_limit(command_key, command, current_time, tokens):
-                    self._limit_hits[command_key] += 1
-                    return False, {
-                        'limit_type': 'command',
-                        'command': command,
-                        'retry_after': self._get_retry_after(command_key, command, tokens)
-                    }
-            
-            return True, None
+            if allowed and command_limit is not None:
+                command_allowed, retry_after = self._consume(
+                    user_buckets, command, command_limit, current_time, tokens
+                )
+        
+        if not allowed:
+            self._record_hit('user')
+            return False, {
+                'limit_type': 'user',
+                'retry_after': retry_after
+            }
+        
+        if not command_allowed:
+            self._record_hit('command', command)
+            return False, {
+                'limit_type': 'command',
+                'command': command,
+                'retry_after': retry_after
+            }
+        
+        return True, None
+    
+    def _stripe_for(self, user_id: str) -> _Stripe:
+        """Get the lock and user records responsible for a user."""
+        return self._stripes[hash(user_id) & (_STRIPE_COUNT - 1)]
     
-    def _check_limit(
+    def _record_hit(self, limit_type: str, command: Optional[str] = None) -> None:
+        """Count a rejected request for monitoring."""
+        with self._hits_lock:
+            self._limit_hits[limit_type] += 1
+            if command is not None:
+                self._command_hits[command] += 1
+    
+    def _get_user_buckets(
         self,
-        bucket_key: str,
+        users: "OrderedDict[str, Dict[str, TokenBucket]]",
+        user_id: str,
+        current_time: float
+    ) -> Dict[str, TokenBucket]:
+        """Get or create a user's bucket record; the stripe lock must be held."""
+        user_buckets = users.get(user_id)
+        if user_buckets is not None:
+            users.move_to_end(user_id)
+            return user_buckets
+        
+        user_buckets = users[user_id] = {}
+        
+        # The oldest user has been idle longest, so their buckets have most
+        # likely refilled and dropping them costs nothing. Stale users are
+        # also dropped here, one per insert, so cleanup is spread across
+        # traffic instead of done in sweeps.
+        if len(users) > self._max_stripe_users:
+            users.popitem(last=False)
+        else:
+            oldest = next(iter(users.values()))
+            if oldest and current_time - max(
+                bucket.last_refill for bucket in oldest.values()
+            ) > self._bucket_max_age:
+                users.popitem(last=False)
+        
+        return user_buckets
+    
+    @staticmethod
+    def _consume(
+        buckets: Dict[str, TokenBucket],
         limit_key: str,
+        rate_limit: RateLimit,
         current_time: float,
         tokens: int
-    ) -> bool:
-        """Check a specific rate limit."""
-        rate_limit = self._rate_limits.get(limit_key)
-        if not rate_limit:
-            return True  # No limit configured
+    ) -> Tuple[bool, float]:
+        """
+        Check a specific rate limit; the lock guarding ``buckets`` must be held.
         
+        Returns:
+            Tuple of (allowed, retry_after), where retry_after is the number
+            of seconds until enough tokens accrue (0 when allowed)
+        """
         # Get or create bucket
-        if bucket_key not in self._buckets:
-            self._buckets[bucket_key] = TokenBucket(
+        bucket = buckets.get(limit_key)
+        if bucket is None:
+            bucket = buckets[limit_key] = TokenBucket(
                 tokens=rate_limit.max_tokens,
                 last_refill=current_time
             )
         
-        bucket = self._buckets[bucket_key]
-        
         # Refill bucket
-        bucket.refill(rate_limit, current_time)
+        bucket.refill(rate_limit, current_time, tokens)
         
         # Try to consume tokens
-        return bucket.consume(tokens)
-    
-    def _get_retry_after(
-        self,
-        bucket_key: str,
-        limit_key: str,
-        tokens: int
-    ) -> float:
-        """Calculate when the request can be retried."""
-        rate_limit = self._rate_limits.get(limit_key)
-        if not rate_limit:
-            return 0
-        
-        bucket = self._buckets.get(bucket_key)
-        if not bucket:
-            return 0
-        
-        # Calculate time needed to accumulate enough tokens
-        tokens_needed = tokens - bucket.tokens
-        if tokens_needed <= 0:
-            return 0
-        
-        seconds_needed = tokens_needed / rate_limit.refill_rate
-        return seconds_needed
+        if bucket.consume(tokens):
+            return True, 0.0
+        
+        # Time needed to accumulate enough tokens
+        return False, (tokens - bucket.tokens) / rate_limit.refill_rate
     
     def get_limit_info(self, user_id: str, command: Optional[str] = None) -> Dict[str, any]:
         """
@@ -235,16 +340,20 @@ class RateLimiter:
         Returns:
             Dictionary with limit status information
         """
-        current_time = time.time()
+        current_time = time.monotonic()
         info = {}
+        command_limit = self._rate_limits.get(command) if command else None
         
-        with self._lock:
+        lock, users = self._stripe_for(user_id)
+        with lock:
+            user_buckets = users.get(user_id, {})
+            
             # User limit info
-            user_key = f'user:{user_id}'
-            if user_key in self._buckets:
-                bucket = self._buckets[user_key]
-                rate_limit = self._rate_limits['user']
-                bucket.refill(rate_limit, current_time)
+            bucket = user_buckets.get('user')
+            if bucket is not None:
+                rate_limit = self._user_limit
+                # Credit all elapsed time so the reported count is exact
+                bucket.refill(rate_limit, current_time, rate_limit.max_tokens)
                 
                 info['user_limit'] = {
                     'tokens_remaining': int(bucket.tokens),
@@ -253,35 +362,45 @@ class RateLimiter:
                 }
             
             # Command limit info
-            if command and command in self._rate_limits:
-                command_key = f'{command}:{user_id}'
-                if command_key in self._buckets:
-                    bucket = self._buckets[command_key]
-                    rate_limit = self._rate_limits[command]
-                    bucket.refill(rate_limit, current_time)
-                    
-                    info['command_limit'] = {
-                        'command': command,
-                        'tokens_remaining': int(bucket.tokens),
-                        'max_tokens': rate_limit.max_tokens,
-                        'refill_rate': rate_limit.refill_rate
-                    }
+            bucket = user_buckets.get(command) if command_limit is not None else None
+            if bucket is not None:
+                bucket.refill(command_limit, current_time, command_limit.max_tokens)
+                
+                info['command_limit'] = {
+                    'command': command,
+                    'tokens_remaining': int(bucket.tokens),
+                    'max_tokens': command_limit.max_tokens,
+                    'refill_rate': command_limit.refill_rate
+                }
         
         return info
     
     def get_stats(self) -> Dict[str, any]:
         """Get rate limiter statistics."""
-        current_time = time.time()
+        current_time = time.monotonic()
+        
+        with self._hits_lock:
+            # Reset stats every hour
+            if current_time - self._last_reset > 3600:
+                self._limit_hits = dict.fromkeys(self._limit_hits, 0)
+                self._command_hits.clear()
+                self._last_reset = current_time
+            
+            limit_hits = dict(self._limit_hits)
+            command_hits = dict(self._command_hits)
         
-        # Reset stats every hour
-        if current_time - self._last_reset > 3600:
-            self._limit_hits.clear()
-            self._last_reset = current_time
+        active_buckets = len(self._global_buckets)
+        for lock, users in self._stripes:
+            with lock:
+                active_buckets += sum(len(user_buckets) for user_buckets in users.values())
         
         return {
-            'active_buckets': len(self._buckets),
-            'limit_hits': dict(self._limit_hits),
-            'stats_window_start': datetime.fromtimestamp(self._last_reset).isoformat()
+            'active_buckets': active_buckets,
+            'limit_hits': limit_hits,
+            'command_hits': command_hits,
+            'stats_window_start': (
+                datetime.now() - timedelta(seconds=current_time - self._last_reset)
+            ).isoformat()
         }
     
     def cleanup_old_buckets(self, max_age_seconds: int = 3600) -> int:
@@ -294,25 +413,41 @@ class RateLimiter:
         Returns:
             Number of buckets removed
         """
-        current_time = time.time()
-        removed = 0
+        current_time = time.monotonic()
         
-        with self._lock:
-            to_remove = []
-            
-            for key, bucket in self._buckets.items():
-                # If bucket hasn't been refilled recently, it's inactive
-                if current_time - bucket.last_refill > max_age_seconds:
-                    to_remove.append(key)
-            
-            for key in to_remove:
-                del self._buckets[key]
-                removed += 1
+        with self._global_lock:
+            removed = self._remove_stale(self._global_buckets, current_time, max_age_seconds)
+        
+        # Sweep one stripe at a time so requests on other stripes keep flowing
+        for lock, users in self._stripes:
+            with lock:
+                for user_id in list(users):
+                    user_buckets = users[user_id]
+                    removed += self._remove_stale(user_buckets, current_time, max_age_seconds)
+                    if not user_buckets:
+                        del users[user_id]
         
         if removed > 0:
             logger.info(f"Cleaned up {removed} old rate limit buckets")
         
         return removed
+    
+    @staticmethod
+    def _remove_stale(
+        buckets: Dict[str, TokenBucket],
+        current_time: float,
+        max_age_seconds: float
+    ) -> int:
+        """Remove buckets that haven't been refilled recently; returns the count."""
+        to_remove = [
+            key for key, bucket in buckets.items()
+            # If bucket hasn't been refilled recently, it's inactive
+            if current_time - bucket.last_refill > max_age_seconds
+        ]
+        
+        for key in to_remove:
+            del buckets[key]
+        return len(to_remove)
 
 
 # Global rate limiter instance
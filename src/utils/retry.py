@@ -0,0 +1,78 @@
+"""
+Retry helpers for transient database failures.
+
+PostgREST sits behind a gateway that occasionally answers 502/503/504,
+and pooled keep-alive sockets can be dropped by the server between
+requests. Both are worth retrying a few times with backoff instead of
+surfacing an error to the Slack user.
+"""
+
+import functools
+import logging
+import random
+import time
+from typing import Any, Callable, TypeVar
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# Gateway statuses PostgREST errors carry when the database is briefly unavailable
+_TRANSIENT_STATUS_CODES = {"502", "503", "504"}
+
+
+def is_transient_error(error: BaseException) -> bool:
+    """
+    Check whether an error is worth retrying.
+    
+    Args:
+        error: Exception raised by a database call
+    
+    Returns:
+        True for network failures and gateway errors
+    """
+    if isinstance(error, httpx.TransportError):
+        return True
+    return str(getattr(error, "code", "")) in _TRANSIENT_STATUS_CODES
+
+
+def retry_db_operation(
+    max_retries: int = 3,
+    base_delay: float = 0.1,
+    max_delay: float = 2.0
+) -> Callable[[F], F]:
+    """
+    Retry a function on transient database errors with exponential backoff.
+    
+    Delays use full jitter: a random value between zero and
+    ``base_delay * 2 ** attempt``, capped at ``max_delay``. Only decorate
+    idempotent operations, since a request can reach the server before
+    its connection fails.
+    
+    Args:
+        max_retries: Retries after the first attempt
+        base_delay: Backoff for the first retry in seconds
+        max_delay: Upper bound on a single delay in seconds
+    
+    Returns:
+        Decorator applying the retry policy
+    """
+    def decorator(func: F) -> F:
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            for attempt in range(max_retries + 1):
+                try:
+                    return func(*args, **kwargs)
+                except Exception as e:
+                    if attempt == max_retries or not is_transient_error(e):
+                        raise
+                    delay = random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+                    logger.warning(
+                        f"Transient error in {func.__name__} ({e}); "
+                        f"retry {attempt + 1}/{max_retries} in {delay:.2f}s"
+                    )
+                    time.sleep(delay)
+        return wrapper  # type: ignore[return-value]
+    return decorator
@@ -0,0 +1,51 @@
+-- Resolve the user and the active conversation for a Slack message in one round-trip
+-- Date: 2026-10-16
+
+-- The bot tracks open conversations by status (same values as schema_old.sql)
+ALTER TABLE conversations
+    ADD COLUMN IF NOT EXISTS status VARCHAR(20) NOT NULL DEFAULT 'active'
+        CHECK (status IN ('active', 'resolved', 'archived'));
+
+CREATE OR REPLACE FUNCTION find_or_create_conversation(
+    p_channel TEXT,
+    p_slack_user TEXT,
+    p_workspace TEXT,
+    p_context TEXT,
+    p_thread TEXT DEFAULT NULL
+)
+RETURNS conversations AS $$
+DECLARE
+    v_user_id UUID;
+    v_conversation conversations;
+BEGIN
+    SELECT id INTO v_user_id
+    FROM users
+    WHERE slack_user_id = p_slack_user AND slack_workspace_id = p_workspace;
+
+    IF NOT FOUND THEN
+        INSERT INTO users (slack_user_id, slack_workspace_id)
+        VALUES (p_slack_user, p_workspace)
+        ON CONFLICT (slack_user_id, slack_workspace_id)
+            DO UPDATE SET slack_user_id = EXCLUDED.slack_user_id
+        RETURNING id INTO v_user_id;
+    END IF;
+
+    SELECT * INTO v_conversation
+    FROM conversations
+    WHERE slack_channel_id = p_channel
+      AND user_id = v_user_id
+      AND status = 'active'
+      AND (p_thread IS NULL OR slack_thread_ts = p_thread)
+    LIMIT 1;
+
+    IF FOUND THEN
+        RETURN v_conversation;
+    END IF;
+
+    INSERT INTO conversations (slack_channel_id, slack_thread_ts, user_id, context_type, status)
+    VALUES (p_channel, p_thread, v_user_id, p_context, 'active')
+    RETURNING * INTO v_conversation;
+
+    RETURN v_conversation;
+END;
+$$ LANGUAGE plpgsql;
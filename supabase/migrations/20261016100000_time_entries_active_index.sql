@@ -0,0 +1,15 @@
+-- Partial index for looking up a user's running time entries
+-- Date: 2026-10-16
+
+-- stop_active_time_entries() filters on user_id AND is_active; indexing only
+-- the active rows keeps that lookup small regardless of time-tracking history.
+-- time_entries is not created by these migrations, so only index it where it exists.
+DO $$
+BEGIN
+    IF to_regclass('public.time_entries') IS NOT NULL THEN
+        CREATE INDEX IF NOT EXISTS time_entries_active_by_user
+            ON time_entries (user_id)
+            WHERE is_active;
+    END IF;
+END;
+$$;
@@ -0,0 +1,38 @@
+-- Task and activity statistics for a user in one round-trip
+-- Date: 2026-10-16
+
+DROP FUNCTION IF EXISTS get_user_statistics(TEXT);
+
+-- Tasks are keyed by Slack ID, activity_logs by the database user ID
+CREATE OR REPLACE FUNCTION get_user_statistics(p_slack_user_id TEXT, p_user_id UUID)
+RETURNS JSONB AS $$
+    WITH task_counts AS (
+        SELECT
+            count(*) AS total,
+            count(*) FILTER (WHERE status = 'pending') AS pending,
+            count(*) FILTER (WHERE status = 'completed') AS completed
+        FROM tasks
+        WHERE assigned_to = p_slack_user_id
+    ),
+    activity_counts AS (
+        SELECT activity_type, count(*) AS occurrences
+        FROM activity_logs
+        WHERE user_id = p_user_id
+        GROUP BY activity_type
+    )
+    SELECT jsonb_build_object(
+        'total_tasks', t.total,
+        'pending_tasks', t.pending,
+        'completed_tasks', t.completed,
+        'completion_rate', CASE
+            WHEN t.total > 0 THEN round(t.completed * 100.0 / t.total, 1)
+            ELSE 0
+        END,
+        'total_activities', COALESCE((SELECT sum(occurrences) FROM activity_counts), 0),
+        'most_common_activity', COALESCE(
+            (SELECT activity_type FROM activity_counts ORDER BY occurrences DESC LIMIT 1),
+            'none'
+        )
+    )
+    FROM task_counts t;
+$$ LANGUAGE sql STABLE;
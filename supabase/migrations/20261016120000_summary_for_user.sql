@@ -0,0 +1,50 @@
+-- Activity summary for a user over a period in one round-trip
+-- Date: 2026-10-16
+
+CREATE OR REPLACE FUNCTION summary_for_user(
+    p_slack_user_id TEXT,
+    p_user_id UUID,
+    p_start TIMESTAMPTZ
+)
+RETURNS JSONB AS $$
+    WITH user_tasks AS (
+        SELECT status, created_at, completed_at
+        FROM tasks
+        WHERE assigned_to = p_slack_user_id
+    ),
+    tasks_by_status AS (
+        SELECT status, count(*) AS total
+        FROM user_tasks
+        GROUP BY status
+    ),
+    activities_by_type AS (
+        SELECT activity_type, count(*) AS total
+        FROM activity_logs
+        WHERE user_id = p_user_id
+          AND created_at >= p_start
+        GROUP BY activity_type
+    )
+    SELECT jsonb_build_object(
+        'total_tasks', (SELECT count(*) FROM user_tasks),
+        'tasks_by_status', COALESCE(
+            (SELECT jsonb_object_agg(status, total) FROM tasks_by_status),
+            '{}'::jsonb
+        ),
+        'tasks_created_in_period', (
+            SELECT count(*) FROM user_tasks WHERE created_at >= p_start
+        ),
+        'tasks_completed_in_period', (
+            SELECT count(*) FROM user_tasks
+            WHERE status = 'completed' AND completed_at >= p_start
+        ),
+        'total_activities', COALESCE((SELECT sum(total) FROM activities_by_type), 0),
+        'activities_by_type', COALESCE(
+            (SELECT jsonb_object_agg(activity_type, total) FROM activities_by_type),
+            '{}'::jsonb
+        ),
+        'conversations_started', (
+            SELECT count(*) FROM conversations
+            WHERE user_id = p_user_id AND created_at >= p_start
+        )
+    );
+$$ LANGUAGE sql STABLE;
@@ -0,0 +1,30 @@
+-- Start a time entry, stopping the user's running one, in a single transaction
+-- Date: 2026-10-16
+
+-- plpgsql so the function can be created before time_entries exists;
+-- the table is resolved when the function first runs.
+-- users.id and tasks.id are UUIDs; drop any earlier BIGINT signature.
+DROP FUNCTION IF EXISTS start_time_entry(BIGINT, BIGINT);
+
+CREATE OR REPLACE FUNCTION start_time_entry(
+    p_user_id UUID,
+    p_task_id UUID DEFAULT NULL
+)
+RETURNS JSONB AS $$
+DECLARE
+    v_entry JSONB;
+BEGIN
+    -- Serialize concurrent starts for the same user so only one entry stays active
+    PERFORM pg_advisory_xact_lock(hashtextextended(p_user_id::text, 0));
+
+    UPDATE time_entries
+    SET end_time = now(), is_active = false
+    WHERE user_id = p_user_id AND is_active;
+
+    INSERT INTO time_entries (user_id, task_id, start_time, is_active)
+    VALUES (p_user_id, p_task_id, now(), true)
+    RETURNING to_jsonb(time_entries.*) INTO v_entry;
+
+    RETURN v_entry;
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,12 @@
+-- Composite indexes for the period filters in summary_for_user()
+-- Date: 2026-10-16
+
+-- Activities and conversations are filtered by owner and created_at >= start;
+-- with the date in the index only rows from the period are read. Tasks are
+-- not filtered by date there (totals cover all of a user's tasks), so the
+-- existing idx_tasks_assigned_to already serves that single scan.
+CREATE INDEX IF NOT EXISTS idx_activity_logs_user_created
+    ON activity_logs (user_id, created_at);
+
+CREATE INDEX IF NOT EXISTS idx_conversations_user_created
+    ON conversations (user_id, created_at);
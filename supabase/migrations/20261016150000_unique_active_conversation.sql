@@ -0,0 +1,71 @@
+-- One active conversation per channel, user and thread
+-- Date: 2026-10-16
+
+-- find_or_create_conversation() looks up the active conversation before
+-- inserting, so two first messages arriving together could both miss and
+-- insert. A unique index on the active rows lets the insert resolve that race.
+
+-- Keep the newest active row of any existing duplicates; archive the rest
+UPDATE conversations c
+SET status = 'archived'
+WHERE c.status = 'active'
+  AND EXISTS (
+      SELECT 1
+      FROM conversations n
+      WHERE n.status = 'active'
+        AND n.slack_channel_id = c.slack_channel_id
+        AND n.user_id = c.user_id
+        AND COALESCE(n.slack_thread_ts, '') = COALESCE(c.slack_thread_ts, '')
+        AND (n.created_at, n.id) > (c.created_at, c.id)
+  );
+
+CREATE UNIQUE INDEX IF NOT EXISTS conversations_one_active
+    ON conversations (slack_channel_id, user_id, COALESCE(slack_thread_ts, ''))
+    WHERE status = 'active';
+
+CREATE OR REPLACE FUNCTION find_or_create_conversation(
+    p_channel TEXT,
+    p_slack_user TEXT,
+    p_workspace TEXT,
+    p_context TEXT,
+    p_thread TEXT DEFAULT NULL
+)
+RETURNS conversations AS $$
+DECLARE
+    v_user_id UUID;
+    v_conversation conversations;
+BEGIN
+    SELECT id INTO v_user_id
+    FROM users
+    WHERE slack_user_id = p_slack_user AND slack_workspace_id = p_workspace;
+
+    IF NOT FOUND THEN
+        INSERT INTO users (slack_user_id, slack_workspace_id)
+        VALUES (p_slack_user, p_workspace)
+        ON CONFLICT (slack_user_id, slack_workspace_id)
+            DO UPDATE SET slack_user_id = EXCLUDED.slack_user_id
+        RETURNING id INTO v_user_id;
+    END IF;
+
+    SELECT * INTO v_conversation
+    FROM conversations
+    WHERE slack_channel_id = p_channel
+      AND user_id = v_user_id
+      AND status = 'active'
+      AND (p_thread IS NULL OR slack_thread_ts = p_thread)
+    LIMIT 1;
+
+    IF FOUND THEN
+        RETURN v_conversation;
+    END IF;
+
+    -- A concurrent call may have inserted since the lookup; return its row
+    INSERT INTO conversations (slack_channel_id, slack_thread_ts, user_id, context_type, status)
+    VALUES (p_channel, p_thread, v_user_id, p_context, 'active')
+    ON CONFLICT (slack_channel_id, user_id, COALESCE(slack_thread_ts, '')) WHERE status = 'active'
+        DO UPDATE SET status = conversations.status
+    RETURNING * INTO v_conversation;
+
+    RETURN v_conversation;
+END;
+$$ LANGUAGE plpgsql;
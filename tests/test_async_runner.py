@@ -0,0 +1,39 @@
+"""Tests for the background event loop runner."""
+
+import asyncio
+import time
+
+from src.utils import async_runner
+
+
+class TestShutdown:
+    """Test stopping the shared event loop."""
+    
+    def test_shutdown_cancels_pending_tasks(self):
+        """Test that pending tasks are cancelled and the loop is closed."""
+        future = async_runner.submit(asyncio.sleep(60))
+        loop = async_runner.get_loop()
+        
+        async_runner.shutdown(timeout=5)
+        
+        assert future.cancelled()
+        assert loop.is_closed()
+    
+    def test_shutdown_leaves_loop_open_when_thread_outlives_timeout(self):
+        """Test that a loop whose thread is still running is not closed."""
+        async def blocking():
+            time.sleep(0.5)
+        
+        async_runner.submit(blocking())
+        loop = async_runner.get_loop()
+        time.sleep(0.05)
+        
+        async_runner.shutdown(timeout=0.05)
+        
+        assert not loop.is_closed()
+        for _ in range(100):
+            if not loop.is_running():
+                break
+            time.sleep(0.05)
+        assert not loop.is_running()
+        loop.close()
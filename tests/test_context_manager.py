@@ -30,6 +30,12 @@ class TestContextManager:
         # Private channels start with 'G'
         assert context_manager.get_context_type("G12345") == ContextType.PRIVATE
     
+    def test_missing_channel_is_unknown(self, context_manager, mock_slack_client):
+        """Test that a None or empty channel ID falls back to unknown."""
+        assert context_manager.get_context_type(None) == ContextType.UNKNOWN
+        assert context_manager.get_context_type("") == ContextType.UNKNOWN
+        mock_slack_client.conversations_info.assert_not_called()
+    
     def test_public_channel_detection(self, context_manager, mock_slack_client):
         """Test that public channels are detected correctly."""
         # Mock the API response for a public channel
@@ -127,6 +133,56 @@ class TestContextManager:
         # API should only be called once
         assert mock_slack_client.conversations_info.call_count == 1
     
+    def test_invalidate_single_channel(self, context_manager, mock_slack_client):
+        """Test that invalidating one channel leaves the others cached."""
+        mock_slack_client.conversations_info.return_value = {
+            'ok': True,
+            'channel': {'id': 'C12345', 'is_private': False}
+        }
+        context_manager.get_context_type("C12345")
+        context_manager.get_context_type("C67890")
+        
+        context_manager.invalidate("C12345")
+        context_manager.get_context_type("C12345")
+        context_manager.get_context_type("C67890")
+        
+        # Only the invalidated channel is fetched again
+        assert mock_slack_client.conversations_info.call_count == 3
+    
+    def test_failed_lookup_not_cached(self, context_manager, mock_slack_client):
+        """Test that API failures are retried on the next call."""
+        mock_slack_client.conversations_info.side_effect = SlackApiError(
+            message="Internal error",
+            response={'error': 'internal_error'}
+        )
+        
+        context_manager.get_context_type("C12345")
+        context_manager.get_context_type("C12345")
+        
+        assert mock_slack_client.conversations_info.call_count == 2
+    
+    def test_warm_cache_pages_channel_list(self, context_manager, mock_slack_client):
+        """Test that preloaded channels are served without conversations.info."""
+        mock_slack_client.conversations_list.side_effect = [
+            {
+                'ok': True,
+                'channels': [{'id': 'C1', 'is_private': False}],
+                'response_metadata': {'next_cursor': 'page2'}
+            },
+            {
+                'ok': True,
+                'channels': [{'id': 'C2', 'is_private': True}],
+                'response_metadata': {'next_cursor': ''}
+            }
+        ]
+        
+        assert context_manager.warm_cache() == 2
+        assert mock_slack_client.conversations_list.call_args_list[1].kwargs['cursor'] == 'page2'
+        
+        assert context_manager.get_context_type("C1") == ContextType.PUBLIC
+        assert context_manager.get_context_type("C2") == ContextType.PRIVATE
+        mock_slack_client.conversations_info.assert_not_called()
+    
     def test_privacy_level(self, context_manager):
         """Test privacy level determination."""
         assert context_manager.get_privacy_level(ContextType.PRIVATE) == "confidential"
@@ -74,7 +74,7 @@ class TestBotIntegration:
             'bot_id': 'BBOT123'
         }
         
-        with patch('src.app.SupabaseService') as mock_supabase_class, \
+        with patch('src.app.get_supabase_service') as mock_get_supabase_service, \
              patch('slack_sdk.WebClient', return_value=mock_slack_client), \
              patch('src.services.slack_client.WebClient', return_value=mock_slack_client), \
              patch('src.services.supabase_client.create_client', return_value=mock_supabase):
@@ -82,7 +82,7 @@ class TestBotIntegration:
             # Configure Supabase service mock
             supabase_service = MagicMock(spec=SupabaseService)
             supabase_service.client = mock_supabase
-            mock_supabase_class.return_value = supabase_service
+            mock_get_supabase_service.return_value = supabase_service
             
             app = create_app(token_verification_enabled=False)
             # Client is already mocked via WebClient patch
@@ -1,10 +1,10 @@
 """Tests for interaction logging functionality."""
 
 import pytest
-from unittest.mock import Mock, MagicMock, patch
+from unittest.mock import AsyncMock, Mock, MagicMock, patch
 from datetime import datetime
 
-from src.services.supabase_client import SupabaseService
+from src.services.supabase_client import COPY_THRESHOLD, SupabaseService
 
 
 class TestInteractionLogging:
@@ -18,6 +18,8 @@ class TestInteractionLogging:
         mock_client.select.return_value = mock_client
         mock_client.eq.return_value = mock_client
         mock_client.insert.return_value = mock_client
+        mock_client.upsert.return_value = mock_client
+        mock_client.rpc.return_value = mock_client
         mock_client.execute.return_value = MagicMock(data=[])
         return mock_client
     
@@ -49,13 +51,28 @@ class TestInteractionLogging:
         assert result["id"] == "conv-123"
         assert mock_supabase_client.insert.called
     
+    def test_create_conversation_with_db_user_id(self, supabase_service, mock_supabase_client):
+        """Test that a resolved user ID skips the user lookup."""
+        mock_supabase_client.execute.return_value = MagicMock(data=[{"id": "conv-123"}])
+        
+        conversation_data = {
+            "slack_channel_id": "C123456",
+            "user_id": "U123456",
+            "context_type": "public"
+        }
+        
+        result = supabase_service.create_conversation(conversation_data, db_user_id="user-123")
+        
+        assert result["id"] == "conv-123"
+        mock_supabase_client.upsert.assert_not_called()
+        assert mock_supabase_client.insert.call_args[0][0]["user_id"] == "user-123"
+    
     def test_get_or_create_conversation_existing(self, supabase_service, mock_supabase_client):
         """Test getting existing conversation."""
-        # Mock user and conversation exist
-        mock_supabase_client.execute.side_effect = [
-            MagicMock(data=[{"id": "user-123"}]),  # get_or_create_user
-            MagicMock(data=[{"id": "conv-123", "status": "active"}])  # existing conversation
-        ]
+        # The RPC returns the active conversation as a single object
+        mock_supabase_client.execute.return_value = MagicMock(
+            data={"id": "conv-123", "status": "active"}
+        )
         
         result = supabase_service.get_or_create_conversation(
             channel_id="C123456",
@@ -65,16 +82,12 @@ class TestInteractionLogging:
         
         assert result["id"] == "conv-123"
         assert result["status"] == "active"
+        # Resolved in a single round-trip
+        assert mock_supabase_client.execute.call_count == 1
     
     def test_get_or_create_conversation_new(self, supabase_service, mock_supabase_client):
         """Test creating new conversation when none exists."""
-        # Mock user exists but no conversation
-        mock_supabase_client.execute.side_effect = [
-            MagicMock(data=[{"id": "user-123"}]),  # get_or_create_user
-            MagicMock(data=[]),  # no existing conversation
-            MagicMock(data=[{"id": "user-123"}]),  # get_or_create_user again
-            MagicMock(data=[{"id": "conv-new"}])  # create new conversation
-        ]
+        mock_supabase_client.execute.return_value = MagicMock(data=[{"id": "conv-new"}])
         
         result = supabase_service.get_or_create_conversation(
             channel_id="C123456",
@@ -83,6 +96,13 @@ class TestInteractionLogging:
         )
         
         assert result["id"] == "conv-new"
+        mock_supabase_client.rpc.assert_called_once()
+        name, params = mock_supabase_client.rpc.call_args[0]
+        assert name == "find_or_create_conversation"
+        assert params["p_channel"] == "C123456"
+        assert params["p_slack_user"] == "U123456"
+        assert params["p_context"] == "private"
+        assert params["p_thread"] is None
     
     def test_log_message(self, supabase_service, mock_supabase_client):
         """Test logging a message."""
@@ -162,14 +182,49 @@ class TestInteractionLogging:
         # Should only call table once for activity_logs insert
         assert mock_supabase_client.table.call_count == 1
     
+    def test_bulk_log_messages(self, supabase_service, mock_supabase_client):
+        """Test logging several messages with one insert."""
+        messages = [
+            {
+                "conversation_id": "conv-123",
+                "sender_type": "user",
+                "sender_id": "U123456",
+                "content": f"Message {i}"
+            }
+            for i in range(3)
+        ]
+        
+        assert supabase_service.bulk_log_messages(messages) == 3
+        
+        mock_supabase_client.insert.assert_called_once()
+        rows = mock_supabase_client.insert.call_args[0][0]
+        assert mock_supabase_client.insert.call_args[1]["returning"] == "minimal"
+        assert [row["content"] for row in rows] == ["Message 0", "Message 1", "Message 2"]
+        # created_at comes from the column default unless supplied
+        assert all("created_at" not in row for row in rows)
+    
+    def test_bulk_log_activity_empty(self, supabase_service, mock_supabase_client):
+        """Test that an empty batch makes no request."""
+        assert supabase_service.bulk_log_activity([]) == 0
+        mock_supabase_client.table.assert_not_called()
+    
+    def test_bulk_log_activity_copies_large_batches(self, supabase_service, mock_supabase_client):
+        """Test that batches past the threshold go through COPY on the pool."""
+        supabase_service.use_pool = True
+        activities = [{"user_id": "user-123", "activity_type": "replay"}] * COPY_THRESHOLD
+        
+        with patch.object(supabase_service, "_copy_rows", new_callable=AsyncMock) as copy_rows:
+            assert supabase_service.bulk_log_activity(activities) == COPY_THRESHOLD
+        
+        copy_rows.assert_awaited_once()
+        table, rows = copy_rows.await_args[0]
+        assert table == "activity_logs"
+        assert len(rows) == COPY_THRESHOLD
+        mock_supabase_client.insert.assert_not_called()
+
     def test_conversation_with_thread(self, supabase_service, mock_supabase_client):
         """Test conversation with thread timestamp."""
-        mock_supabase_client.execute.side_effect = [
-            MagicMock(data=[{"id": "user-123"}]),  # get_or_create_user
-            MagicMock(data=[]),  # no existing conversation
-            MagicMock(data=[{"id": "user-123"}]),  # get_or_create_user for create
-            MagicMock(data=[{"id": "conv-thread"}])  # create conversation
-        ]
+        mock_supabase_client.execute.return_value = MagicMock(data={"id": "conv-thread"})
         
         result = supabase_service.get_or_create_conversation(
             channel_id="C123456",
@@ -179,10 +234,6 @@ class TestInteractionLogging:
         )
         
         assert result["id"] == "conv-thread"
-        # Verify thread_ts was included in query
-        eq_calls = mock_supabase_client.eq.call_args_list
-        thread_call = any(
-            call[0] == ("slack_thread_ts", "1234567890.123456") 
-            for call in eq_calls
-        )
-        assert thread_call
\ No newline at end of file
+        # Verify thread_ts was passed to the lookup
+        params = mock_supabase_client.rpc.call_args[0][1]
+        assert params["p_thread"] == "1234567890.123456"
@@ -339,6 +339,38 @@ class TestMetricsCollector:
         assert 90 <= stats['p95_duration_ms'] <= 100
         # P99 should be 100 (highest value)
         assert stats['p99_duration_ms'] == 100
+    
+    def test_ring_buffer_stats(self):
+        """Test ring buffer load metrics when a buffer overflows."""
+        collector = MetricsCollector(max_records_per_type=3)
+        
+        for duration in range(5):
+            collector.record_request('test', duration, 'success', 'U123')
+        
+        stats = collector.get_stats()
+        
+        assert stats['ring_writes'] == 5
+        assert stats['ring_drops'] == 2
+        assert stats['ring_depth'] == 3
+    
+    def test_old_metrics_expire(self):
+        """Test that records outside the window are dropped."""
+        collector = MetricsCollector(window_minutes=5)
+        collector.record_request('test', 100, 'success', 'U123')
+        collector.record_request('other', 100, 'success', 'U123')
+        
+        # Age the existing records past the window
+        for ring in collector._metrics.values():
+            for i, metric in enumerate(ring):
+                ring[i] = metric._replace(ts_ns=metric.ts_ns - 600 * 1_000_000_000)
+        
+        collector.record_request('test', 200, 'success', 'U123')
+        
+        summary = collector.get_summary()
+        assert summary['request_types']['test']['count'] == 1
+        assert summary['request_types']['test']['avg_duration_ms'] == 200
+        assert 'other' not in summary['request_types']
+        assert collector.get_user_stats('U123')['total_requests'] == 1
 
 
 class TestTimer:
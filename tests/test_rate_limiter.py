@@ -90,6 +90,46 @@ class TestTokenBucket:
         bucket.refill(rate_limit, current_time)
         
         assert bucket.tokens == 100.0  # Capped at max
+    
+    def test_partial_refill_keeps_credit(self):
+        """Test that sub-token refills are deferred without losing elapsed time."""
+        current_time = time.time()
+        bucket = TokenBucket(tokens=2.0, last_refill=current_time)
+        
+        rate_limit = RateLimit(max_tokens=5, refill_rate=0.1, burst_size=5)
+        
+        # 6 seconds at 0.1 tokens/sec is less than one token: nothing changes
+        bucket.refill(rate_limit, current_time + 6)
+        assert bucket.tokens == 2.0
+        assert bucket.last_refill == current_time
+        
+        # 6 more seconds completes the token, counting the earlier time too
+        bucket.refill(rate_limit, current_time + 12)
+        assert bucket.tokens == pytest.approx(3.2)
+        assert bucket.last_refill == current_time + 12
+    
+    def test_partial_refill_credited_for_larger_requests(self):
+        """Test that a request for several tokens gets the fractional refill."""
+        current_time = time.time()
+        bucket = TokenBucket(tokens=1.5, last_refill=current_time)
+        
+        rate_limit = RateLimit(max_tokens=5, refill_rate=0.1, burst_size=5)
+        
+        # 6 seconds adds 0.6 tokens; enough for a 2-token request
+        bucket.refill(rate_limit, current_time + 6, needed=2)
+        
+        assert bucket.tokens == pytest.approx(2.1)
+        assert bucket.consume(2) is True
+    
+    def test_full_bucket_refill_only_advances_time(self):
+        """Test that refilling a full bucket just records the refill time."""
+        current_time = time.time()
+        bucket = TokenBucket(tokens=5.0, last_refill=current_time - 100)
+        
+        bucket.refill(RateLimit(max_tokens=5, refill_rate=1, burst_size=5), current_time)
+        
+        assert bucket.tokens == 5.0
+        assert bucket.last_refill == current_time
 
 
 class TestRateLimiter:
@@ -101,7 +141,7 @@ class TestRateLimiter:
         
         assert 'global' in limiter._rate_limits
         assert 'user' in limiter._rate_limits
-        assert len(limiter._buckets) == 0  # No buckets initially
+        assert limiter.get_stats()['active_buckets'] == 0  # No buckets initially
     
     def test_global_rate_limit(self):
         """Test global rate limiting."""
@@ -178,6 +218,49 @@ class TestRateLimiter:
         allowed, info = limiter.check_rate_limit("user1", None)
         assert allowed is True
     
+    def test_concurrent_checks_share_user_bucket(self):
+        """Test that concurrent requests for one user never overdraw the bucket."""
+        import threading
+        
+        limiter = RateLimiter()
+        limiter.set_rate_limit('user', RateLimit(max_tokens=50, refill_rate=0.01, burst_size=50))
+        results = []
+        
+        def worker(user_id):
+            for _ in range(20):
+                allowed, _ = limiter.check_rate_limit(user_id, None)
+                results.append((user_id, allowed))
+        
+        threads = [threading.Thread(target=worker, args=(f"user{i % 2}",)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        for user_id in ("user0", "user1"):
+            allowed_count = sum(1 for uid, allowed in results if uid == user_id and allowed)
+            assert allowed_count == 50
+    
+    def test_multi_token_request_not_refused_early(self):
+        """Test that the limiter credits partial refills when consuming several tokens."""
+        limiter = RateLimiter()
+        limiter.set_rate_limit('user', RateLimit(max_tokens=3, refill_rate=0.1, burst_size=3))
+        
+        with patch('src.utils.rate_limiter.time.monotonic', return_value=1000.0):
+            allowed, _ = limiter.check_rate_limit("user1", None, tokens=2)  # 1 token left
+            assert allowed is True
+        
+        # 6 seconds later 0.6 tokens have accrued: still short of 2
+        with patch('src.utils.rate_limiter.time.monotonic', return_value=1006.0):
+            allowed, info = limiter.check_rate_limit("user1", None, tokens=2)
+            assert allowed is False
+            assert info['retry_after'] == pytest.approx(4.0)
+        
+        # 10 seconds in total: exactly 2 tokens
+        with patch('src.utils.rate_limiter.time.monotonic', return_value=1010.0):
+            allowed, _ = limiter.check_rate_limit("user1", None, tokens=2)
+            assert allowed is True
+    
     def test_get_limit_info(self):
         """Test getting rate limit information."""
         limiter = RateLimiter()
@@ -205,14 +288,40 @@ class TestRateLimiter:
         
         # Mock time to make buckets appear old
         import time as time_module
-        current = time_module.time()
+        current = time_module.monotonic()
         
-        with patch('src.utils.rate_limiter.time.time') as mock_time:
+        with patch('src.utils.rate_limiter.time.monotonic') as mock_time:
             mock_time.return_value = current + 7200  # 2 hours later
             
             removed = limiter.cleanup_old_buckets(max_age_seconds=3600)
             assert removed >= 2  # At least both user buckets should be removed
     
+    def test_bucket_count_is_bounded(self):
+        """Test that the least recently seen users are evicted at capacity."""
+        limiter = RateLimiter(max_users=1)  # One user per stripe
+        
+        for i in range(200):
+            limiter.check_rate_limit(f"user{i}", None)
+        
+        _, users = limiter._stripe_for("user199")
+        assert list(users) == ["user199"]
+        # Global bucket plus at most one user bucket per stripe
+        assert limiter.get_stats()['active_buckets'] <= len(limiter._stripes) + 1
+    
+    def test_stale_bucket_evicted_on_insert(self):
+        """Test that adding a user drops a stale one from the same stripe."""
+        with patch('src.utils.rate_limiter._STRIPE_COUNT', 1):
+            limiter = RateLimiter(bucket_max_age=3600)
+            
+            with patch('src.utils.rate_limiter.time.monotonic', return_value=1000.0):
+                limiter.check_rate_limit("user1", None)
+            
+            with patch('src.utils.rate_limiter.time.monotonic', return_value=1000.0 + 7200):
+                limiter.check_rate_limit("user2", None)
+            
+            _, users = limiter._stripe_for("user2")
+            assert list(users) == ["user2"]
+    
     def test_get_stats(self):
         """Test getting rate limiter statistics."""
         limiter = RateLimiter()
@@ -227,8 +336,22 @@ class TestRateLimiter:
         
         assert 'active_buckets' in stats
         assert 'limit_hits' in stats
-        assert 'user:user1' in stats['limit_hits']
-        assert stats['limit_hits']['user:user1'] == 1
+        assert stats['limit_hits'] == {'global': 0, 'user': 1, 'command': 0}
+        assert stats['command_hits'] == {}
+    
+    def test_get_stats_counts_command_hits(self):
+        """Test that command rejections are counted per command, not per user."""
+        limiter = RateLimiter()
+        limiter.set_rate_limit('command:/test', RateLimit(max_tokens=1, refill_rate=0.01, burst_size=1))
+        
+        for user_id in ("user1", "user2"):
+            limiter.check_rate_limit(user_id, "command:/test")
+            limiter.check_rate_limit(user_id, "command:/test")  # Rate limited
+        
+        stats = limiter.get_stats()
+        
+        assert stats['limit_hits']['command'] == 2
+        assert stats['command_hits'] == {'command:/test': 2}
 
 
 class TestRateLimitMiddleware:
@@ -0,0 +1,89 @@
+"""Tests for database retry helpers."""
+
+import pytest
+from unittest.mock import Mock, patch
+
+import httpx
+
+from src.utils.retry import is_transient_error, retry_db_operation
+
+
+class GatewayError(Exception):
+    """Stand-in for a PostgREST APIError carrying an HTTP status code."""
+    
+    def __init__(self, code):
+        super().__init__(f"gateway error {code}")
+        self.code = code
+
+
+class TestIsTransientError:
+    """Test classification of retryable errors."""
+    
+    def test_network_errors_are_transient(self):
+        """Test that dropped connections and timeouts are retried."""
+        assert is_transient_error(httpx.RemoteProtocolError("Server disconnected"))
+        assert is_transient_error(httpx.ConnectError("Connection refused"))
+        assert is_transient_error(httpx.ReadTimeout("timed out"))
+    
+    def test_gateway_errors_are_transient(self):
+        """Test that 5xx gateway codes are retried whether str or int."""
+        assert is_transient_error(GatewayError("503"))
+        assert is_transient_error(GatewayError(502))
+    
+    def test_other_errors_are_not_transient(self):
+        """Test that client and application errors are raised immediately."""
+        assert not is_transient_error(GatewayError("23505"))
+        assert not is_transient_error(ValueError("bad input"))
+
+
+class TestRetryDbOperation:
+    """Test the retry decorator."""
+    
+    @patch('src.utils.retry.time.sleep')
+    def test_retries_until_success(self, mock_sleep):
+        """Test that transient failures are retried and the result returned."""
+        func = Mock(side_effect=[httpx.RemoteProtocolError("Server disconnected"), GatewayError("503"), "ok"])
+        func.__name__ = "func"
+        
+        result = retry_db_operation(max_retries=3)(func)("arg")
+        
+        assert result == "ok"
+        assert func.call_count == 3
+        assert mock_sleep.call_count == 2
+    
+    @patch('src.utils.retry.time.sleep')
+    def test_gives_up_after_max_retries(self, mock_sleep):
+        """Test that the last transient error is raised once retries run out."""
+        func = Mock(side_effect=httpx.ConnectError("Connection refused"))
+        func.__name__ = "func"
+        
+        with pytest.raises(httpx.ConnectError):
+            retry_db_operation(max_retries=2)(func)()
+        
+        assert func.call_count == 3
+        assert mock_sleep.call_count == 2
+    
+    @patch('src.utils.retry.time.sleep')
+    def test_non_transient_error_not_retried(self, mock_sleep):
+        """Test that other errors propagate on the first attempt."""
+        func = Mock(side_effect=ValueError("bad input"))
+        func.__name__ = "func"
+        
+        with pytest.raises(ValueError):
+            retry_db_operation()(func)()
+        
+        func.assert_called_once()
+        mock_sleep.assert_not_called()
+    
+    @patch('src.utils.retry.random.uniform', side_effect=lambda low, high: high)
+    @patch('src.utils.retry.time.sleep')
+    def test_backoff_is_capped(self, mock_sleep, mock_uniform):
+        """Test that delays grow exponentially up to max_delay."""
+        func = Mock(side_effect=httpx.ReadTimeout("timed out"))
+        func.__name__ = "func"
+        
+        with pytest.raises(httpx.ReadTimeout):
+            retry_db_operation(max_retries=4, base_delay=0.1, max_delay=0.5)(func)()
+        
+        delays = [call.args[0] for call in mock_sleep.call_args_list]
+        assert delays == pytest.approx([0.1, 0.2, 0.4, 0.5])
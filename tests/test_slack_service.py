@@ -1,7 +1,7 @@
 """Tests for Slack service functionality."""
 
 import pytest
-from unittest.mock import Mock, MagicMock, patch
+from unittest.mock import AsyncMock, Mock, MagicMock, patch
 from datetime import datetime
 import json
 
@@ -14,8 +14,8 @@ class TestSlackService:
     
     @pytest.fixture
     def mock_client(self):
-        """Create a mock Slack WebClient."""
-        return MagicMock()
+        """Create a mock Slack AsyncWebClient."""
+        return AsyncMock()
     
     @pytest.fixture
     def slack_service(self, mock_client):
@@ -24,7 +24,8 @@ class TestSlackService:
         service.client = mock_client
         return service
     
-    def test_get_user_info_success(self, slack_service, mock_client):
+    @pytest.mark.asyncio
+    async def test_get_user_info_success(self, slack_service, mock_client):
         """Test successful user info retrieval."""
         # Mock response
         mock_client.users_info.return_value = {
@@ -37,14 +38,15 @@ class TestSlackService:
             }
         }
         
-        result = slack_service.get_user_info("U123456")
+        result = await slack_service.get_user_info("U123456")
         
         assert result is not None
         assert result["id"] == "U123456"
         assert result["name"] == "testuser"
         mock_client.users_info.assert_called_once_with(user="U123456")
     
-    def test_get_user_info_error(self, slack_service, mock_client):
+    @pytest.mark.asyncio
+    async def test_get_user_info_error(self, slack_service, mock_client):
         """Test user info retrieval with API error."""
         # Mock API error
         mock_client.users_info.side_effect = SlackApiError(
@@ -52,12 +54,24 @@ class TestSlackService:
             response={"ok": False, "error": "user_not_found"}
         )
         
-        result = slack_service.get_user_info("U999999")
+        result = await slack_service.get_user_info("U999999")
         
         assert result is None
         mock_client.users_info.assert_called_once_with(user="U999999")
     
-    def test_send_dm_success(self, slack_service, mock_client):
+    @pytest.mark.asyncio
+    async def test_get_user_info_cached(self, slack_service, mock_client):
+        """Test that user info is fetched once and then served from cache."""
+        mock_client.users_info.return_value = {"ok": True, "user": {"id": "U123456"}}
+        
+        first = await slack_service.get_user_info("U123456")
+        second = await slack_service.get_user_info("U123456")
+        
+        assert first == second == {"id": "U123456"}
+        mock_client.users_info.assert_called_once_with(user="U123456")
+    
+    @pytest.mark.asyncio
+    async def test_send_dm_success(self, slack_service, mock_client):
         """Test successful DM sending."""
         # Mock successful responses
         mock_client.conversations_open.return_value = {
@@ -66,7 +80,7 @@ class TestSlackService:
         }
         mock_client.chat_postMessage.return_value = {"ok": True}
         
-        result = slack_service.send_dm("U123456", "Hello, test!")
+        result = await slack_service.send_dm("U123456", "Hello, test!")
         
         assert result is True
         mock_client.conversations_open.assert_called_once_with(users=["U123456"])
@@ -76,7 +90,8 @@ class TestSlackService:
             blocks=None
         )
     
-    def test_send_dm_with_blocks(self, slack_service, mock_client):
+    @pytest.mark.asyncio
+    async def test_send_dm_with_blocks(self, slack_service, mock_client):
         """Test sending DM with blocks."""
         # Mock successful responses
         mock_client.conversations_open.return_value = {
@@ -86,7 +101,7 @@ class TestSlackService:
         mock_client.chat_postMessage.return_value = {"ok": True}
         
         blocks = [{"type": "section", "text": {"type": "mrkdwn", "text": "Test"}}]
-        result = slack_service.send_dm("U123456", "Hello", blocks)
+        result = await slack_service.send_dm("U123456", "Hello", blocks)
         
         assert result is True
         mock_client.chat_postMessage.assert_called_once_with(
@@ -95,7 +110,8 @@ class TestSlackService:
             blocks=blocks
         )
     
-    def test_send_dm_error(self, slack_service, mock_client):
+    @pytest.mark.asyncio
+    async def test_send_dm_error(self, slack_service, mock_client):
         """Test DM sending with error."""
         # Mock API error
         mock_client.conversations_open.side_effect = SlackApiError(
@@ -103,16 +119,32 @@ class TestSlackService:
             response={"ok": False, "error": "channel_not_found"}
         )
         
-        result = slack_service.send_dm("U123456", "Hello")
+        result = await slack_service.send_dm("U123456", "Hello")
         
         assert result is False
         mock_client.conversations_open.assert_called_once()
     
-    def test_post_ephemeral_success(self, slack_service, mock_client):
+    @pytest.mark.asyncio
+    async def test_send_dm_reuses_dm_channel(self, slack_service, mock_client):
+        """Test that the DM channel is opened once per user."""
+        mock_client.conversations_open.return_value = {
+            "ok": True,
+            "channel": {"id": "D123456"}
+        }
+        mock_client.chat_postMessage.return_value = {"ok": True}
+        
+        assert await slack_service.send_dm("U123456", "First") is True
+        assert await slack_service.send_dm("U123456", "Second") is True
+        
+        mock_client.conversations_open.assert_called_once_with(users=["U123456"])
+        assert mock_client.chat_postMessage.call_count == 2
+    
+    @pytest.mark.asyncio
+    async def test_post_ephemeral_success(self, slack_service, mock_client):
         """Test successful ephemeral message posting."""
         mock_client.chat_postEphemeral.return_value = {"ok": True}
         
-        result = slack_service.post_ephemeral("C123456", "U123456", "Secret message")
+        result = await slack_service.post_ephemeral("C123456", "U123456", "Secret message")
         
         assert result is True
         mock_client.chat_postEphemeral.assert_called_once_with(
@@ -122,17 +154,64 @@ class TestSlackService:
             blocks=None
         )
     
-    def test_post_ephemeral_error(self, slack_service, mock_client):
+    @pytest.mark.asyncio
+    async def test_post_ephemeral_error(self, slack_service, mock_client):
         """Test ephemeral message posting with error."""
         mock_client.chat_postEphemeral.side_effect = SlackApiError(
             message="not_in_channel",
             response={"ok": False, "error": "not_in_channel"}
         )
         
-        result = slack_service.post_ephemeral("C123456", "U123456", "Secret message")
+        result = await slack_service.post_ephemeral("C123456", "U123456", "Secret message")
         
         assert result is False
     
+    @pytest.mark.asyncio
+    async def test_stream_message_updates_placeholder(self, slack_service, mock_client):
+        """Test that streamed text replaces the placeholder message."""
+        mock_client.chat_postMessage.return_value = {"ok": True, "ts": "123.456"}
+        
+        async def chunks():
+            yield "Hola "
+            yield "mundo"
+        
+        result = await slack_service.stream_message("C123456", chunks(), prefix="<@U1>, ")
+        
+        assert result == "<@U1>, Hola mundo"
+        mock_client.chat_update.assert_called_with(channel="C123456", ts="123.456", text="<@U1>, Hola mundo")
+        mock_client.chat_delete.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_stream_message_failure_deletes_placeholder(self, slack_service, mock_client):
+        """Test that a failed stream removes the placeholder before raising."""
+        mock_client.chat_postMessage.return_value = {"ok": True, "ts": "123.456"}
+        mock_client.chat_update.side_effect = SlackApiError(
+            message="msg_too_long",
+            response={"ok": False, "error": "msg_too_long"}
+        )
+        
+        async def chunks():
+            yield "Hola"
+        
+        with pytest.raises(SlackApiError):
+            await slack_service.stream_message("C123456", chunks())
+        
+        mock_client.chat_delete.assert_called_once_with(channel="C123456", ts="123.456")
+    
+    @pytest.mark.asyncio
+    async def test_client_shares_one_session_until_closed(self):
+        """Test that the async client reuses one aiohttp session and aclose() closes it."""
+        service = SlackService()
+        
+        client = service._get_client()
+        session = service._session
+        
+        assert service._get_client() is client
+        assert client.session is session
+        await service.aclose()
+        assert session.closed
+        assert service.client is None
+    
     def test_format_task_list_empty(self):
         """Test formatting empty task list."""
         result = SlackService.format_task_list([])
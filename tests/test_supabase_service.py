@@ -21,6 +21,7 @@ class TestSupabaseService:
         table_mock.select.return_value = table_mock
         table_mock.insert.return_value = table_mock
         table_mock.update.return_value = table_mock
+        table_mock.upsert.return_value = table_mock
         table_mock.eq.return_value = table_mock
         table_mock.gte.return_value = table_mock
         table_mock.lte.return_value = table_mock
@@ -55,34 +56,69 @@ class TestSupabaseService:
         
         assert result == existing_user
         mock_client.table.assert_called_with("users")
-        table_mock.select.assert_called_with("*")
-        table_mock.eq.assert_any_call("slack_user_id", "U123456")
-        table_mock.eq.assert_any_call("slack_workspace_id", "W123456")
+        table_mock.upsert.assert_called_once_with(
+            {"slack_user_id": "U123456", "slack_workspace_id": "W123456"},
+            on_conflict="slack_user_id,slack_workspace_id"
+        )
+        table_mock.select.assert_not_called()
     
     def test_get_or_create_user_new(self, supabase_service, mock_client):
         """Test creating new user when not exists."""
         # Access the table mock
         table_mock = mock_client.table.return_value
-        # First query returns empty (user doesn't exist)
-        table_mock.execute.side_effect = [
-            MagicMock(data=[]),  # First select returns empty
-            MagicMock(data=[{    # Insert returns new user
-                "id": 2,
-                "slack_user_id": "U789012",
-                "slack_workspace_id": "W123456",
-                "created_at": "2024-01-15T10:30:00"
-            }])
-        ]
+        # The upsert inserts and returns the new user in one call
+        table_mock.execute.return_value.data = [{
+            "id": 2,
+            "slack_user_id": "U789012",
+            "slack_workspace_id": "W123456",
+            "created_at": "2024-01-15T10:30:00"
+        }]
         
         result = supabase_service.get_or_create_user("U789012", "W123456")
         
         assert result["slack_user_id"] == "U789012"
         assert result["slack_workspace_id"] == "W123456"
-        table_mock.insert.assert_called_once()
-        insert_data = table_mock.insert.call_args[0][0]
-        assert insert_data["slack_user_id"] == "U789012"
-        assert insert_data["slack_workspace_id"] == "W123456"
-        assert "created_at" in insert_data
+        table_mock.upsert.assert_called_once()
+        table_mock.insert.assert_not_called()
+        upsert_data = table_mock.upsert.call_args[0][0]
+        assert upsert_data["slack_user_id"] == "U789012"
+        assert upsert_data["slack_workspace_id"] == "W123456"
+        # created_at comes from the column default so a conflict never rewrites it
+        assert "created_at" not in upsert_data
+    
+    def test_get_or_create_user_redis_cache(self, supabase_service, mock_client):
+        """Test that cached users skip the database and misses populate the cache."""
+        user = {"id": 1, "slack_user_id": "U123456", "slack_workspace_id": "W123456"}
+        supabase_service.redis = MagicMock()
+        table_mock = mock_client.table.return_value
+        
+        # Miss: query the database and cache the row
+        supabase_service.redis.get.return_value = None
+        table_mock.execute.return_value.data = [user]
+        assert supabase_service.get_or_create_user("U123456", "W123456") == user
+        supabase_service.redis.setex.assert_called_once()
+        assert supabase_service.redis.setex.call_args[0][0] == "u:W123456:U123456"
+        
+        # Hit: served from the cache without touching the database
+        mock_client.table.reset_mock()
+        supabase_service._users.clear()
+        supabase_service.redis.get.return_value = '{"id": 1, "slack_user_id": "U123456", "slack_workspace_id": "W123456"}'
+        assert supabase_service.get_or_create_user("U123456", "W123456") == user
+        mock_client.table.assert_not_called()
+    
+    def test_get_or_create_user_local_cache(self, supabase_service, mock_client):
+        """Test that repeat lookups are served in-process until invalidated."""
+        user = {"id": 1, "slack_user_id": "U123456", "slack_workspace_id": "W123456"}
+        table_mock = mock_client.table.return_value
+        table_mock.execute.return_value.data = [user]
+        
+        assert supabase_service.get_or_create_user("U123456", "W123456") == user
+        assert supabase_service.get_or_create_user("U123456", "W123456") == user
+        table_mock.upsert.assert_called_once()
+        
+        supabase_service.invalidate_user_cache("U123456", "W123456")
+        supabase_service.get_or_create_user("U123456", "W123456")
+        assert table_mock.upsert.call_count == 2
     
     def test_create_task_success(self, supabase_service, mock_client):
         """Test successful task creation."""
@@ -147,6 +183,9 @@ class TestSupabaseService:
         
         assert result == tasks
         mock_client.table.assert_called_with("tasks")
+        select_columns = table_mock.select.call_args[0][0]
+        assert "*" not in select_columns
+        assert {"id", "description", "status", "priority", "created_at"} <= set(select_columns.split(","))
         table_mock.eq.assert_called_with("assigned_to", "U123456")
         table_mock.order.assert_called_with("created_at", desc=True)
     
@@ -191,23 +230,20 @@ class TestSupabaseService:
         update_data = table_mock.update.call_args[0][0]
         assert update_data["status"] == "completed"
         assert update_data["description"] == "Updated task"
-        assert "updated_at" in update_data
+        # updated_at is set by the database trigger
+        assert "updated_at" not in update_data
         table_mock.eq.assert_called_with("id", 1)
     
     def test_start_time_entry_success(self, supabase_service, mock_client):
         """Test starting a time entry."""
-        table_mock = mock_client.table.return_value
-        # Mock stopping active entries
-        table_mock.execute.side_effect = [
-            MagicMock(data=[]),  # No active entries
-            MagicMock(data=[{    # New time entry
-                "id": 1,
-                "user_id": 123,
-                "task_id": 456,
-                "start_time": "2024-01-15T10:00:00",
-                "is_active": True
-            }])
-        ]
+        # The RPC stops running entries and returns the new one
+        mock_client.rpc.return_value.execute.return_value = MagicMock(data={
+            "id": 1,
+            "user_id": 123,
+            "task_id": 456,
+            "start_time": "2024-01-15T10:00:00",
+            "is_active": True
+        })
         
         result = supabase_service.start_time_entry(123, task_id=456)
         
@@ -215,33 +251,21 @@ class TestSupabaseService:
         assert result["task_id"] == 456
         assert result["is_active"] is True
         
-        # Check insert was called
-        table_mock.insert.assert_called_once()
-        insert_data = table_mock.insert.call_args[0][0]
-        assert insert_data["user_id"] == 123
-        assert insert_data["task_id"] == 456
-        assert insert_data["is_active"] is True
-        assert "start_time" in insert_data
+        mock_client.rpc.assert_called_once_with(
+            "start_time_entry", {"p_user_id": 123, "p_task_id": 456}
+        )
+        mock_client.table.assert_not_called()
     
     def test_stop_active_time_entries(self, supabase_service, mock_client):
         """Test stopping active time entries."""
-        active_entries = [
-            {"id": 1, "user_id": 123, "is_active": True},
-            {"id": 2, "user_id": 123, "is_active": True}
-        ]
-        
         stopped_entries = [
             {"id": 1, "user_id": 123, "is_active": False, "end_time": "2024-01-15T12:00:00"},
             {"id": 2, "user_id": 123, "is_active": False, "end_time": "2024-01-15T12:00:00"}
         ]
         
         table_mock = mock_client.table.return_value
-        # Mock responses: first for select, then for each update
-        table_mock.execute.side_effect = [
-            MagicMock(data=active_entries),
-            MagicMock(data=[stopped_entries[0]]),
-            MagicMock(data=[stopped_entries[1]])
-        ]
+        # A single update returns every stopped entry
+        table_mock.execute.return_value.data = stopped_entries
         
         result = supabase_service.stop_active_time_entries(123)
         
@@ -249,8 +273,11 @@ class TestSupabaseService:
         assert all(entry["is_active"] is False for entry in result)
         assert all("end_time" in entry for entry in result)
         
-        # Check update was called for each entry
-        assert table_mock.update.call_count == 2
+        # Check a single update covered all active entries
+        table_mock.update.assert_called_once()
+        table_mock.select.assert_not_called()
+        table_mock.eq.assert_any_call("user_id", 123)
+        table_mock.eq.assert_any_call("is_active", True)
     
     def test_stop_active_time_entries_none_active(self, supabase_service, mock_client):
         """Test stopping time entries when none are active."""
@@ -260,7 +287,7 @@ class TestSupabaseService:
         result = supabase_service.stop_active_time_entries(123)
         
         assert result == []
-        table_mock.update.assert_not_called()
+        table_mock.update.assert_called_once()
     
     def test_get_user_time_entries_no_filters(self, supabase_service, mock_client):
         """Test getting time entries without date filters."""
@@ -297,7 +324,24 @@ class TestSupabaseService:
         table_mock.gte.assert_called_with("start_time", start_date.isoformat())
         table_mock.lte.assert_called_with("start_time", end_date.isoformat())
     
+    def test_get_conversation_messages_chronological(self, supabase_service, mock_client):
+        """Test that the latest messages are returned oldest first."""
+        table_mock = mock_client.table.return_value
+        table_mock.limit.return_value = table_mock
+        table_mock.execute.return_value.data = [
+            {"id": "m3", "content": "third"},
+            {"id": "m2", "content": "second"},
+            {"id": "m1", "content": "first"}
+        ]
+        
+        messages = supabase_service.get_conversation_messages("conv-1", limit=3)
+        
+        assert [m["id"] for m in messages] == ["m1", "m2", "m3"]
+        table_mock.order.assert_called_with("created_at", desc=True)
+        table_mock.limit.assert_called_with(3)
+    
     @patch('src.services.supabase_client._supabase_service', None)
+    @patch('src.services.supabase_client._supabase_service_failed', False)
     @patch('src.services.supabase_client.SupabaseService')
     def test_get_supabase_service_singleton(self, mock_supabase_service_class):
         """Test that get_supabase_service returns singleton instance."""
@@ -315,11 +359,139 @@ class TestSupabaseService:
         assert service2 == service1
         mock_supabase_service_class.assert_not_called()
     
+    @patch('src.services.supabase_client._supabase_service', None)
+    @patch('src.services.supabase_client._supabase_service_failed', False)
+    @patch('src.services.supabase_client.SupabaseService')
+    def test_get_supabase_service_failure_cached(self, mock_supabase_service_class):
+        """Test that a failed creation is not retried on every call."""
+        mock_supabase_service_class.side_effect = ValueError("SUPABASE_URL not configured")
+        
+        assert get_supabase_service() is None
+        assert get_supabase_service() is None
+        mock_supabase_service_class.assert_called_once()
+    
+    def test_get_user_summary_uses_rpc(self, supabase_service, mock_client):
+        """Test that the summary is aggregated by one RPC for the period."""
+        supabase_service.get_or_create_user = Mock(return_value={"id": "user-1"})
+        aggregates = {
+            "total_tasks": 2,
+            "tasks_by_status": {"pending": 1, "completed": 1},
+            "tasks_created_in_period": 1,
+            "tasks_completed_in_period": 1,
+            "total_activities": 3,
+            "activities_by_type": {"slash_command": 3},
+            "conversations_started": 1
+        }
+        mock_client.rpc.return_value.execute.return_value = MagicMock(data=aggregates)
+        
+        summary = supabase_service.get_user_summary("U123", "week")
+        
+        name, params = mock_client.rpc.call_args[0]
+        assert name == "summary_for_user"
+        assert params["p_slack_user_id"] == "U123"
+        assert params["p_user_id"] == "user-1"
+        assert params["p_start"] == summary["start_date"]
+        mock_client.table.assert_not_called()
+        assert summary["period"] == "week"
+        assert summary["activities_by_type"] == {"slash_command": 3}
+    
+    def test_get_user_statistics_uses_rpc(self, supabase_service, mock_client):
+        """Test that statistics come from one RPC merged with preferences."""
+        supabase_service.get_or_create_user = Mock(return_value={"id": "user-1", "created_at": "2024-01-01T00:00:00"})
+        supabase_service.get_user_preferences = Mock(return_value={"language": "en", "timezone": "UTC"})
+        counts = {
+            "total_tasks": 4,
+            "pending_tasks": 1,
+            "completed_tasks": 3,
+            "completion_rate": 75.0,
+            "total_activities": 9,
+            "most_common_activity": "slash_command"
+        }
+        mock_client.rpc.return_value.execute.return_value = MagicMock(data=counts)
+        
+        stats = supabase_service.get_user_statistics("U123")
+        
+        mock_client.rpc.assert_called_once_with(
+            "get_user_statistics", {"p_slack_user_id": "U123", "p_user_id": "user-1"}
+        )
+        mock_client.table.assert_not_called()
+        assert stats == {
+            "user_id": "U123",
+            "member_since": "2024-01-01T00:00:00",
+            **counts,
+            "language": "en",
+            "timezone": "UTC"
+        }
+    
+    def test_statistics_key_matches_activity_writes(self, supabase_service, mock_client):
+        """Test that the statistics RPC filters activity by the key _activity_row writes."""
+        supabase_service.get_or_create_user = Mock(return_value={"id": "user-1", "created_at": "2024-01-01T00:00:00"})
+        supabase_service.get_user_preferences = Mock(return_value={})
+        mock_client.rpc.return_value.execute.return_value = MagicMock(data={})
+        
+        row = supabase_service._activity_row({
+            "slack_user_id": "U123",
+            "activity_type": "slash_command"
+        })
+        supabase_service.get_user_statistics("U123")
+        
+        _, params = mock_client.rpc.call_args[0]
+        assert "slack_user_id" not in row
+        assert params["p_user_id"] == row["user_id"]
+    
+    def test_user_preferences_cached(self, supabase_service, mock_client):
+        """Test that preferences are fetched once and written through on update."""
+        supabase_service.get_or_create_user = Mock(return_value={"id": "user-1"})
+        prefs = {
+            "id": "pref-1",
+            "user_id": "user-1",
+            "language": "en",
+            "notification_settings": {"task_reminders": True, "daily_summary": True},
+            "working_hours": {"start": "09:00", "end": "18:00"}
+        }
+        table_mock = mock_client.table.return_value
+        table_mock.execute.return_value.data = [prefs]
+        
+        assert supabase_service.get_user_preferences("U123") == prefs
+        assert supabase_service.get_user_preferences("U123") == prefs
+        table_mock.select.assert_called_once()
+        
+        updated = {**prefs, "notification_settings": {"task_reminders": False, "daily_summary": True}}
+        table_mock.execute.return_value.data = [updated]
+        supabase_service.update_user_preferences("U123", {"notification_settings": {"task_reminders": False}})
+        
+        table_mock.update.assert_called_once_with({"notification_settings": updated["notification_settings"]})
+        assert prefs["notification_settings"]["task_reminders"] is True
+        assert supabase_service.get_user_preferences("U123") == updated
+        table_mock.select.assert_called_once()
+    
+    def test_gather_returns_results_in_order(self, supabase_service):
+        """Test that independent calls come back in call order."""
+        results = supabase_service._gather(lambda: "tasks", lambda: "activities", lambda: "prefs")
+        
+        assert results == ["tasks", "activities", "prefs"]
+    
+    def test_run_in_background(self, supabase_service):
+        """Test that background calls resolve to the call's result."""
+        future = supabase_service.run_in_background(lambda a, b: a + b, 1, b=2)
+        
+        assert future.result(timeout=5) == 3
+    
+    def test_run_in_background_logs_failures(self, supabase_service):
+        """Test that background failures resolve to None instead of raising."""
+        def failing():
+            raise RuntimeError("Database error")
+        
+        future = supabase_service.run_in_background(failing)
+        
+        assert future.result(timeout=5) is None
+    
     def test_error_handling(self, supabase_service, mock_client):
         """Test error handling in various methods."""
         # Mock an exception on the table mock
         table_mock = mock_client.table.return_value
         table_mock.execute.side_effect = Exception("Database error")
+        mock_client.rpc.return_value.execute.side_effect = Exception("Database error")
         
         # Test various methods that should raise exceptions
         with pytest.raises(Exception, match="Database error"):